@@ -0,0 +1,267 @@
+"""
+Extraction benchmark: PDFService.load_pdf and extract_pages
+
+For each fixture (kind x page count) runs, in a fresh process:
+    load         - load_pdf() alone (parse and page count)
+    extract_all  - every page into one output
+    stream       - the same output with extract_pages(streaming=True)
+    optimize     - the same output with extract_pages(optimize=True)
+    rotate_crop  - every page, each one rotated and cropped
+    split        - one output per --chunk pages, written one after another
+                   from the same loaded source
+    batch        - the same outputs through extract_batch() with --workers
+
+and reports pages/sec, bytes written, peak RSS, and where in-process time
+went: load, page lookup (PdfReader), PdfWriter.add_page, overrides and
+PdfWriter.write. The batch scenario runs in worker processes, so it only
+reports totals.
+
+--engines runs every case once per extraction engine (PDFService.ENGINES)
+so they can be compared on the same fixtures; the pymupdf engine's time is
+all reported as 'other'. check_engine_parity.py verifies that both engines
+produce the same pages.
+
+Usage:
+    python benchmarks/bench_extract.py [--kinds text,shared] [--pages 100,1000]
+        [--scenarios load,extract_all,stream,optimize,rotate_crop,split,batch] [--chunk 10]
+        [--engines pypdf2,pymupdf] [--mmap] [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PyPDF2 import PdfReader, PdfWriter
+
+from common import (environment, load_results, peak_rss_mb, run_case_subprocess,
+                    write_results)
+from fixtures import FIXTURE_KINDS, fixture_path
+from services.pdf_service import PDFService
+
+
+SCENARIOS = ('load', 'extract_all', 'stream', 'optimize', 'rotate_crop', 'split', 'batch')
+ROTATIONS = (90, 180, 270)
+CROP = (0.05, 0.05, 0.95, 0.95)
+
+
+class PhaseTimer:
+    """
+    Accumulates time spent in PyPDF2 calls made by PDFService.
+
+    While active, PdfReader._get_page, PdfWriter.add_page and PdfWriter.write
+    are wrapped with timers; the originals are restored on exit.
+    """
+
+    PHASES = {
+        'page_lookup': (PdfReader, '_get_page'),
+        'add_page': (PdfWriter, 'add_page'),
+        'write': (PdfWriter, 'write'),
+    }
+
+    def __init__(self):
+        self.seconds = {name: 0.0 for name in self.PHASES}
+
+    @contextlib.contextmanager
+    def active(self):
+        originals = {}
+        for name, (cls, attr) in self.PHASES.items():
+            originals[name] = getattr(cls, attr)
+            setattr(cls, attr, self._timed(name, originals[name]))
+        try:
+            yield self
+        finally:
+            for name, (cls, attr) in self.PHASES.items():
+                setattr(cls, attr, originals[name])
+
+    def _timed(self, name, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.seconds[name] += time.perf_counter() - start
+        return wrapper
+
+
+def make_jobs(pages: int, scenario: str, chunk: int, out_dir: str) -> list:
+    """Output files for a scenario, as extract_batch() job dicts."""
+    all_pages = list(range(1, pages + 1))
+    if scenario in ('extract_all', 'stream', 'optimize'):
+        return [{'pages': all_pages, 'output_path': os.path.join(out_dir, 'all.pdf'),
+                 'streaming': scenario == 'stream', 'optimize': scenario == 'optimize'}]
+    if scenario == 'rotate_crop':
+        return [{
+            'pages': all_pages,
+            'output_path': os.path.join(out_dir, 'rotated.pdf'),
+            'rotation_overrides': {p: ROTATIONS[p % len(ROTATIONS)] for p in all_pages},
+            'crop_overrides': {p: CROP for p in all_pages},
+        }]
+    return [
+        {'pages': all_pages[i:i + chunk], 'output_path': os.path.join(out_dir, f"part_{i // chunk:05d}.pdf")}
+        for i in range(0, pages, chunk)
+    ]
+
+
+def run_case(kind: str, pages: int, scenario: str, fixture_dir: str,
+             chunk: int, workers: int, use_mmap: bool = False, engine: str = 'pypdf2') -> dict:
+    """Run one scenario on one fixture (in the current process)."""
+    pdf_path = fixture_path(fixture_dir, kind, pages)
+    timer = PhaseTimer()
+    service = PDFService(extraction_engine=engine)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        with timer.active():
+            success, message = service.load_pdf(pdf_path, use_mmap=use_mmap)
+            if not success:
+                raise RuntimeError(message)
+            loaded = time.perf_counter()
+
+            jobs = [] if scenario == 'load' else make_jobs(pages, scenario, chunk, out_dir)
+            if scenario == 'batch':
+                results = service.extract_batch(jobs, max_workers=workers or None)
+            else:
+                results = [
+                    service.extract_pages(job['pages'], job['output_path'],
+                                          job.get('rotation_overrides'),
+                                          crop_overrides=job.get('crop_overrides'),
+                                          streaming=job.get('streaming', False),
+                                          optimize=job.get('optimize', False))
+                    for job in jobs
+                ]
+        elapsed = time.perf_counter() - start
+
+        failures = [message for ok, message in results if not ok]
+        bytes_written = sum(os.path.getsize(job['output_path']) for job in jobs
+                            if os.path.exists(job['output_path']))
+    service.close()
+
+    pages_written = sum(len(job['pages']) for job in jobs)
+    extract_time = elapsed - (loaded - start)
+    result = {
+        'kind': kind,
+        'pages': pages,
+        'scenario': scenario,
+        'engine': engine,
+        'file_bytes': os.path.getsize(pdf_path),
+        'mmap': use_mmap,
+        'outputs': len(jobs),
+        'failed': len(failures),
+        'first_error': failures[0] if failures else None,
+        'pages_written': pages_written,
+        'bytes_written': bytes_written,
+        'total_s': elapsed,
+        'load_s': loaded - start,
+        'load_timings': service.load_timings,
+        'extract_s': extract_time,
+        'pages_per_s': pages_written / extract_time if pages_written and extract_time else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    if scenario == 'batch':
+        result['workers'] = workers or os.cpu_count()
+    else:
+        phases = dict(timer.seconds)
+        phases['other'] = max(0.0, extract_time - sum(phases.values()))
+        result['phases_s'] = phases
+    return result
+
+
+def print_summary(results: list, baseline: dict = None):
+    """Human-readable table, with ratios against a baseline result file if given."""
+    previous = {}
+    for entry in (baseline or {}).get('results', []):
+        previous[(entry.get('kind'), entry.get('pages'), entry.get('scenario'),
+                  entry.get('engine', 'pypdf2'))] = entry
+
+    print(f"{'kind':<7} {'pages':>6} {'scenario':<12} {'engine':<8} {'load s':>8} {'extract s':>10} "
+          f"{'pages/s':>9} {'MB out':>8} {'rss MB':>7}  lookup/add/write/other s   vs baseline")
+    for r in results:
+        if 'error' in r:
+            print(f"{r['kind']:<7} {r['pages']:>6} {r['scenario']:<12} {r['engine']:<8} {r['error']}")
+            continue
+        phases = r.get('phases_s')
+        split = '/'.join(f"{phases[k]:.2f}" for k in ('page_lookup', 'add_page', 'write', 'other')) if phases else '-'
+        old = previous.get((r['kind'], r['pages'], r['scenario'], r['engine']), {})
+        ratio = f"{r['total_s'] / old['total_s']:.2f}x" if old.get('total_s') else ''
+        rate = f"{r['pages_per_s']:9.0f}" if r['pages_per_s'] else f"{'-':>9}"
+        print(f"{r['kind']:<7} {r['pages']:>6} {r['scenario']:<12} {r['engine']:<8} {r['load_s']:8.3f} "
+              f"{r['extract_s']:10.3f} {rate} {r['bytes_written'] / 1e6:8.1f} "
+              f"{r.get('peak_rss_mb', {}).get('self', 0):7.0f}  {split:<25} {ratio}")
+        if r['failed']:
+            print(f"    {r['failed']} output(s) failed: {r['first_error']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--kinds', default='text,shared',
+                        help=f"Fixture kinds from {','.join(FIXTURE_KINDS)} (default: text,shared)")
+    parser.add_argument('--pages', default='100,1000',
+                        help='Page counts, e.g. 100,1000,5000 (default: 100,1000)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help='Scenarios to run (default: all)')
+    parser.add_argument('--chunk', type=int, default=10,
+                        help='Pages per output in the split and batch scenarios (default: 10)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Worker processes for the batch scenario (default: CPU count)')
+    parser.add_argument('--engines', default='pypdf2',
+                        help=f"Extraction engines from {','.join(PDFService.ENGINES)} (default: pypdf2)")
+    parser.add_argument('--mmap', action='store_true',
+                        help='Load the source through a memory mapping (load_pdf(use_mmap=True))')
+    parser.add_argument('--fixture-dir', default=os.path.join(tempfile.gettempdir(), 'dpdf-bench-fixtures'),
+                        help='Where generated fixtures are cached')
+    parser.add_argument('-o', '--output', help='Write JSON results to this file')
+    parser.add_argument('--compare', help='Earlier JSON results to compare total time against')
+    parser.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+    parser.add_argument('--case', help=argparse.SUPPRESS)  # kind:pages:scenario:engine, internal
+    args = parser.parse_args(argv)
+
+    if args.case:
+        kind, pages, scenario, engine = args.case.split(':')
+        print(json.dumps(run_case(kind, int(pages), scenario, args.fixture_dir,
+                                  max(1, args.chunk), args.workers, args.mmap, engine)))
+        return 0
+
+    kinds = [k for k in args.kinds.split(',') if k]
+    page_counts = [int(p) for p in args.pages.split(',') if p]
+    scenarios = [s for s in args.scenarios.split(',') if s]
+    engines = [e for e in args.engines.split(',') if e]
+    for name in scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario '{name}'")
+    for name in engines:
+        if name not in PDFService.ENGINES:
+            parser.error(f"unknown engine '{name}'")
+
+    results = []
+    for kind in kinds:
+        for pages in page_counts:
+            fixture_path(args.fixture_dir, kind, pages)  # Generate outside the timed runs
+            for scenario in scenarios:
+                for engine in engines:
+                    if not args.json:
+                        print(f"  {kind} x {pages} pages: {scenario} ({engine}) ...", file=sys.stderr)
+                    results.append(run_case_subprocess(
+                        __file__, f"{kind}:{pages}:{scenario}:{engine}",
+                        ['--fixture-dir', args.fixture_dir, '--chunk', str(args.chunk),
+                         '--workers', str(args.workers)] + (['--mmap'] if args.mmap else []),
+                        {'kind': kind, 'pages': pages, 'scenario': scenario, 'engine': engine},
+                    ))
+
+    if args.output:
+        write_results(args.output, results)
+
+    if args.json:
+        print(json.dumps({'environment': environment(), 'results': results}, indent=2))
+    else:
+        print_summary(results, load_results(args.compare) if args.compare else None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
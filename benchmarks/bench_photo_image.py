@@ -0,0 +1,114 @@
+"""
+Micro-benchmark: per-thumbnail cost of pixmap -> PIL -> Tk conversion
+
+Compares the previous path (unused PPM encode + frombytes copy +
+ImageTk.PhotoImage) with the current one (frombuffer over the pixmap
+samples + PPM data handed to tk.PhotoImage). The Tk half needs a display
+and is skipped without one.
+
+Usage:
+    python benchmarks/bench_photo_image.py [--width 240] [--iterations 200] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageTk
+
+from utils.image_utils import to_photo_image
+
+
+def make_sample_pdf(path: str):
+    """One A4 page with text and vector shapes - a typical grid thumbnail."""
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    for i in range(60):
+        page.insert_text((40, 40 + i * 13), f"Line {i:03d} " + "lorem ipsum dolor sit amet " * 3, fontsize=9)
+    for i in range(40):
+        page.draw_circle((300, 420), 10 + i * 6, color=(i / 40, 0.2, 1 - i / 40))
+    doc.save(path)
+    doc.close()
+
+
+def time_per_call(func, iterations: int) -> float:
+    """Average microseconds per call."""
+    func()  # Warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--width', type=int, default=240, help='Thumbnail width (default: 240)')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, 'sample.pdf')
+        make_sample_pdf(pdf_path)
+        doc = fitz.open(pdf_path)
+        page = doc.load_page(0)
+        zoom = args.width / page.rect.width
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        size = (pix.width, pix.height)
+
+        def old_to_pil():
+            pix.tobytes("ppm")
+            return Image.frombytes("RGB", size, pix.samples)
+
+        def new_to_pil():
+            return Image.frombuffer("RGB", size, pix.samples, "raw", "RGB", 0, 1)
+
+        results = {
+            'width': args.width,
+            'height': pix.height,
+            'iterations': args.iterations,
+            'render_us': time_per_call(
+                lambda: page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False),
+                args.iterations,
+            ),
+            'pixmap_to_pil_old_us': time_per_call(old_to_pil, args.iterations),
+            'pixmap_to_pil_new_us': time_per_call(new_to_pil, args.iterations),
+        }
+        doc.close()
+
+    img = new_to_pil()
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        results['pil_to_tk_imagetk_us'] = time_per_call(
+            lambda: ImageTk.PhotoImage(img, master=root), args.iterations
+        )
+        results['pil_to_tk_ppm_us'] = time_per_call(
+            lambda: to_photo_image(img, master=root), args.iterations
+        )
+        root.destroy()
+    except Exception as e:
+        results['tk_skipped'] = str(e)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"Thumbnail {results['width']}x{results['height']}, {args.iterations} iterations")
+    for key, value in results.items():
+        if key.endswith('_us'):
+            print(f"  {key[:-3]:<24} {value:10.1f} us")
+    if 'tk_skipped' in results:
+        print(f"  Tk conversion skipped: {results['tk_skipped']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""
+Rendering benchmark: ThumbnailService and grid population
+
+For each fixture (kind x page count) runs, in a fresh process:
+    thumbnail - get_thumbnail() for every page in-process, cold, then again
+                from the persistent cache (new service) and from memory
+    grid      - the GridView path without widgets: a RenderScheduler in front
+                of a ThumbnailService with a worker pool, viewport at the top
+                of the document, completions polled like the Tk loop does
+    gridview  - the real GridView.load_pdf() in a Tk window (skipped without
+                a display); only the pages it actually requests are counted
+
+and reports time-to-first-thumbnail, time-to-all-thumbnails, per-page render
+percentiles, peak RSS and cache hit rates as JSON.
+
+Usage:
+    python benchmarks/bench_render.py [--kinds text,vector,image] [--pages 10,100,1000]
+        [--scenarios thumbnail,grid,gridview] [--output results.json]
+        [--compare baseline.json]
+
+Fixtures are cached in --fixture-dir (default: the system temp directory),
+so later runs and runs on other commits measure identical files.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from common import (environment, load_results, peak_rss_mb, percentiles,
+                    run_case_subprocess, write_results)
+from fixtures import FIXTURE_KINDS, fixture_path
+from services.render_pool import RenderWorkerPool
+from services.render_scheduler import RenderScheduler
+from services.thumbnail_cache import DiskThumbnailCache
+from services.thumbnail_service import ThumbnailService
+
+
+SCENARIOS = ('thumbnail', 'grid', 'gridview')
+GRID_WIDTH = 240          # GridView.THUMB_RENDER_WIDTH
+VIEWPORT_PAGES = 12       # 4 columns x 3 rows on a typical window
+POLL_INTERVAL = 0.001     # Seconds between completion polls in the grid scenario
+CASE_TIMEOUT = 900        # Seconds before a grid run is abandoned
+
+
+def hit_rate(stats: dict) -> float:
+    """Hits over lookups for a cache's get_stats() dict."""
+    lookups = stats.get('hits', 0) + stats.get('misses', 0)
+    return stats.get('hits', 0) / lookups if lookups else 0.0
+
+
+def bench_thumbnail(pdf_path: str, pages: int, work_dir: str) -> dict:
+    """Cold in-process renders, then persistent-cache and memory-cache passes."""
+    disk_path = os.path.join(work_dir, 'thumbnails.db')
+
+    service = ThumbnailService(disk_cache=DiskThumbnailCache(disk_path))
+    page_ms = []
+    start = time.perf_counter()
+    first = None
+    for page_num in range(1, pages + 1):
+        t0 = time.perf_counter()
+        service.get_thumbnail(pdf_path, page_num, GRID_WIDTH)
+        page_ms.append((time.perf_counter() - t0) * 1000)
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    service.close()
+
+    # Reopen: memory is empty, every page should come from the disk cache
+    service = ThumbnailService(disk_cache=DiskThumbnailCache(disk_path))
+    t0 = time.perf_counter()
+    for page_num in range(1, pages + 1):
+        service.get_thumbnail(pdf_path, page_num, GRID_WIDTH)
+    disk_total = time.perf_counter() - t0
+
+    # Same service again: memory hits for whatever fit in the budget
+    t0 = time.perf_counter()
+    for page_num in range(1, pages + 1):
+        service.get_thumbnail(pdf_path, page_num, GRID_WIDTH)
+    memory_total = time.perf_counter() - t0
+    stats = service.get_stats()
+    service.close()
+
+    return {
+        'time_to_first_s': first,
+        'time_to_all_s': total,
+        'pages_per_s': pages / total if total else None,
+        'render_ms': percentiles(page_ms),
+        'warm_disk_time_to_all_s': disk_total,
+        'warm_memory_time_to_all_s': memory_total,
+        'cache': {
+            'grid_hit_rate': hit_rate(stats['grid_cache']),
+            'disk_hit_rate': hit_rate(stats.get('disk_cache', {})),
+            'document_hit_rate': hit_rate(stats['documents']),
+            'stats': stats,
+        },
+    }
+
+
+def bench_grid(pdf_path: str, pages: int, workers: int) -> dict:
+    """Scheduler + worker pool, polled the way MainWindow polls process_completed()."""
+    pool = RenderWorkerPool(workers)
+    service = ThumbnailService(render_pool=pool)
+    scheduler = RenderScheduler(service, GRID_WIDTH)
+    scheduler.reset(pdf_path)
+    # Keep every page in the prefetch window so nothing is cancelled
+    scheduler.set_viewport(1, min(pages, VIEWPORT_PAGES), prefetch=pages)
+
+    delivered = {}
+    start = time.perf_counter()
+
+    def on_image(page_num, img):
+        delivered[page_num] = (time.perf_counter() - start, img is not None)
+
+    for page_num in range(1, pages + 1):
+        scheduler.request(page_num, lambda img, p=page_num: on_image(p, img))
+
+    while len(delivered) < pages and time.perf_counter() - start < CASE_TIMEOUT:
+        scheduler.pump(None if service.renders_in_background else 1)
+        if service.process_completed() == 0 and service.renders_in_background:
+            time.sleep(POLL_INTERVAL)
+    stats = service.get_stats()
+    background = service.renders_in_background
+    service.close()
+
+    times = sorted(t for t, _ in delivered.values())
+    viewport = [delivered[p][0] for p in range(1, min(pages, VIEWPORT_PAGES) + 1) if p in delivered]
+    return {
+        'workers': pool.max_workers,
+        'background': background,
+        'completed': len(delivered),
+        'failed': sum(1 for _, ok in delivered.values() if not ok),
+        'time_to_first_s': times[0] if times else None,
+        'time_to_viewport_s': max(viewport) if len(viewport) == min(pages, VIEWPORT_PAGES) else None,
+        'time_to_all_s': times[-1] if len(times) == pages else None,
+        'scheduler': scheduler.get_stats(),
+        'cache': {
+            'grid_hit_rate': hit_rate(stats['grid_cache']),
+            'stats': stats,
+        },
+    }
+
+
+def bench_gridview(pdf_path: str, pages: int, workers: int) -> dict:
+    """The real widget: GridView.load_pdf() in a 1200x800 window."""
+    import tkinter as tk
+    from gui.components.grid_view import GridView
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        return {'skipped': str(e)}
+    root.geometry('1200x800')
+
+    pool = RenderWorkerPool(workers)
+    service = ThumbnailService(render_pool=pool)
+    grid = GridView(root, thumbnail_service=service, on_selection_change=lambda pages: None)
+    grid.pack(fill='both', expand=True)
+    root.update()
+
+    applied = []
+    start = time.perf_counter()
+    apply_image = grid._apply_image
+
+    def timed_apply(page_num, path, img):
+        apply_image(page_num, path, img)
+        if img is not None:
+            applied.append(time.perf_counter() - start)
+
+    grid._apply_image = timed_apply
+    grid.load_pdf(pdf_path, pages)
+    load_returned = time.perf_counter() - start
+
+    # Run the event loop until the grid stops asking for renders
+    idle_since = None
+    while time.perf_counter() - start < CASE_TIMEOUT:
+        service.process_completed()
+        root.update()
+        stats = grid._scheduler.get_stats()
+        if applied and not stats['queued'] and not stats['in_flight']:
+            idle_since = idle_since or time.perf_counter()
+            if time.perf_counter() - idle_since > 0.25:
+                break
+        else:
+            idle_since = None
+        time.sleep(POLL_INTERVAL)
+
+    result = {
+        'workers': pool.max_workers,
+        'virtualized': grid.virtualized,
+        'load_pdf_returned_s': load_returned,
+        'thumbnails_shown': len(applied),
+        'time_to_first_s': applied[0] if applied else None,
+        'time_to_all_requested_s': applied[-1] if applied else None,
+        'scheduler': grid._scheduler.get_stats(),
+    }
+    service.close()
+    root.destroy()
+    return result
+
+
+def run_case(kind: str, pages: int, scenario: str, fixture_dir: str, workers: int) -> dict:
+    """Run one scenario on one fixture (in the current process)."""
+    pdf_path = fixture_path(fixture_dir, kind, pages)
+    with tempfile.TemporaryDirectory() as work_dir:
+        if scenario == 'thumbnail':
+            result = bench_thumbnail(pdf_path, pages, work_dir)
+        elif scenario == 'grid':
+            result = bench_grid(pdf_path, pages, workers)
+        else:
+            result = bench_gridview(pdf_path, pages, workers)
+    result.update({
+        'kind': kind,
+        'pages': pages,
+        'scenario': scenario,
+        'file_bytes': os.path.getsize(pdf_path),
+        'peak_rss_mb': peak_rss_mb(),
+    })
+    return result
+
+
+def print_summary(results: list, baseline: dict = None):
+    """Human-readable table, with ratios against a baseline result file if given."""
+    previous = {}
+    for entry in (baseline or {}).get('results', []):
+        previous[(entry.get('kind'), entry.get('pages'), entry.get('scenario'))] = entry
+
+    print(f"{'kind':<7} {'pages':>6} {'scenario':<10} {'first s':>9} {'all s':>9} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'rss MB':>8}  vs baseline")
+    for r in results:
+        if 'error' in r or 'skipped' in r:
+            print(f"{r['kind']:<7} {r['pages']:>6} {r['scenario']:<10} "
+                  f"{r.get('error') or r.get('skipped')}")
+            continue
+        total = r.get('time_to_all_s') or r.get('time_to_all_requested_s')
+        render = r.get('render_ms', {})
+        rss = r.get('peak_rss_mb', {}).get('self')
+        old = previous.get((r['kind'], r['pages'], r['scenario']), {})
+        old_total = old.get('time_to_all_s') or old.get('time_to_all_requested_s')
+        ratio = f"{total / old_total:.2f}x" if total and old_total else ''
+
+        def fmt(value, spec):
+            width = int(spec.split('.')[0])
+            return format(value, spec) if value is not None else '-'.rjust(width)
+
+        print(f"{r['kind']:<7} {r['pages']:>6} {r['scenario']:<10} "
+              f"{fmt(r.get('time_to_first_s'), '9.3f')} {fmt(total, '9.2f')} "
+              f"{fmt(render.get('p50'), '8.1f')} {fmt(render.get('p99'), '8.1f')} "
+              f"{fmt(rss, '8.0f')}  {ratio}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--kinds', default=','.join(FIXTURE_KINDS),
+                        help='Fixture kinds (default: all)')
+    parser.add_argument('--pages', default='10,100,1000',
+                        help='Page counts, e.g. 10,100,1000,5000 (default: 10,100,1000)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help='Scenarios to run (default: all)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Render worker processes for grid scenarios (default: automatic)')
+    parser.add_argument('--fixture-dir', default=os.path.join(tempfile.gettempdir(), 'dpdf-bench-fixtures'),
+                        help='Where generated fixtures are cached')
+    parser.add_argument('-o', '--output', help='Write JSON results to this file')
+    parser.add_argument('--compare', help='Earlier JSON results to compare time-to-all against')
+    parser.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+    parser.add_argument('--case', help=argparse.SUPPRESS)  # kind:pages:scenario, internal
+    args = parser.parse_args(argv)
+
+    if args.case:
+        kind, pages, scenario = args.case.split(':')
+        print(json.dumps(run_case(kind, int(pages), scenario, args.fixture_dir, args.workers)))
+        return 0
+
+    kinds = [k for k in args.kinds.split(',') if k]
+    page_counts = [int(p) for p in args.pages.split(',') if p]
+    scenarios = [s for s in args.scenarios.split(',') if s]
+    for name in scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario '{name}'")
+
+    results = []
+    for kind in kinds:
+        for pages in page_counts:
+            fixture_path(args.fixture_dir, kind, pages)  # Generate outside the timed runs
+            for scenario in scenarios:
+                if not args.json:
+                    print(f"  {kind} x {pages} pages: {scenario} ...", file=sys.stderr)
+                results.append(run_case_subprocess(
+                    __file__, f"{kind}:{pages}:{scenario}",
+                    ['--fixture-dir', args.fixture_dir, '--workers', str(args.workers)],
+                    {'kind': kind, 'pages': pages, 'scenario': scenario},
+                ))
+
+    if args.output:
+        write_results(args.output, results)
+
+    if args.json:
+        print(json.dumps({'environment': environment(), 'results': results}, indent=2))
+    else:
+        print_summary(results, load_results(args.compare) if args.compare else None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Micro-benchmark: thumbnailing scanned pages (one full-page JPEG each)
+
+Compares a normal PyMuPDF render with decoding the page's JPEG directly in
+PIL draft mode (libjpeg DCT scaling), and with scaling a stored /Thumb
+image (services.embedded_images). Every page gets a distinct image and the
+document is reopened per pass, so no decoded image is reused.
+
+Usage:
+    python benchmarks/bench_scan_decode.py [--pages 20] [--width 240] [--mode RGB] [--json]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageDraw
+
+from services.embedded_images import page_image, render_size
+
+
+def make_scan_pdf(path: str, pages: int, mode: str, with_thumbs: bool):
+    """Letter-size pages at 300 dpi, each a distinct JPEG, optionally with a /Thumb."""
+    doc = fitz.open()
+    for i in range(pages):
+        scan = Image.new(mode, (2550, 3300), 'white')
+        draw = ImageDraw.Draw(scan)
+        for row in range(120):
+            y = 100 + row * 26
+            draw.text((150 + (i * 7) % 50, y), f"Page {i + 1} line {row} " * 6, fill='black')
+        buf = io.BytesIO()
+        scan.save(buf, 'JPEG', quality=85)
+        page = doc.new_page(width=612, height=792)
+        page.insert_image(page.rect, stream=buf.getvalue())
+        if with_thumbs:
+            thumb = scan.convert('RGB').resize((306, 396), Image.Resampling.LANCZOS)
+            buf = io.BytesIO()
+            thumb.save(buf, 'JPEG', quality=85)
+            xref = doc.get_new_xref()
+            doc.update_object(xref, "<< /Type /XObject /Subtype /Image /Width 306 /Height 396 "
+                                    "/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode >>")
+            doc.update_stream(xref, buf.getvalue(), compress=False)
+            doc.xref_set_key(page.xref, "Thumb", f"{xref} 0 R")
+    doc.save(path)
+    doc.close()
+
+
+def draft_decode(doc: fitz.Document, page: fitz.Page, width: int) -> Image.Image:
+    """Candidate fast path: pull the page's JPEG stream and decode it in draft mode."""
+    xref = page.get_images(full=True)[0][0]
+    img = Image.open(io.BytesIO(doc.xref_stream_raw(xref)))
+    size = render_size(page, width)
+    img.draft(img.mode, size)
+    return img.convert('RGB').resize(size, Image.Resampling.LANCZOS)
+
+
+def render(doc: fitz.Document, page: fitz.Page, width: int) -> Image.Image:
+    zoom = width / page.rect.width
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    return Image.frombuffer("RGB", (pix.width, pix.height), pix.samples, "raw", "RGB", 0, 1)
+
+
+def time_per_page(pdf_path: str, func, width: int) -> float:
+    """Average milliseconds per page on a freshly opened document."""
+    doc = fitz.open(pdf_path)
+    start = time.perf_counter()
+    for page in doc:
+        if func(doc, page, width) is None:
+            raise RuntimeError("fast path did not apply")
+    elapsed = time.perf_counter() - start
+    count = doc.page_count
+    doc.close()
+    return elapsed / count * 1000
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--width', type=int, default=240, help='Thumbnail width (default: 240)')
+    parser.add_argument('--mode', choices=['RGB', 'L'], default='RGB', help='Scan colour mode')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, 'scan.pdf')
+        make_scan_pdf(pdf_path, args.pages, args.mode, with_thumbs=args.width <= 306)
+        results = {
+            'pages': args.pages,
+            'width': args.width,
+            'mode': args.mode,
+            'render_ms': time_per_page(pdf_path, render, args.width),
+            'jpeg_draft_ms': time_per_page(pdf_path, draft_decode, args.width),
+        }
+        if args.width <= 306:
+            results['embedded_thumb_ms'] = time_per_page(pdf_path, page_image, args.width)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{args.pages} scanned pages ({args.mode}) at {args.width}px, per page:")
+    for key, value in results.items():
+        if key.endswith('_ms'):
+            print(f"  {key[:-3]:<16} {value:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
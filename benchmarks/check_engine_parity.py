@@ -0,0 +1,161 @@
+"""
+Extraction engine parity check: pypdf2 vs pymupdf
+
+Extracts the same pages with every engine in PDFService.ENGINES and checks
+that the outputs agree page by page: page count, effective rotation,
+media box, crop box, text, and a low-resolution render of each page.
+
+Sources are the benchmark fixtures plus a copy of each with mixed /Rotate
+values and an offset media box, so rotation overrides stack on existing
+rotations and crops are mapped from a non-zero origin. Each source runs:
+
+    all          - every page, no overrides
+    rotate_crop  - every page rotated by 90/180/270 and cropped differently
+    reorder      - pages reversed, with duplicates
+
+Usage:
+    python benchmarks/check_engine_parity.py [--kinds text,shared,image] [--pages 12]
+
+Exits with status 1 if any output differs.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import fitz  # PyMuPDF
+
+from fixtures import FIXTURE_KINDS, fixture_path
+from services.pdf_service import PDFService
+
+
+ROTATIONS = (90, 180, 270)
+CROPS = ((0.1, 0.1, 0.9, 0.9), (0.0, 0.5, 0.5, 1.0), (0.25, 0.0, 1.0, 0.4))
+BOX_TOLERANCE = 0.01   # points
+PIXEL_TOLERANCE = 8    # max per-channel difference in the comparison render
+RENDER_DPI = 36
+
+
+def make_rotated_copy(source: str, path: str):
+    """Copy a PDF, giving pages mixed /Rotate values and an offset media box."""
+    doc = fitz.open(source)
+    for index, page in enumerate(doc):
+        x0, y0, x1, y1 = page.mediabox
+        doc.xref_set_key(page.xref, 'MediaBox', f"[{x0 + 20} {y0 + 30} {x1 + 20} {y1 + 30}]")
+        page.set_rotation((0, 90, 180, 270)[index % 4])
+    doc.save(path)
+    doc.close()
+
+
+def make_cases(pages: int) -> dict:
+    """name -> (page list, rotation overrides, crop overrides)"""
+    all_pages = list(range(1, pages + 1))
+    return {
+        'all': (all_pages, {}, {}),
+        'rotate_crop': (
+            all_pages,
+            {p: ROTATIONS[p % len(ROTATIONS)] for p in all_pages},
+            {p: CROPS[p % len(CROPS)] for p in all_pages},
+        ),
+        'reorder': (list(reversed(all_pages)) + all_pages[:3], {2: 90}, {3: CROPS[0]}),
+    }
+
+
+def describe(path: str) -> list:
+    """Per-page facts to compare between engines."""
+    doc = fitz.open(path)
+    pages = []
+    for page in doc:
+        pixmap = page.get_pixmap(dpi=RENDER_DPI)
+        pages.append({
+            'rotation': page.rotation % 360,
+            'mediabox': tuple(page.mediabox),
+            'cropbox': tuple(page.cropbox),
+            'text': page.get_text(),
+            'size': (pixmap.width, pixmap.height),
+            'samples': pixmap.samples,
+        })
+    doc.close()
+    return pages
+
+
+def compare(expected: list, actual: list) -> list:
+    """Differences between two describe() results, as messages."""
+    if len(expected) != len(actual):
+        return [f"page count {len(expected)} != {len(actual)}"]
+    problems = []
+    for number, (a, b) in enumerate(zip(expected, actual), start=1):
+        if a['rotation'] != b['rotation']:
+            problems.append(f"page {number}: rotation {a['rotation']} != {b['rotation']}")
+        for box in ('mediabox', 'cropbox'):
+            if any(abs(x - y) > BOX_TOLERANCE for x, y in zip(a[box], b[box])):
+                problems.append(f"page {number}: {box} {a[box]} != {b[box]}")
+        if a['text'] != b['text']:
+            problems.append(f"page {number}: text differs")
+        if a['size'] != b['size']:
+            problems.append(f"page {number}: render size {a['size']} != {b['size']}")
+        elif a['samples'] != b['samples']:
+            worst = max(abs(x - y) for x, y in zip(a['samples'], b['samples']))
+            if worst > PIXEL_TOLERANCE:
+                problems.append(f"page {number}: render differs (max channel diff {worst})")
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--kinds', default='text,shared,image',
+                        help=f"Fixture kinds from {','.join(FIXTURE_KINDS)} (default: text,shared,image)")
+    parser.add_argument('--pages', type=int, default=12, help='Pages per fixture (default: 12)')
+    parser.add_argument('--fixture-dir', default=os.path.join(tempfile.gettempdir(), 'dpdf-bench-fixtures'),
+                        help='Where generated fixtures are cached')
+    args = parser.parse_args(argv)
+
+    reference, *others = PDFService.ENGINES
+    failures = 0
+    with tempfile.TemporaryDirectory() as work_dir:
+        sources = []
+        for kind in [k for k in args.kinds.split(',') if k]:
+            plain = fixture_path(args.fixture_dir, kind, args.pages)
+            rotated = os.path.join(work_dir, f"{kind}_rotated.pdf")
+            make_rotated_copy(plain, rotated)
+            sources += [(kind, plain), (f"{kind}+rotate", rotated)]
+
+        for label, source in sources:
+            service = PDFService()
+            success, message = service.load_pdf(source)
+            if not success:
+                print(f"FAIL  {label}: {message}")
+                failures += 1
+                continue
+            for case, (pages, rotations, crops) in make_cases(service.page_count).items():
+                outputs = {}
+                for engine in PDFService.ENGINES:
+                    output = os.path.join(work_dir, f"{label}_{case}_{engine}.pdf")
+                    ok, message = service.extract_pages(pages, output, rotations,
+                                                        crop_overrides=crops, engine=engine)
+                    outputs[engine] = describe(output) if ok else message
+
+                problems = []
+                for engine in [reference] + others:
+                    if isinstance(outputs[engine], str):
+                        problems.append(f"{engine} failed: {outputs[engine]}")
+                if not problems:
+                    for engine in others:
+                        problems += [f"{engine}: {p}" for p in compare(outputs[reference], outputs[engine])]
+
+                status = 'FAIL' if problems else 'ok'
+                print(f"{status:<5} {label:<16} {case:<12} {len(pages)} page(s)")
+                for problem in problems[:10]:
+                    print(f"        {problem}")
+                failures += bool(problems)
+            service.close()
+
+    print(f"{failures} case(s) differ" if failures else "All engines agree")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Helpers shared by the benchmark scripts: summaries, memory, environment
+and running each case in a fresh interpreter.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import fitz  # PyMuPDF
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentiles(samples: list) -> dict:
+    """Summary of a list of durations in milliseconds."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        'mean': sum(ordered) / len(ordered),
+        'p50': pick(0.50),
+        'p90': pick(0.90),
+        'p99': pick(0.99),
+        'max': ordered[-1],
+    }
+
+
+def peak_rss_mb() -> dict:
+    """Peak resident set size of this process and of its reaped children."""
+    if resource is None:
+        return {}
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return {
+        'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale,
+    }
+
+
+def environment() -> dict:
+    """Describe the machine and code version so result files can be compared."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    try:
+        import PyPDF2
+        pypdf2 = PyPDF2.__version__
+    except ImportError:
+        pypdf2 = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pymupdf': fitz.VersionBind,
+        'pypdf2': pypdf2,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_case_subprocess(script: str, case: str, args: list, identity: dict) -> dict:
+    """
+    Run one case of a benchmark script in a fresh interpreter, so peak RSS
+    and caches start clean.
+
+    Args:
+        script: Path of the benchmark script (it must accept --case)
+        case: Value passed to --case
+        args: Further command-line arguments
+        identity: Keys identifying the case, returned with any error
+
+    Returns:
+        The JSON dict the case printed on its last line of output
+    """
+    cmd = [sys.executable, os.path.abspath(script), '--case', case] + args
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return dict(identity, error=lines[-1] if lines else f"exit {proc.returncode}")
+    # Services print errors to stdout; the result is the last line
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def load_results(path: str) -> dict:
+    """Read a results file written with --output."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_results(path: str, results: list):
+    """Write results together with the environment they were measured in."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
@@ -0,0 +1,141 @@
+"""
+Synthetic PDF fixtures for the benchmarks
+
+Documents are generated locally with PyMuPDF and cached by kind and page
+count, so repeated runs (and runs on different commits) measure the same
+files without shipping any binaries in the repository.
+
+Kinds:
+    text    - dense lines of Helvetica text, like reports and contracts
+    vector  - many stroked and filled paths, like drawings and charts
+    image   - one full-page JPEG per page, like scanner output
+    shared  - every page uses the same large image and embedded font, like
+              letterhead templates; stresses resource handling on extraction
+"""
+
+import io
+import os
+import random
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageDraw
+
+
+FIXTURE_KINDS = ('text', 'vector', 'image', 'shared')
+
+PAGE_WIDTH = 595   # A4 in points
+PAGE_HEIGHT = 842
+
+# Image pages cycle through this many distinct scans; a distinct JPEG per
+# page would make 5000-page fixtures several gigabytes
+SCAN_VARIANTS = 16
+
+
+def fixture_path(directory: str, kind: str, pages: int) -> str:
+    """
+    Get the path of a fixture, generating it on first use.
+
+    Args:
+        directory: Where fixtures are cached
+        kind: One of FIXTURE_KINDS
+        pages: Number of pages
+
+    Returns:
+        Path to the PDF
+    """
+    if kind not in FIXTURE_KINDS:
+        raise ValueError(f"Unknown fixture kind '{kind}' (expected one of {', '.join(FIXTURE_KINDS)})")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{kind}_{pages}.pdf")
+    if not os.path.exists(path):
+        make_fixture(path + '.part', kind, pages)
+        os.replace(path + '.part', path)
+    return path
+
+
+def make_fixture(path: str, kind: str, pages: int, seed: int = 0):
+    """Write a `pages`-page PDF of the given kind to `path`."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    scans = _make_scans(rng) if kind == 'image' else []
+    scan_xrefs = []
+    shared_xref = None
+
+    for i in range(pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        if kind == 'text':
+            _draw_text(page, i, rng)
+        elif kind == 'vector':
+            _draw_vectors(page, rng)
+        elif kind == 'shared':
+            shared_xref = _draw_shared(page, i, rng, shared_xref)
+        elif i < len(scans):
+            scan_xrefs.append(page.insert_image(page.rect, stream=scans[i]))
+        else:
+            page.insert_image(page.rect, xref=scan_xrefs[i % len(scans)])
+
+    doc.save(path, garbage=1, deflate=True)
+    doc.close()
+
+
+def _draw_text(page: fitz.Page, index: int, rng: random.Random):
+    words = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do "
+             "eiusmod tempor incididunt ut labore et dolore magna aliqua").split()
+    page.insert_text((50, 50), f"Page {index + 1}", fontsize=16)
+    lines = [" ".join(rng.choice(words) for _ in range(14)) for _ in range(64)]
+    page.insert_text((50, 80), lines, fontsize=9, lineheight=1.3)
+
+
+def _draw_vectors(page: fitz.Page, rng: random.Random):
+    shape = page.new_shape()
+    for _ in range(400):
+        x, y = rng.uniform(20, PAGE_WIDTH - 60), rng.uniform(20, PAGE_HEIGHT - 60)
+        if rng.random() < 0.5:
+            shape.draw_line((x, y), (x + rng.uniform(-80, 80), y + rng.uniform(-80, 80)))
+        else:
+            shape.draw_rect(fitz.Rect(x, y, x + rng.uniform(5, 40), y + rng.uniform(5, 40)))
+        shape.finish(color=(rng.random(), rng.random(), rng.random()),
+                     fill=(rng.random(), rng.random(), rng.random()) if rng.random() < 0.3 else None,
+                     width=rng.uniform(0.2, 2.0))
+    for _ in range(40):
+        center = (rng.uniform(50, PAGE_WIDTH - 50), rng.uniform(50, PAGE_HEIGHT - 50))
+        shape.draw_circle(center, rng.uniform(5, 60))
+        shape.finish(color=(0, 0, 0), width=0.5)
+    shape.commit()
+
+
+def _draw_shared(page: fitz.Page, index: int, rng: random.Random,
+                 image_xref) -> int:
+    """Letterhead image and text in an embedded font; returns the image xref."""
+    if image_xref is None:
+        # Incompressible noise so the shared stream is a few megabytes
+        size = 1200 * 1200 * 3
+        logo = Image.frombytes('RGB', (1200, 1200), rng.getrandbits(size * 8).to_bytes(size, 'little'))
+        buf = io.BytesIO()
+        logo.save(buf, 'PNG', compress_level=1)
+        image_xref = page.insert_image(fitz.Rect(40, 30, 140, 130), stream=buf.getvalue())
+    else:
+        page.insert_image(fitz.Rect(40, 30, 140, 130), xref=image_xref)
+
+    page.insert_font(fontname='F0', fontbuffer=fitz.Font('tiro').buffer)
+    lines = [f"Section {index + 1}.{line} " + "shared resources " * 5 for line in range(50)]
+    page.insert_text((50, 160), lines, fontname='F0', fontsize=10, lineheight=1.3)
+    return image_xref
+
+
+def _make_scans(rng: random.Random) -> list:
+    """JPEG streams resembling 150 dpi grayscale-on-white scans."""
+    scans = []
+    for variant in range(SCAN_VARIANTS):
+        img = Image.new('RGB', (1240, 1754), (250, 248, 240))
+        draw = ImageDraw.Draw(img)
+        for row in range(70):
+            y = 100 + row * 22
+            draw.text((100 + rng.randint(0, 20), y), f"Scan {variant} line {row} " * 8, fill=(20, 20, 20))
+        for _ in range(3000):
+            x, y = rng.randrange(img.width), rng.randrange(img.height)
+            draw.point((x, y), fill=(rng.randint(150, 230),) * 3)
+        buf = io.BytesIO()
+        img.save(buf, 'JPEG', quality=80)
+        scans.append(buf.getvalue())
+    return scans
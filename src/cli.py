@@ -0,0 +1,280 @@
+"""
+dpdf-planner - Headless batch extraction
+
+Command-line entry point that extracts pages without a display, reusing the
+same services as the desktop app.
+
+Examples:
+    python src/cli.py report.pdf --pages 1-3,7 -o out/
+    python src/cli.py scans/*.pdf --pages 1 --rotate 1=90 --workers 8 -o covers/
+    python src/cli.py --jobs nightly.json --workers 8
+
+A jobs file is a JSON list of objects:
+    {"input": "a.pdf", "output": "out/a_1-3.pdf", "pages": "1-3",
+     "rotations": {"2": 90}, "crops": {"3": [0.1, 0.1, 0.9, 0.9]}}
+Only "input" is required; "pages" defaults to all pages and "output" to
+<output-dir>/<name><suffix>.pdf.
+"""
+
+import sys
+import os
+import argparse
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+
+# Add src to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services import instrumentation
+from services.pdf_service import PDFService
+from services.validation_service import ValidationService
+
+
+def _parse_overrides(items: Optional[List[str]], parse_value) -> dict:
+    """Parse repeated PAGE=VALUE options into {page_num: value}."""
+    overrides = {}
+    for item in items or []:
+        page_str, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f"Expected PAGE=VALUE, got '{item}'")
+        overrides[int(page_str)] = parse_value(value)
+    return overrides
+
+
+def _parse_rotation(value: str) -> int:
+    angle = int(value)
+    if angle % 90 != 0:
+        raise ValueError(f"Rotation must be a multiple of 90, got {angle}")
+    return angle % 360
+
+
+def _parse_crop(value) -> tuple:
+    if isinstance(value, str):
+        value = value.split(',')
+    crop = tuple(float(v) for v in value)
+    if len(crop) != 4:
+        raise ValueError(f"Crop needs 4 values (l,t,r,b), got {len(crop)}")
+    return crop
+
+
+def run_input_jobs(jobs: List[dict]) -> List[Tuple[str, bool, str, float]]:
+    """
+    Run the extraction jobs for one input file, parsing it only once.
+    Runs in a worker process when --workers > 1.
+
+    Args:
+        jobs: Dicts sharing the same 'input', each with 'output' and optional
+              'pages' (spec string or list of page numbers), 'rotations',
+              'crops', 'overwrite', 'streaming', 'engine' and 'optimize'; the first job's 'mmap'
+              decides how the input is read
+
+    Returns:
+        List of (input_path, success, message, elapsed_seconds) per job
+    """
+    start = time.perf_counter()
+    input_path = jobs[0]['input']
+
+    is_valid, error = ValidationService.validate_pdf_file(input_path)
+    if not is_valid:
+        return [(input_path, False, error, 0.0) for _ in jobs]
+
+    pdf_service = PDFService()
+    success, message = pdf_service.load_pdf(input_path, use_mmap=bool(jobs[0].get('mmap')))
+    if not success:
+        return [(input_path, False, message, 0.0) for _ in jobs]
+    load_time = time.perf_counter() - start
+
+    results = []
+    for job in jobs:
+        job_start = time.perf_counter()
+        success, message = _run_loaded_job(pdf_service, job)
+        # Attribute the shared load to the first job
+        elapsed = time.perf_counter() - job_start + (load_time if not results else 0.0)
+        results.append((input_path, success, message, elapsed))
+
+    pdf_service.close()
+    return results
+
+
+def _run_loaded_job(pdf_service: PDFService, job: dict) -> Tuple[bool, str]:
+    """Validate one job and extract it from an already loaded PDF."""
+    output_path = job['output']
+    is_valid, error = ValidationService.validate_output_path(output_path)
+    if not is_valid:
+        return False, error
+    if os.path.exists(output_path) and not job.get('overwrite'):
+        return False, f"{output_path} already exists (use --overwrite)"
+
+    try:
+        pages = job.get('pages', 'all')
+        if isinstance(pages, str):
+            pages, error = ValidationService.parse_page_spec(pages, pdf_service.page_count)
+            if error:
+                return False, error
+
+        rotations = {int(p): _parse_rotation(str(a)) for p, a in (job.get('rotations') or {}).items()}
+        crops = {int(p): _parse_crop(c) for p, c in (job.get('crops') or {}).items()}
+    except (TypeError, ValueError) as e:
+        return False, f"Invalid job: {e}"
+
+    return pdf_service.extract_pages(
+        pages, output_path, rotations,
+        crop_overrides=crops,
+        streaming=bool(job.get('streaming')),
+        engine=job.get('engine'),
+        optimize=bool(job.get('optimize')),
+    )
+
+
+def group_jobs_by_input(jobs: List[dict]) -> List[List[dict]]:
+    """Group jobs that read the same file so each input is parsed once."""
+    groups = {}
+    for job in jobs:
+        groups.setdefault(os.path.abspath(job['input']), []).append(job)
+    return list(groups.values())
+
+
+def _default_output(input_path: str, output_dir: Optional[str], suffix: str) -> str:
+    """Build <output_dir>/<input name><suffix>.pdf."""
+    base_name = os.path.splitext(os.path.basename(input_path))[0]
+    filename = ValidationService.sanitize_filename(f"{base_name}{suffix}")
+    directory = output_dir or os.path.dirname(os.path.abspath(input_path))
+    return os.path.join(directory, f"{filename}.pdf")
+
+
+def build_jobs(args) -> List[dict]:
+    """Turn parsed arguments (inputs and/or a jobs file) into a job list."""
+    rotations = _parse_overrides(args.rotate, _parse_rotation)
+    crops = _parse_overrides(args.crop, _parse_crop)
+
+    jobs = []
+    if args.jobs:
+        with open(args.jobs, 'r', encoding='utf-8') as f:
+            loaded = json.load(f)
+        if not isinstance(loaded, list):
+            raise ValueError("Jobs file must contain a JSON list")
+        for entry in loaded:
+            if not isinstance(entry, dict) or 'input' not in entry:
+                raise ValueError(f"Job entry needs an 'input': {entry!r}")
+            job = dict(entry)
+            job.setdefault('pages', args.pages)
+            job.setdefault('output', _default_output(job['input'], args.output_dir, args.suffix))
+            job.setdefault('rotations', rotations)
+            job.setdefault('crops', crops)
+            job.setdefault('overwrite', args.overwrite)
+            job.setdefault('streaming', args.streaming)
+            job.setdefault('mmap', args.mmap)
+            job.setdefault('engine', args.engine)
+            job.setdefault('optimize', args.optimize)
+            jobs.append(job)
+
+    for input_path in args.inputs:
+        jobs.append({
+            'input': input_path,
+            'output': _default_output(input_path, args.output_dir, args.suffix),
+            'pages': args.pages,
+            'rotations': rotations,
+            'crops': crops,
+            'overwrite': args.overwrite,
+            'streaming': args.streaming,
+            'mmap': args.mmap,
+            'engine': args.engine,
+            'optimize': args.optimize,
+        })
+
+    return jobs
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='dpdf-planner-cli',
+        description='Extract pages from PDF files without the GUI.',
+    )
+    parser.add_argument('inputs', nargs='*', help='Input PDF files')
+    parser.add_argument('--jobs', help='JSON file with a list of extraction jobs')
+    parser.add_argument('-p', '--pages', default='all',
+                        help='Pages to extract, e.g. "1-3,7,10-" (default: all)')
+    parser.add_argument('-r', '--rotate', action='append', metavar='PAGE=DEGREES',
+                        help='Rotate a page clockwise by a multiple of 90 (repeatable)')
+    parser.add_argument('-c', '--crop', action='append', metavar='PAGE=L,T,R,B',
+                        help='Crop a page to a normalized top-left-origin box (repeatable)')
+    parser.add_argument('-o', '--output-dir',
+                        help='Directory for outputs (default: next to each input)')
+    parser.add_argument('--suffix', default='_extracted',
+                        help='Suffix appended to input names for outputs (default: _extracted)')
+    parser.add_argument('--overwrite', action='store_true', help='Replace existing outputs')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Write pages to disk as they are copied (flat memory for large outputs)')
+    parser.add_argument('--mmap', action='store_true',
+                        help='Read inputs through a memory mapping (fewer system calls on network shares)')
+    parser.add_argument('--engine', choices=PDFService.ENGINES, default='pypdf2',
+                        help='Library that writes the outputs (default: pypdf2)')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Deduplicate and compress outputs, with object and xref streams')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='Number of input files to process in parallel (default: 1)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Only report failures')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLI entry point. Returns the process exit code."""
+    parser = create_parser()
+    args = parser.parse_args(argv)
+
+    if not args.inputs and not args.jobs:
+        parser.error("no input files or --jobs file given")
+
+    try:
+        jobs = build_jobs(args)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    
+    # Only DPDF_TRACE applies here; the GUI's config file isn't read
+    instrumentation.configure()
+
+    start = time.perf_counter()
+    failures = 0
+
+    def report(input_path: str, success: bool, message: str, elapsed: float):
+        nonlocal failures
+        if not success:
+            failures += 1
+            print(f"FAILED {input_path}: {message}", file=sys.stderr)
+        elif not args.quiet:
+            print(f"OK     {input_path}: {message} ({elapsed:.2f}s)")
+
+    groups = group_jobs_by_input(jobs)
+    workers = max(1, args.workers)
+    if workers == 1 or len(groups) == 1:
+        for group in groups:
+            for result in run_input_jobs(group):
+                report(*result)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run_input_jobs, group): group for group in groups}
+            for future in as_completed(futures):
+                try:
+                    for result in future.result():
+                        report(*result)
+                except Exception as e:
+                    for job in futures[future]:
+                        report(job['input'], False, f"Worker error: {e}", 0.0)
+
+    if not args.quiet:
+        elapsed = time.perf_counter() - start
+        print(f"{len(jobs) - failures}/{len(jobs)} job(s) succeeded in {elapsed:.2f}s")
+
+    instrumentation.shutdown()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
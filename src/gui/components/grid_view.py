@@ -1,27 +1,46 @@
 """
 Grid View Component - Displays PDF page thumbnails in a scrollable grid
 """
+import time
 import tkinter as tk
 from tkinter import ttk
 from typing import List, Callable, Optional, Set
-from PIL import ImageTk, Image
 
 from services.thumbnail_service import ThumbnailService
+from services.render_scheduler import RenderScheduler
+from services import instrumentation
+from utils.image_utils import to_photo_image
 
 class GridView(tk.Frame):
     """
     A scrollable grid of page thumbnails with selection capabilities.
+    
+    Documents with more than virtualize_threshold pages use a virtualized
+    layout: only the rows in and just around the viewport exist as widgets,
+    and a pool of cards is recycled as the user scrolls.
     """
     
+    # Virtualized layout geometry (pixels)
+    CARD_IMAGE_HEIGHT = 340  # A4 portrait at 240px wide
+    CARD_WIDTH = 246  # 240 image + 3px border each side
+    CARD_HEIGHT = 400
+    CELL_HEIGHT = 420
+    OVERSCAN_ROWS = 2  # Extra rows kept materialized above/below the viewport
+    PREFETCH_ROWS = 3  # Rows beyond the overscan whose renders are queued ahead
+    
+    THUMB_RENDER_WIDTH = 240
+    
     def __init__(self, parent, thumbnail_service: ThumbnailService, 
                  on_selection_change: Callable[[Set[int]], None], 
                  on_page_click: Optional[Callable[[int], None]] = None,
+                 virtualize_threshold: int = 100,
                  **kwargs):
         super().__init__(parent, **kwargs)
         
         self.thumbnail_service = thumbnail_service
         self.on_selection_change = on_selection_change
         self.on_page_click = on_page_click
+        self.virtualize_threshold = virtualize_threshold
         
         # State
         self.pdf_path: Optional[str] = None
@@ -31,6 +50,18 @@ class GridView(tk.Frame):
         self.crop_overrides: dict = {} # Map page_num -> (l, t, r, b) normalized [0..1]
         self.thumbnails: dict = {}  # Map page_num -> dict
         
+        # Virtualized mode state
+        self.virtualized: bool = False
+        self._card_pool: List[dict] = []  # Every recycled card, bound or free
+        self._free_cards: List[dict] = []
+        self._viewport_update_pending = False
+        
+        # Renders are queued by distance from the viewport
+        self._scheduler = RenderScheduler(thumbnail_service, self.THUMB_RENDER_WIDTH)
+        self._loaded_pages: Set[int] = set()
+        self._render_pump_scheduled = False
+        self._load_started = 0.0  # perf_counter() at load_pdf, for time-to-first-thumbnail
+        
         self._setup_ui()
     # ... (existing methods until _create_thumbnail_item or _load_image) ...
     
@@ -53,7 +84,7 @@ class GridView(tk.Frame):
         self.content_frame = tk.Frame(self.canvas, bg=self.canvas['bg'])
         
         # Configure scrolling
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.configure(yscrollcommand=self._on_canvas_scroll)
         self.canvas_window = self.canvas.create_window((0, 0), window=self.content_frame, anchor="nw")
         
         self.content_frame.bind("<Configure>", self._on_frame_configure)
@@ -72,8 +103,16 @@ class GridView(tk.Frame):
         
     def _on_frame_configure(self, event):
         """Reset the scroll region to encompass the inner frame."""
+        if self.virtualized:
+            return  # Scroll region is sized from the page count instead
         self.canvas.configure(scrollregion=self.canvas.bbox("all"))
         
+    def _on_canvas_scroll(self, first, last):
+        """Forward view changes to the scrollbar and refresh visible pages."""
+        self.scrollbar.set(first, last)
+        if self.total_pages > 0:
+            self._schedule_viewport_update()
+        
     def _on_canvas_configure(self, event):
         """Resize the inner frame to match the canvas width and re-grid if needed."""
         width = event.width
@@ -83,7 +122,13 @@ class GridView(tk.Frame):
         cols = max(1, width // self.thumb_width)
         if cols != self.current_cols and self.total_pages > 0:
             self.current_cols = cols
-            self._regrid()
+            if self.virtualized:
+                self._layout_virtual()
+            else:
+                self._regrid()
+        elif self.total_pages > 0:
+            # Height changes alter how many rows are visible
+            self._schedule_viewport_update()
         
     def _regrid(self):
         """Re-layout thumbnails based on current columns."""
@@ -93,6 +138,7 @@ class GridView(tk.Frame):
             col = idx % self.current_cols
             frame = self.thumbnails[page_num]['frame']
             frame.grid(row=row, column=col, sticky="nsew", padx=5, pady=5)
+        self._schedule_viewport_update()
             
     def _on_mousewheel(self, event):
         """Handle mousewheel scrolling."""
@@ -103,18 +149,33 @@ class GridView(tk.Frame):
         self.clear()
         self.pdf_path = pdf_path
         self.total_pages = total_pages
-        
+        self._scheduler.reset(pdf_path)
+        self._load_started = time.perf_counter()
+        with instrumentation.span('grid.load_pdf', pages=total_pages):
+            self._build_grid(total_pages)
+    
+    def _build_grid(self, total_pages: int):
+        """Create the cards (or the virtual layout) for a newly loaded PDF."""
         # Force update to get accurate width logic
         self.update_idletasks()
         width = self.canvas.winfo_width()
         if width > 1:
             self.current_cols = max(1, width // self.thumb_width)
             
+        self.virtualized = total_pages > self.virtualize_threshold
+        if self.virtualized:
+            self.canvas.itemconfigure(self.canvas_window, state='hidden')
+            self.canvas.yview_moveto(0)
+            self._layout_virtual()
+            return
+        self.canvas.itemconfigure(self.canvas_window, state='normal')
+            
         # Initial create widgets
         for i in range(total_pages):
             page_num = i + 1
             self._create_thumbnail_item(page_num)
             
+        self._schedule_viewport_update()
         # Trigger explicit regrid just in case
         self.after(100, self._regrid)
     def _create_thumbnail_item(self, page_num: int):
@@ -166,8 +227,166 @@ class GridView(tk.Frame):
             'crop_label': lbl_crop,
         }
         
-        # Asynchronously load
-        self.after(20 * page_num, lambda: self._load_image(page_num))
+        # Images are requested by _update_render_window once the page is
+        # near the viewport
+
+    # ---------------- Virtualized layout ----------------
+
+    def _layout_virtual(self):
+        """Size the scroll region from the page count and reposition bound cards."""
+        rows = (self.total_pages + self.current_cols - 1) // self.current_cols
+        width = max(self.canvas.winfo_width(), self.current_cols * self.thumb_width)
+        self.canvas.configure(scrollregion=(0, 0, width, rows * self.CELL_HEIGHT))
+        for page_num, card in self.thumbnails.items():
+            self._place_card(card, page_num)
+        self._update_viewport()
+
+    def _schedule_viewport_update(self):
+        """Coalesce bursts of scroll/resize events into one update."""
+        if not self._viewport_update_pending:
+            self._viewport_update_pending = True
+            self.after_idle(self._update_viewport)
+
+    def _visible_page_range(self, overscan_rows: int = 0):
+        """Return (first, last) page numbers of the rows in the viewport plus overscan."""
+        rows = (self.total_pages + self.current_cols - 1) // self.current_cols
+        if self.virtualized:
+            row_height = self.CELL_HEIGHT
+        else:
+            # Eager cards are gridded; derive the row pitch from the frame
+            frame_height = self.content_frame.winfo_height()
+            row_height = frame_height / rows if rows and frame_height > 1 else self.CELL_HEIGHT
+        
+        top = self.canvas.canvasy(0)
+        bottom = top + max(1, self.canvas.winfo_height())
+        first_row = max(0, int(top // row_height) - overscan_rows)
+        last_row = min(rows - 1, int(bottom // row_height) + overscan_rows)
+        first = first_row * self.current_cols + 1
+        last = min(self.total_pages, (last_row + 1) * self.current_cols)
+        return first, last
+
+    def _update_viewport(self):
+        """Bind cards to the pages around the viewport and reprioritize renders."""
+        self._viewport_update_pending = False
+        if self.total_pages == 0:
+            return
+
+        if self.virtualized:
+            first, last = self._visible_page_range(self.OVERSCAN_ROWS)
+
+            # Release cards that scrolled out of range
+            for page_num in [p for p in self.thumbnails if p < first or p > last]:
+                card = self.thumbnails.pop(page_num)
+                card['page'] = None
+                self.canvas.itemconfigure(card['window'], state='hidden')
+                self._free_cards.append(card)
+
+            # Bind cards to newly visible pages
+            for page_num in range(first, last + 1):
+                if page_num not in self.thumbnails:
+                    card = self._free_cards.pop() if self._free_cards else self._create_pooled_card()
+                    self._bind_card(card, page_num)
+
+        self._update_render_window()
+
+    def _update_render_window(self):
+        """Render visible pages first, prefetch around them, drop far-away work."""
+        first, last = self._visible_page_range()
+        prefetch = (self.OVERSCAN_ROWS + self.PREFETCH_ROWS) * self.current_cols
+        self._scheduler.set_viewport(first, last, prefetch)
+        
+        for page_num in range(max(1, first - prefetch), min(self.total_pages, last + prefetch) + 1):
+            if page_num not in self._loaded_pages:
+                self._load_image(page_num)
+        self._pump_renders()
+
+    def _pump_renders(self):
+        """Hand queued renders to the thumbnail service."""
+        if self.thumbnail_service.renders_in_background:
+            self._scheduler.pump()
+        elif not self._render_pump_scheduled and self._scheduler.has_pending:
+            # Renders run on this thread - one per tick keeps the UI responsive
+            self._render_pump_scheduled = True
+            self.after(20, self._pump_renders_in_process)
+
+    def _pump_renders_in_process(self):
+        self._render_pump_scheduled = False
+        self._scheduler.pump(max_jobs=1)
+        self._pump_renders()
+
+    def _create_pooled_card(self) -> dict:
+        """Create a fixed-size card that can display any page."""
+        content_bg = "#252526"
+        card_ref: dict = {}
+
+        card = tk.Frame(self.canvas, bg="#333333", padx=3, pady=3,
+                        width=self.CARD_WIDTH, height=self.CARD_HEIGHT)
+        card.pack_propagate(False)
+
+        content_frame = tk.Frame(card, bg=content_bg)
+        content_frame.pack(fill="both", expand=True)
+
+        image_area = tk.Frame(content_frame, bg="white", height=self.CARD_IMAGE_HEIGHT)
+        image_area.pack(fill="x")
+        image_area.pack_propagate(False)
+        lbl_img = tk.Label(image_area, text="", bg="white", fg="black")
+        lbl_img.pack(fill="both", expand=True)
+
+        lbl_num = tk.Label(content_frame, text="", bg=content_bg, fg="#cccccc", font=("Segoe UI", 9))
+        lbl_num.pack(fill="x", pady=(5, 2))
+
+        lbl_crop = tk.Label(
+            content_frame, text="✂ Cropped", bg=content_bg, fg="#00ff88",
+            font=("Segoe UI", 8, "bold")
+        )
+
+        # Bind once; handlers look up whichever page the card currently shows
+        def page_handler(handler):
+            def _on_event(event):
+                if card_ref.get('page') is not None:
+                    handler(card_ref['page'])
+            return _on_event
+
+        for widget in (card, content_frame, image_area, lbl_img, lbl_num, lbl_crop):
+            widget.bind("<Button-1>", page_handler(self._handle_click))
+            widget.bind("<Double-Button-1>", page_handler(self._handle_double_click))
+            widget.bind("<Enter>", page_handler(self._on_hover_enter))
+            widget.bind("<Leave>", page_handler(self._on_hover_leave))
+
+        card_ref.update({
+            'frame': card,
+            'label': lbl_img,
+            'num_label': lbl_num,
+            'crop_label': lbl_crop,
+            'page': None,
+            'window': self.canvas.create_window(0, 0, window=card, anchor="nw", state='hidden'),
+        })
+        self._card_pool.append(card_ref)
+        return card_ref
+
+    def _place_card(self, card: dict, page_num: int):
+        """Move a card's canvas window to the cell of a page."""
+        idx = page_num - 1
+        row = idx // self.current_cols
+        col = idx % self.current_cols
+        x = col * self.thumb_width + (self.thumb_width - self.CARD_WIDTH) // 2
+        y = row * self.CELL_HEIGHT + (self.CELL_HEIGHT - self.CARD_HEIGHT) // 2
+        self.canvas.coords(card['window'], x, y)
+
+    def _bind_card(self, card: dict, page_num: int):
+        """Show a page on a recycled card."""
+        card['page'] = page_num
+        self.thumbnails[page_num] = card
+
+        card['label'].configure(image="", text=f"Page {page_num}")
+        card['label'].image = None
+        card['num_label'].configure(text=f"Page {page_num}")
+        self._update_card_style(page_num)
+        self._update_crop_indicator(page_num)
+
+        self._place_card(card, page_num)
+        self.canvas.itemconfigure(card['window'], state='normal')
+        self._load_image(page_num)
 
     def _on_hover_enter(self, page_num):
         if page_num not in self.selected_pages and page_num in self.thumbnails:
@@ -187,23 +406,40 @@ class GridView(tk.Frame):
             self.on_selection_change(self.selected_pages)
         
     def _load_image(self, page_num):
-        """Load the actual image for a thumbnail."""
+        """Request the image for a thumbnail; it is applied once rendered."""
         if not self.pdf_path:
             return
             
         # Request larger width for better quality grid
-        img = self.thumbnail_service.get_thumbnail(self.pdf_path, page_num, width=240)
-        if img:
-            # Apply rotation if override exists
-            if page_num in self.rotation_overrides:
-                # PIL rotate is CCW, we track CW
-                angle = self.rotation_overrides[page_num]
-                img = img.rotate(-angle, expand=True)
-
-            photo = ImageTk.PhotoImage(img)
-            lbl = self.thumbnails[page_num]['label']
-            lbl.configure(image=photo, text="", width=240) 
-            lbl.image = photo 
+        pdf_path = self.pdf_path
+        # Rotation is rendered by PyMuPDF and cached per angle
+        self._scheduler.request(
+            page_num,
+            lambda img, p=page_num: self._on_image_rendered(p, pdf_path, img),
+            rotation=self.rotation_overrides.get(page_num, 0),
+        )
+        self._pump_renders()
+    
+    def _on_image_rendered(self, page_num, pdf_path, img):
+        """Record a finished render and show it if the page has a card."""
+        if img is not None and pdf_path == self.pdf_path:
+            if not self._loaded_pages:
+                instrumentation.observe('grid.time_to_first_thumbnail_ms',
+                                        (time.perf_counter() - self._load_started) * 1000)
+            self._loaded_pages.add(page_num)
+        self._apply_image(page_num, pdf_path, img)
+    
+    def _apply_image(self, page_num, pdf_path, img):
+        """Show a rendered thumbnail (runs on the Tk thread)."""
+        # Ignore renders that arrive after the grid was cleared or reloaded
+        if img is None or pdf_path != self.pdf_path or page_num not in self.thumbnails:
+            return
+
+        with instrumentation.span('grid.apply_image', page=page_num):
+            photo = to_photo_image(img, master=self)
+        lbl = self.thumbnails[page_num]['label']
+        lbl.configure(image=photo, text="", width=240) 
+        lbl.image = photo 
             
     def _handle_click(self, page_num: int):
         """Handle click on page card - Toggle selection."""
@@ -251,6 +487,14 @@ class GridView(tk.Frame):
         """Clear the grid."""
         for widget in self.content_frame.winfo_children():
             widget.destroy()
+        for card in self._card_pool:
+            self.canvas.delete(card['window'])
+            card['frame'].destroy()
+        self._card_pool.clear()
+        self._free_cards.clear()
+        self.virtualized = False
+        self._scheduler.reset(None)
+        self._loaded_pages.clear()
         self.thumbnails.clear()
         self.selected_pages.clear()
         self.rotation_overrides.clear()
@@ -295,9 +539,11 @@ class GridView(tk.Frame):
         lbl = self.thumbnails[page_num].get('crop_label')
         if lbl is None:
             return
+        # Check the geometry manager rather than winfo_ismapped(): recycled
+        # cards are updated while their canvas window is still hidden.
         if page_num in self.crop_overrides:
-            if not lbl.winfo_ismapped():
+            if not lbl.winfo_manager():
                 lbl.pack(fill="x", pady=(0, 2))
         else:
-            if lbl.winfo_ismapped():
+            if lbl.winfo_manager():
                 lbl.pack_forget()
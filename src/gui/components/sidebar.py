@@ -18,6 +18,7 @@ class Sidebar(tk.Frame):
                  on_extract,
                  on_open_folder,
                  on_clear_selection,
+                 on_cancel_extract=None,
                  **kwargs):
         super().__init__(parent, **kwargs)
         
@@ -28,6 +29,7 @@ class Sidebar(tk.Frame):
         self.on_extract = on_extract
         self.on_open_folder = on_open_folder
         self.on_clear_selection = on_clear_selection
+        self.on_cancel_extract = on_cancel_extract
         
         self._setup_ui()
         
@@ -76,7 +78,8 @@ class Sidebar(tk.Frame):
             self,
             on_extract=self.on_extract,
             on_open_folder=self.on_open_folder,
-            on_clear_selection=self.on_clear_selection
+            on_clear_selection=self.on_clear_selection,
+            on_cancel=self.on_cancel_extract
         )
         self.action_bar.pack(fill='x', pady=(0, 20))
         
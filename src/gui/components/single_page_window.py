@@ -1,21 +1,37 @@
 """
 Single Page Window - View a specific page in detail with Zoom and Pan
 """
+import time
 import tkinter as tk
 from tkinter import ttk
-from PIL import ImageTk, Image
+from PIL import Image
+
+from utils.image_utils import to_photo_image
 
 class SinglePageWindow(tk.Toplevel):
     """
     Popup window to view a single page with zoom, pan and crop capabilities.
+
+    Up to 100% the page image is scaled as a whole. Beyond that, if a
+    tile_provider is given, only the visible part of the page is rendered,
+    in TILE_SIZE squares at the true zoom resolution.
     """
 
+    TILE_SIZE = 512        # Tile edge in canvas pixels
+    TILE_MARGIN = 1        # Extra rings of tiles kept around the viewport
+    TILE_MIN_SCALE = 1.0   # Use tiles above this zoom (i.e. when upscaling)
+
+    ZOOM_SETTLE_MS = 150   # Pause after the last zoom step before the high-quality pass
+
     def __init__(self, parent, page_num: int, image: Image.Image,
                  initial_rotation: int = 0, initial_crop=None,
-                 on_rotate=None, on_crop=None, on_close=None):
+                 on_rotate=None, on_crop=None, on_close=None,
+                 is_preview: bool = False, tile_provider=None,
+                 rotated_image_provider=None):
         super().__init__(parent)
         self.page_num = page_num
-        self.title(f"Page {page_num} - Viewer")
+        self.is_preview = is_preview  # True until set_image() delivers the full render
+        self._update_title()
         self.geometry("800x900")
 
         # State
@@ -36,6 +52,29 @@ class SinglePageWindow(tk.Toplevel):
         self.on_rotate_callback = on_rotate
         self.on_crop_callback = on_crop
 
+        # Tiled rendering: tile_provider(page_width, rotation, rect) -> Image
+        self.tile_provider = tile_provider
+        self._tiled = False
+        self._tiles = {}          # (col, row) -> (canvas item, PhotoImage, is_final)
+        self._tile_queue = []     # (col, row) waiting for a full-resolution render
+        self._tile_base = None    # Rotated page image used for tile placeholders
+        self._tile_job = None
+        self._tile_update_job = None
+        self._tiles_deferred = False  # Placeholders only while zooming interactively
+        self._tile_layout = None      # (scale, rotation) of the current tile layout
+
+        # Zoom/rotate pipeline: rotated images per angle, coalesced zoom frames.
+        # rotated_image_provider(angle, callback) renders the page at an angle
+        # (possibly asynchronously); until it delivers, a transposed copy is shown.
+        self.rotated_image_provider = rotated_image_provider
+        self._rotated_cache = {}  # angle -> rotated original_image
+        self._requesting_rotation = False
+        self._zoom_frame_job = None
+        self._zoom_settle_job = None
+
+        # Frame timing (ms) of _show_image, for the toolbar counter
+        self.frame_stats = {'frames': 0, 'last_ms': 0.0, 'max_ms': 0.0, 'total_ms': 0.0}
+
         self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         self._setup_ui()
@@ -74,6 +113,10 @@ class SinglePageWindow(tk.Toplevel):
 
         ttk.Button(toolbar, text="Close", command=self._on_close).pack(side="right", padx=5)
 
+        # Frame time counter
+        self.frame_label = tk.Label(toolbar, text="", bg="#2b2b2b", fg="#808080", font=("Segoe UI", 9))
+        self.frame_label.pack(side="right", padx=10)
+
         # Canvas Frame
         self.canvas_frame = tk.Frame(self)
         self.canvas_frame.pack(fill="both", expand=True)
@@ -87,8 +130,8 @@ class SinglePageWindow(tk.Toplevel):
             self.canvas_frame,
             highlightthickness=0,
             bg="#1e1e1e",
-            xscrollcommand=self.h_scroll.set,
-            yscrollcommand=self.v_scroll.set,
+            xscrollcommand=self._on_xscroll,
+            yscrollcommand=self._on_yscroll,
             cursor="arrow"
         )
 
@@ -106,17 +149,107 @@ class SinglePageWindow(tk.Toplevel):
         self.canvas.bind("<ButtonRelease-1>", self._on_mouse_up)
         self.canvas.bind("<MouseWheel>", self._on_mousewheel)  # Windows
         self.canvas.bind("<Control-MouseWheel>", self._on_zoom_wheel)  # Windows Zoom
+        self.canvas.bind("<Configure>", lambda e: self._schedule_tile_update())
 
         self._update_crop_status()
 
-    def _show_image(self):
-        """Display the image with current scale and rotation."""
+    def _update_title(self):
+        suffix = " (loading full resolution...)" if self.is_preview else ""
+        self.title(f"Page {self.page_num} - Viewer{suffix}")
+
+    def set_image(self, image: Image.Image):
+        """
+        Replace the displayed page image, e.g. swap a low-resolution preview
+        for the full render. Zoom is adjusted so the page keeps its on-screen
+        size, and the scroll position and crop are preserved.
+        """
+        if self.original_image is not None and self.original_image.width:
+            self.current_scale *= self.original_image.width / image.width
+            self.zoom_combo.set(f"{int(self.current_scale * 100)}%")
+        self.original_image = image
+        self._rotated_cache.clear()
+        self.is_preview = False
+        self._update_title()
+
+        x_frac = self.canvas.xview()[0]
+        y_frac = self.canvas.yview()[0]
+        self._show_image()
+        self.canvas.xview_moveto(x_frac)
+        self.canvas.yview_moveto(y_frac)
+
+    # Clockwise angle -> PIL transpose (PIL's ROTATE_* turn counter-clockwise)
+    _TRANSPOSE = {
+        90: Image.Transpose.ROTATE_270,
+        180: Image.Transpose.ROTATE_180,
+        270: Image.Transpose.ROTATE_90,
+    }
+
+    def _rotated_image(self) -> Image.Image:
+        """The original image at the current rotation, produced once per angle."""
+        angle = self.rotation_angle
+        rotated = self._rotated_cache.get(angle)
+        if rotated is not None:
+            return rotated
+        if angle == 0:
+            return self.original_image
+
+        if self.rotated_image_provider and not self.is_preview:
+            # Cached renders are delivered synchronously
+            self._requesting_rotation = True
+            try:
+                self.rotated_image_provider(
+                    angle, lambda img, a=angle: self._on_rotated_render(a, img)
+                )
+            finally:
+                self._requesting_rotation = False
+            rotated = self._rotated_cache.get(angle)
+            if rotated is not None:
+                return rotated
+
+        # Exact pixel transpose until (or instead of) the rotated render
+        if angle in self._TRANSPOSE:
+            rotated = self.original_image.transpose(self._TRANSPOSE[angle])
+        else:
+            rotated = self.original_image.rotate(-angle, expand=True)
+        self._rotated_cache[angle] = rotated
+        return rotated
+
+    def _on_rotated_render(self, angle: int, img):
+        """Use a page rendered at an angle in place of the transposed copy."""
+        if img is None:
+            return
+        try:
+            if not self.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        self._rotated_cache[angle] = img
+        if angle == self.rotation_angle and not self._requesting_rotation:
+            self._show_image()
+
+    def _show_image(self, final: bool = True):
+        """
+        Display the image with current scale and rotation.
+
+        Args:
+            final: False for interactive preview frames - a cheaper resampling
+                   filter, and no tile rendering until the zoom settles
+        """
         if not self.original_image:
             return
 
-        # 1. Rotate (PIL rotates Counter-Clockwise, so use negative for CW)
-        # expand=True to ensure corners aren't cropped
-        rotated_img = self.original_image.rotate(-self.rotation_angle, expand=True)
+        start = time.perf_counter()
+        self._cancel_tile_jobs()
+        if self.tile_provider and self.current_scale > self.TILE_MIN_SCALE:
+            self._show_tiled(render_tiles=final)
+            self._record_frame(start)
+            return
+        self._tiled = False
+        self._tiles.clear()
+        self._tile_base = None
+
+        # 1. Rotate (cached per angle)
+        rotated_img = self._rotated_image()
 
         # 2. Calculate new size based on ROTATED dimensions
         width, height = rotated_img.size
@@ -124,8 +257,9 @@ class SinglePageWindow(tk.Toplevel):
         new_height = int(height * self.current_scale)
 
         # 3. Resize
-        resized = rotated_img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        self.tk_image = ImageTk.PhotoImage(resized)
+        resample = Image.Resampling.LANCZOS if final else Image.Resampling.BILINEAR
+        resized = rotated_img.resize((new_width, new_height), resample)
+        self.tk_image = to_photo_image(resized, master=self)
 
         # Update Canvas
         self.canvas.delete("all")
@@ -139,6 +273,147 @@ class SinglePageWindow(tk.Toplevel):
         if self.crop_norm:
             self._draw_crop_overlay()
 
+        self._record_frame(start)
+
+    def _record_frame(self, start: float):
+        """Update the frame time counter with a frame that began at start."""
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        stats = self.frame_stats
+        stats['frames'] += 1
+        stats['last_ms'] = elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        stats['total_ms'] += elapsed_ms
+        self.frame_label.configure(
+            text=f"{elapsed_ms:.1f} ms/frame (avg {stats['total_ms'] / stats['frames']:.1f}, {stats['frames']} frames)"
+        )
+
+    # ---------------- Tiled rendering ----------------
+
+    def _show_tiled(self, render_tiles: bool = True):
+        """Lay out the zoomed page as tiles; only visible tiles are rendered."""
+        self._tiled = True
+        self._tiles_deferred = not render_tiles
+        self._tile_layout = (self.current_scale, self.rotation_angle)
+        self._tiles.clear()
+        self._tile_queue = []
+        self.tk_image = None
+        # Placeholders are cut from the rotated current image
+        self._tile_base = self._rotated_image()
+
+        disp_w, disp_h = self._displayed_image_size()
+        self.canvas.delete("all")
+        self._crop_canvas_id = None
+        self.canvas.config(scrollregion=(0, 0, int(disp_w), int(disp_h)))
+
+        if self.crop_norm:
+            self._draw_crop_overlay()
+        self._update_tiles()
+
+    def _on_xscroll(self, first, last):
+        self.h_scroll.set(first, last)
+        self._schedule_tile_update()
+
+    def _on_yscroll(self, first, last):
+        self.v_scroll.set(first, last)
+        self._schedule_tile_update()
+
+    def _schedule_tile_update(self):
+        """Coalesce scroll/resize events into one tile update per idle."""
+        if self._tiled and self._tile_update_job is None:
+            self._tile_update_job = self.after_idle(self._update_tiles)
+
+    def _update_tiles(self):
+        """Create tiles entering the viewport and drop tiles far outside it."""
+        self._tile_update_job = None
+        if not self._tiled:
+            return
+
+        size = self.TILE_SIZE
+        disp_w, disp_h = self._displayed_image_size()
+        cols = max(1, -(-int(disp_w) // size))
+        rows = max(1, -(-int(disp_h) // size))
+
+        view_x0 = self.canvas.canvasx(0)
+        view_y0 = self.canvas.canvasy(0)
+        view_x1 = view_x0 + self.canvas.winfo_width()
+        view_y1 = view_y0 + self.canvas.winfo_height()
+
+        margin = self.TILE_MARGIN
+        col0 = max(0, int(view_x0 // size) - margin)
+        col1 = min(cols - 1, int(view_x1 // size) + margin)
+        row0 = max(0, int(view_y0 // size) - margin)
+        row1 = min(rows - 1, int(view_y1 // size) + margin)
+
+        # Release tiles that scrolled out of range
+        for key in [k for k in self._tiles
+                    if not (col0 <= k[0] <= col1 and row0 <= k[1] <= row1)]:
+            self.canvas.delete(self._tiles.pop(key)[0])
+
+        for col in range(col0, col1 + 1):
+            for row in range(row0, row1 + 1):
+                if (col, row) not in self._tiles:
+                    self._add_placeholder_tile(col, row)
+
+        # Render the tiles nearest the middle of the viewport first
+        center_col = (view_x0 + view_x1) / 2 / size
+        center_row = (view_y0 + view_y1) / 2 / size
+        self._tile_queue = sorted(
+            (k for k, (_, _, final) in self._tiles.items() if not final),
+            key=lambda k: (k[0] + 0.5 - center_col) ** 2 + (k[1] + 0.5 - center_row) ** 2
+        )
+        if self._tile_queue and self._tile_job is None and not self._tiles_deferred:
+            self._tile_job = self.after(1, self._render_next_tile)
+
+    def _tile_rect(self, col: int, row: int):
+        size = self.TILE_SIZE
+        disp_w, disp_h = self._displayed_image_size()
+        x0, y0 = col * size, row * size
+        return (x0, y0, min(x0 + size, int(disp_w)), min(y0 + size, int(disp_h)))
+
+    def _add_placeholder_tile(self, col: int, row: int):
+        """Show an upscaled cut of the current image until the real tile arrives."""
+        x0, y0, x1, y1 = self._tile_rect(col, row)
+        if x1 <= x0 or y1 <= y0:
+            return
+        s = self.current_scale
+        cut = self._tile_base.crop((int(x0 / s), int(y0 / s),
+                                    max(int(x0 / s) + 1, int(x1 / s)),
+                                    max(int(y0 / s) + 1, int(y1 / s))))
+        photo = to_photo_image(cut.resize((x1 - x0, y1 - y0), Image.Resampling.BILINEAR), master=self)
+        item = self.canvas.create_image(x0, y0, image=photo, anchor="nw", tags="tile")
+        self.canvas.tag_lower(item)
+        self._tiles[(col, row)] = (item, photo, False)
+
+    def _render_next_tile(self):
+        """Render one queued tile, then yield to the event loop."""
+        self._tile_job = None
+        while self._tile_queue:
+            key = self._tile_queue.pop(0)
+            entry = self._tiles.get(key)
+            if entry is None or entry[2]:
+                continue  # Scrolled away or already rendered
+
+            page_width = round(self.original_image.width * self.current_scale)
+            img = self.tile_provider(page_width, self.rotation_angle, self._tile_rect(*key))
+            if img is not None:
+                photo = to_photo_image(img, master=self)
+                self.canvas.itemconfigure(entry[0], image=photo)
+                self._tiles[key] = (entry[0], photo, True)
+            else:
+                self._tiles[key] = (entry[0], entry[1], True)  # Keep the placeholder
+            break
+
+        if self._tile_queue:
+            self._tile_job = self.after(1, self._render_next_tile)
+
+    def _cancel_tile_jobs(self):
+        for job in (self._tile_job, self._tile_update_job):
+            if job is not None:
+                self.after_cancel(job)
+        self._tile_job = None
+        self._tile_update_job = None
+        self._tile_queue = []
+
     def _rotate_cw(self):
         """Rotate clockwise 90 degrees."""
         self.rotation_angle = (self.rotation_angle + 90) % 360
@@ -147,10 +422,10 @@ class SinglePageWindow(tk.Toplevel):
             self.on_rotate_callback(self.page_num, self.rotation_angle)
 
     def _zoom_in(self):
-        self._set_scale(self.current_scale * 1.2)
+        self._set_scale(self.current_scale * 1.2, interactive=True)
 
     def _zoom_out(self):
-        self._set_scale(self.current_scale * 0.8)
+        self._set_scale(self.current_scale * 0.8, interactive=True)
 
     def _on_zoom_select(self, event=None):
         """Handle zoom selection from dropdown."""
@@ -177,12 +452,54 @@ class SinglePageWindow(tk.Toplevel):
         if canvas_width > 1:
             self._set_scale(canvas_width / img_width)
 
-    def _set_scale(self, scale):
+    def _set_scale(self, scale, interactive: bool = False):
+        """
+        Set the zoom level.
+
+        Interactive changes (wheel, zoom buttons) are coalesced: at most one
+        cheap preview frame per event-loop pass, and a single high-quality
+        frame once no zoom step has arrived for ZOOM_SETTLE_MS.
+        """
         self.current_scale = max(self.min_scale, min(self.max_scale, scale))
         # Update combo text
         if hasattr(self, 'zoom_combo'):
             self.zoom_combo.set(f"{int(self.current_scale * 100)}%")
-        self._show_image()
+
+        if not interactive:
+            self._cancel_zoom_jobs()
+            self._show_image()
+            return
+
+        if self._zoom_frame_job is None:
+            self._zoom_frame_job = self.after_idle(self._show_zoom_preview)
+        if self._zoom_settle_job is not None:
+            self.after_cancel(self._zoom_settle_job)
+        self._zoom_settle_job = self.after(self.ZOOM_SETTLE_MS, self._finish_zoom)
+
+    def _show_zoom_preview(self):
+        self._zoom_frame_job = None
+        self._show_image(final=False)
+
+    def _finish_zoom(self):
+        """High-quality pass once interactive zooming pauses."""
+        self._zoom_settle_job = None
+        if self._zoom_frame_job is not None:
+            self.after_cancel(self._zoom_frame_job)
+            self._zoom_frame_job = None
+        if (self._tiled and self._tiles_deferred
+                and self._tile_layout == (self.current_scale, self.rotation_angle)):
+            # Tile layout is already at this zoom - just render the real tiles
+            self._tiles_deferred = False
+            self._update_tiles()
+        else:
+            self._show_image()
+
+    def _cancel_zoom_jobs(self):
+        for job in (self._zoom_frame_job, self._zoom_settle_job):
+            if job is not None:
+                self.after_cancel(job)
+        self._zoom_frame_job = None
+        self._zoom_settle_job = None
 
     def _on_mousewheel(self, event):
         """Scroll vertically."""
@@ -384,6 +701,8 @@ class SinglePageWindow(tk.Toplevel):
         self.canvas.scan_dragto(event.x, event.y, gain=1)
 
     def _on_close(self):
+        self._cancel_zoom_jobs()
+        self._cancel_tile_jobs()
         if self.on_close_callback:
             self.on_close_callback()
         self.destroy()
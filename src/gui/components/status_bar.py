@@ -111,9 +111,6 @@ class StatusBar(ttk.Frame):
         percentage = (current / total * 100) if total > 0 else 0
         self.progress['value'] = percentage
         self.progress_label.configure(text=f"Extracting page {current} of {total}...")
-        
-        # Force update to show progress
-        self.update_idletasks()
     
     def reset(self):
         """Reset status bar to initial state."""
@@ -132,6 +129,7 @@ class ActionBar(ttk.Frame):
         on_extract: Optional[callable] = None,
         on_open_folder: Optional[callable] = None,
         on_clear_selection: Optional[callable] = None,
+        on_cancel: Optional[callable] = None,
         **kwargs
     ):
         super().__init__(parent, style='TFrame', **kwargs)
@@ -139,6 +137,7 @@ class ActionBar(ttk.Frame):
         self.on_extract = on_extract
         self.on_open_folder = on_open_folder
         self.on_clear_selection = on_clear_selection
+        self.on_cancel = on_cancel
         
         self._create_widgets()
     
@@ -156,6 +155,13 @@ class ActionBar(ttk.Frame):
         )
         self.btn_extract.pack(side='top', fill='x', pady=(0, 10))
         
+        # Cancel Button (only shown while extracting)
+        self.btn_cancel = ttk.Button(
+            self,
+            text="Cancel Extraction",
+            command=self._on_cancel_click
+        )
+        
         # Clear Selection Button (Secondary)
         self.btn_clear = ttk.Button(
             self,
@@ -183,6 +189,11 @@ class ActionBar(ttk.Frame):
     def _on_clear_click(self):
         if self.on_clear_selection:
             self.on_clear_selection()
+
+    def _on_cancel_click(self):
+        if self.on_cancel:
+            self.btn_cancel.configure(state='disabled')
+            self.on_cancel()
             
     def set_extract_enabled(self, enabled: bool):
         state = 'normal' if enabled else 'disabled'
@@ -192,4 +203,9 @@ class ActionBar(ttk.Frame):
         state = 'disabled' if is_processing else 'normal'
         self.btn_extract.configure(state=state)
         self.btn_clear.configure(state=state)
+        if is_processing:
+            self.btn_cancel.configure(state='normal')
+            self.btn_cancel.pack(side='top', fill='x', pady=(0, 10), after=self.btn_extract)
+        else:
+            self.btn_cancel.pack_forget()
 
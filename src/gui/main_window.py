@@ -8,8 +8,12 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 import os
 import json
+import queue
+import threading
 from typing import Optional, Set
 
+from PIL import Image
+
 from gui.themes.dark_theme import DarkTheme
 from gui.components.file_picker import FilePicker # Keep if used elsewhere? No, moved to Sidebar
 from gui.components.grid_view import GridView
@@ -17,10 +21,13 @@ from gui.components.single_page_window import SinglePageWindow
 from gui.components.sidebar import Sidebar
 from gui.components.status_bar import StatusBar
 from gui.components.toast import show_toast
+from services import instrumentation
 from services.pdf_service import PDFService
 from services.validation_service import ValidationService
 from services.config_service import ConfigService
 from services.thumbnail_service import ThumbnailService
+from services.thumbnail_cache import DiskThumbnailCache
+from services.render_pool import RenderWorkerPool
 from utils.file_utils import open_folder_in_explorer, open_file_in_explorer
 
 
@@ -32,16 +39,31 @@ class MainWindow:
     WINDOW_WIDTH = 900  # Increased for Grid View
     WINDOW_HEIGHT = 700
     WINDOW_TITLE = "📄 PDF Page Extractor V2"
+    RENDER_POLL_MS = 15  # How often finished background renders are collected
+    EXTRACT_POLL_MS = 50  # How often extraction progress is collected
+    VIEWER_RENDER_WIDTH = 1600  # Page width rendered for the single page viewer
     
     def __init__(self, root: tk.Tk):
         self.root = root
         self.root.title(self.WINDOW_TITLE)
         
+        # Background extraction state (see _on_extract)
+        self._extract_thread: Optional[threading.Thread] = None
+        self._extract_cancel: Optional[threading.Event] = None
+        self._extract_queue: "queue.Queue[tuple]" = queue.Queue()
+        self._extract_output_path: Optional[str] = None
+        
         # Initialize services
-        self.pdf_service = PDFService()
         self.config_service = ConfigService()
-        self.thumbnail_service = ThumbnailService()
-        self.thumbnail_service = ThumbnailService()
+        self.pdf_service = PDFService(extraction_engine=self.config_service.extraction_engine)
+        instrumentation.configure(self.config_service.trace_file)
+        self.thumbnail_service = ThumbnailService(
+            disk_cache=self._create_disk_cache(),
+            grid_cache_bytes=self.config_service.thumbnail_memory_bytes,
+            viewer_cache_bytes=self.config_service.viewer_memory_bytes,
+            tile_cache_bytes=self.config_service.tile_memory_bytes,
+            render_pool=RenderWorkerPool(self.config_service.render_workers),
+        )
         
         # Setup window
         self._setup_window()
@@ -52,6 +74,17 @@ class MainWindow:
         
         # Bind window close
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        
+        # Hand finished background renders to their widgets on the Tk thread
+        self.root.after(self.RENDER_POLL_MS, self._poll_render_results)
+    
+    def _create_disk_cache(self) -> Optional[DiskThumbnailCache]:
+        """Create the persistent thumbnail cache (disabled when its size is 0)."""
+        max_bytes = self.config_service.thumbnail_disk_cache_bytes
+        if max_bytes <= 0:
+            return None
+        cache = DiskThumbnailCache(self.config_service.thumbnail_cache_path, max_bytes=max_bytes)
+        return cache if cache.is_available else None
     
     def _setup_window(self):
         """Configure the main window."""
@@ -114,6 +147,7 @@ class MainWindow:
             on_extract=self._on_extract,
             on_open_folder=self._on_open_folder,
             on_clear_selection=self._on_clear_selection,
+            on_cancel_extract=self._on_cancel_extract,
             bg=DarkTheme.COLORS['bg_primary'],
             width=600, # Explicit request
             padx=20,
@@ -170,9 +204,13 @@ class MainWindow:
             self.status_bar.set_status(error, 'error')
             return
         
-        success, message = self.pdf_service.load_pdf(filepath)
+        # The previous session is closed by load_pdf
+        if self.pdf_service.session:
+            self.thumbnail_service.detach_session(self.pdf_service.session)
+        success, message = self.pdf_service.load_pdf(filepath, use_mmap=self.config_service.mmap_input)
         
         if success:
+            self.thumbnail_service.attach_session(self.pdf_service.session)
             self.grid_view.load_pdf(filepath, self.pdf_service.page_count)
             self.config_service.last_input_dir = filepath
             self.config_service.add_recent_file(filepath)
@@ -202,15 +240,22 @@ class MainWindow:
         if not self.pdf_service.is_loaded:
             return
 
-        # Get high-res image (request large width for zooming)
-        img = self.thumbnail_service.get_thumbnail(self.pdf_service.filepath, page_num, width=1600)
+        pdf_path = self.pdf_service.filepath
+        width = self.VIEWER_RENDER_WIDTH
+
+        # Open straight away - with the high-res render if it's cached,
+        # otherwise with the grid thumbnail scaled up as a placeholder
+        img = self.thumbnail_service.get_cached_thumbnail(pdf_path, page_num, width)
+        is_preview = img is None
+        if is_preview:
+            img = self._viewer_preview(pdf_path, page_num, width)
 
         # Determine current rotation and crop to pass to viewer
         current_rot = self.grid_view.get_rotations().get(page_num, 0)
         current_crop = self.grid_view.get_page_crop(page_num)
 
         if img:
-            SinglePageWindow(
+            viewer = SinglePageWindow(
                 self.root,
                 page_num,
                 img,
@@ -218,7 +263,47 @@ class MainWindow:
                 initial_crop=current_crop,
                 on_rotate=self._on_page_rotate,
                 on_crop=self._on_page_crop,
+                is_preview=is_preview,
+                tile_provider=lambda w, rot, rect, p=page_num: self.thumbnail_service.get_tile(
+                    pdf_path, p, w, rot, rect
+                ),
+                rotated_image_provider=lambda rot, callback, p=page_num: (
+                    self.thumbnail_service.request_thumbnail(
+                        pdf_path, p, width, callback, rotation=rot
+                    )
+                ),
+            )
+            if is_preview:
+                self.thumbnail_service.request_thumbnail(
+                    pdf_path, page_num, width,
+                    lambda full, v=viewer: self._on_viewer_image(v, full)
+                )
+
+    def _viewer_preview(self, pdf_path: str, page_num: int, width: int) -> Optional[Image.Image]:
+        """Upscale the grid thumbnail to the viewer's size as a placeholder."""
+        thumb = self.thumbnail_service.get_cached_thumbnail(
+            pdf_path, page_num, GridView.THUMB_RENDER_WIDTH
+        )
+        if thumb is None:
+            # Not rendered yet (e.g. scrolled past) - small renders are cheap
+            thumb = self.thumbnail_service.get_thumbnail(
+                pdf_path, page_num, GridView.THUMB_RENDER_WIDTH
             )
+        if thumb is None:
+            return None
+        height = round(thumb.height * width / thumb.width)
+        return thumb.resize((width, height), Image.Resampling.BILINEAR)
+
+    def _on_viewer_image(self, viewer: SinglePageWindow, img: Optional[Image.Image]):
+        """Swap the high-res render into a viewer that is still open."""
+        if img is None:
+            return
+        try:
+            if not viewer.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        viewer.set_image(img)
 
     def _on_page_rotate(self, page_num: int, angle: int):
         """Handle rotation from single page viewer."""
@@ -243,7 +328,7 @@ class MainWindow:
     
     def _update_extract_button_state(self):
         """Update extract button enabled state."""
-        can_extract = self._validate_form_complete()
+        can_extract = self._extract_thread is None and self._validate_form_complete()
         self.sidebar.set_extract_enabled(can_extract)
     
     def _validate_form_complete(self) -> bool:
@@ -264,6 +349,8 @@ class MainWindow:
     
     def _on_extract(self):
         """Handle extract button click."""
+        if self._extract_thread is not None:
+            return  # Already extracting
         if not self._validate_form_complete():
             return
             
@@ -285,26 +372,79 @@ class MainWindow:
             
         self.config_service.last_output_dir = output_dir
         
-        def progress_callback(current, total):
-            self.status_bar.set_progress(current, total)
-        
         rotations = self.grid_view.get_rotations()
         crops = self.grid_view.get_crops()
-        success, message = self.pdf_service.extract_pages(
-            pages, output_path, rotations, progress_callback,
-            crop_overrides=crops,
-        )
+        streaming = self.config_service.streaming_extraction
+        optimize = self.config_service.optimize_output
+        cancel_event = threading.Event()
+        results = self._extract_queue
+        
+        def run():
+            # Runs on the worker thread - only talk to Tk through the queue
+            def progress_callback(current, total):
+                results.put(('progress', current, total))
+            
+            success, message = self.pdf_service.extract_pages(
+                pages, output_path, rotations, progress_callback,
+                crop_overrides=crops,
+                cancel_event=cancel_event,
+                streaming=streaming,
+                optimize=optimize,
+            )
+            results.put(('done', success, message))
+        
+        self._extract_cancel = cancel_event
+        self._extract_output_path = output_path
+        self._extract_thread = threading.Thread(target=run, name="extract", daemon=True)
+        self._extract_thread.start()
+        self.root.after(self.EXTRACT_POLL_MS, self._poll_extraction)
+    
+    def _poll_extraction(self):
+        """Apply queued progress from the extraction thread, then reschedule."""
+        progress = None
+        done = None
+        while True:
+            try:
+                item = self._extract_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] == 'progress':
+                progress = item[1:]  # Only the latest update matters
+            else:
+                done = item[1:]
+        
+        if progress:
+            self.status_bar.set_progress(*progress)
+        if done:
+            self._on_extract_finished(*done)
+        else:
+            self.root.after(self.EXTRACT_POLL_MS, self._poll_extraction)
+    
+    def _on_extract_finished(self, success: bool, message: str):
+        """Restore the UI once the extraction thread has reported back."""
+        cancelled = self._extract_cancel is not None and self._extract_cancel.is_set()
+        self._extract_thread = None
+        self._extract_cancel = None
         
         self.sidebar.set_processing(False)
         self.status_bar.show_progress(False)
+        self._update_extract_button_state()
         
         if success:
             self.status_bar.set_status(message, 'success')
             if messagebox.askyesno("Success", f"{message}\nOpen folder?"):
-                open_file_in_explorer(output_path)
+                open_file_in_explorer(self._extract_output_path)
+        elif cancelled:
+            self.status_bar.set_status(message, 'warning')
         else:
             self.status_bar.set_status(message, 'error')
             messagebox.showerror("Error", message)
+    
+    def _on_cancel_extract(self):
+        """Ask the running extraction to stop."""
+        if self._extract_cancel is not None:
+            self._extract_cancel.set()
+            self.status_bar.set_status("Cancelling extraction...", 'processing')
 
     def _on_open_folder(self):
         output_dir = self.sidebar.get_output_directory()
@@ -315,8 +455,20 @@ class MainWindow:
 
 
 
+    def _poll_render_results(self):
+        """Deliver completed thumbnail renders, then reschedule."""
+        self.thumbnail_service.process_completed()
+        self.root.after(self.RENDER_POLL_MS, self._poll_render_results)
+
     def _on_close(self):
+        if self._extract_thread is not None:
+            # Let the worker stop and delete its partial output file
+            self._extract_cancel.set()
+            self._extract_thread.join(timeout=2.0)
+        # Thumbnails first: its pool holds the session's document
+        self.thumbnail_service.close()
         self.pdf_service.close()
+        instrumentation.shutdown()
         self.root.destroy()
 
     def run(self):
@@ -6,6 +6,9 @@ Main entry point for the application.
 
 import sys
 import os
+import argparse
+import multiprocessing
+import time
 
 # Add src to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -14,8 +17,27 @@ import tkinter as tk
 from gui.main_window import MainWindow
 
 
-def main():
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='dpdf-planner', description='PDF Page Extractor')
+    parser.add_argument('--profile', nargs='?', const='', metavar='DIR',
+                        help='Profile the session and write reports to DIR on exit '
+                             '(default: ./profile-<timestamp>)')
+    parser.add_argument('--profiler', choices=('sample', 'cprofile'), default='sample',
+                        help='Stack sampling only (default) or cProfile per-function stats')
+    return parser
+
+
+def main(argv=None):
     """Application entry point."""
+    args = create_parser().parse_args(argv)
+    
+    profiler = None
+    if args.profile is not None:
+        from utils.profiling import SessionProfiler
+        output_dir = args.profile or f"profile-{time.strftime('%Y%m%d-%H%M%S')}"
+        profiler = SessionProfiler(output_dir, mode=args.profiler)
+        profiler.start()
+    
     # Create root window
     root = tk.Tk()
     
@@ -28,9 +50,16 @@ def main():
             pass  # Icon loading failed, continue without it
     
     # Create and run main window
-    app = MainWindow(root)
-    app.run()
+    try:
+        app = MainWindow(root)
+        app.run()
+    finally:
+        if profiler is not None:
+            files = profiler.stop()
+            print(f"Profile written to {os.path.abspath(profiler.output_dir)} ({len(files)} files)")
 
 
 if __name__ == "__main__":
+    # Required for the render worker processes in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
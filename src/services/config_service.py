@@ -7,7 +7,7 @@ and recent files.
 
 import os
 import json
-from typing import Optional, List
+from typing import List
 from pathlib import Path
 
 
@@ -19,6 +19,7 @@ class ConfigService:
     # Config file location in user's AppData
     CONFIG_DIR = Path(os.environ.get('APPDATA', os.path.expanduser('~'))) / 'dpdf-planner'
     CONFIG_FILE = CONFIG_DIR / 'config.json'
+    THUMBNAIL_CACHE_FILE = CONFIG_DIR / 'thumbnails.db'
     
     # Default configuration
     DEFAULT_CONFIG = {
@@ -27,7 +28,17 @@ class ConfigService:
         'recent_files': [],
         'theme': 'dark',
         'max_recent_files': 5,
-        'default_output_subdir': 'Extracted PDFs'
+        'default_output_subdir': 'Extracted PDFs',
+        'thumbnail_disk_cache_mb': 256,
+        'thumbnail_memory_mb': 128,
+        'viewer_memory_mb': 64,
+        'tile_memory_mb': 64,
+        'render_workers': 0,
+        'trace_file': '',
+        'streaming_extraction': False,
+        'mmap_input': False,
+        'extraction_engine': 'pypdf2',
+        'optimize_output': False
     }
     
     def __init__(self):
@@ -159,6 +170,74 @@ class ConfigService:
             self._config['theme'] = value
             self._save_config()
     
+    @property
+    def thumbnail_cache_path(self) -> str:
+        """Get the path of the persistent thumbnail cache file."""
+        return str(self.THUMBNAIL_CACHE_FILE)
+    
+    def _get_size_mb(self, key: str) -> int:
+        """Get a non-negative megabyte setting in bytes, falling back to the default."""
+        try:
+            size_mb = int(self._config.get(key, self.DEFAULT_CONFIG[key]))
+        except (TypeError, ValueError):
+            size_mb = self.DEFAULT_CONFIG[key]
+        return max(0, size_mb) * 1024 * 1024
+    
+    @property
+    def thumbnail_disk_cache_bytes(self) -> int:
+        """Get the size limit of the persistent thumbnail cache in bytes."""
+        return self._get_size_mb('thumbnail_disk_cache_mb')
+    
+    @property
+    def thumbnail_memory_bytes(self) -> int:
+        """Get the in-memory budget for grid-size thumbnails in bytes."""
+        return self._get_size_mb('thumbnail_memory_mb')
+    
+    @property
+    def viewer_memory_bytes(self) -> int:
+        """Get the in-memory budget for viewer-size renders in bytes."""
+        return self._get_size_mb('viewer_memory_mb')
+    
+    @property
+    def tile_memory_bytes(self) -> int:
+        """Get the in-memory budget for zoomed viewer tiles in bytes."""
+        return self._get_size_mb('tile_memory_mb')
+    
+    @property
+    def render_workers(self) -> int:
+        """Get the number of background render processes (0 = automatic)."""
+        try:
+            return max(0, int(self._config.get('render_workers', 0)))
+        except (TypeError, ValueError):
+            return 0
+    
+    @property
+    def trace_file(self) -> str:
+        """Get the instrumentation trace path ('' = disabled, see services.instrumentation)."""
+        value = self._config.get('trace_file') or ''
+        return value if isinstance(value, str) else ''
+    
+    @property
+    def streaming_extraction(self) -> bool:
+        """Get whether extractions are written page by page (see StreamingPageWriter)."""
+        return bool(self._config.get('streaming_extraction', False))
+    
+    @property
+    def mmap_input(self) -> bool:
+        """Get whether loaded PDFs are read through a shared memory mapping (see MappedFile)."""
+        return bool(self._config.get('mmap_input', False))
+    
+    @property
+    def extraction_engine(self) -> str:
+        """Get the library that writes extracted PDFs ('pypdf2' or 'pymupdf', see PDFService)."""
+        value = self._config.get('extraction_engine')
+        return value if value in ('pypdf2', 'pymupdf') else 'pypdf2'
+    
+    @property
+    def optimize_output(self) -> bool:
+        """Get whether extracted PDFs get the optimization pass (extract_pages(optimize=True))."""
+        return bool(self._config.get('optimize_output', False))
+    
     def get_output_path(self, filename: str) -> str:
         """
         Get the full output path for a filename.
@@ -0,0 +1,236 @@
+"""
+Document Pool - Shared, reference-counted PyMuPDF document handles
+
+Opening a PDF parses its xref table; keeping one handle per file lets every
+page render reuse that work instead of reopening the document per page.
+Documents owned elsewhere (a DocumentSession) can be attached, so renders
+use the caller's already-parsed document instead of opening another.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, List
+
+import fitz  # PyMuPDF
+
+from services.thumbnail_cache import FileStamp, file_stamp
+
+
+class _PooledDocument:
+    """A pooled document handle and its bookkeeping."""
+
+    __slots__ = ('doc', 'refcount', 'last_used', 'stamp', 'attached')
+
+    def __init__(self, doc: fitz.Document, stamp: Optional[FileStamp], attached: bool = False):
+        self.doc = doc
+        self.refcount = 0
+        self.last_used = time.monotonic()
+        self.stamp = stamp  # file_stamp() when opened (or attached)
+        self.attached = attached  # Owned by the caller of attach(); never closed here
+
+
+class DocumentPool:
+    """
+    Keeps one open fitz.Document per PDF path.
+
+    Handles are reference counted; unreferenced handles are closed once they
+    have been idle for longer than idle_timeout seconds, or when more than
+    max_documents files are open. Attached documents are exempt from both.
+    Idle handles are only closed from acquire() and evict_idle(), so an owner
+    that may stop acquiring should call evict_idle() periodically (from the
+    thread that uses the documents - fitz isn't thread-safe).
+    """
+
+    def __init__(self, idle_timeout: float = 30.0, max_documents: int = 4):
+        self.idle_timeout = idle_timeout
+        self.max_documents = max_documents
+        self._docs: Dict[str, _PooledDocument] = {}
+        # Handles replaced by attach() while still in use; closed on last release
+        self._retired: List[_PooledDocument] = []
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def acquire(self, pdf_path: str) -> fitz.Document:
+        """
+        Get the shared document for a path, opening it if needed.
+
+        Every acquire() must be paired with a release().
+
+        Args:
+            pdf_path: Path to the PDF file
+
+        Returns:
+            Open fitz.Document
+
+        Raises:
+            Whatever fitz.open raises for unreadable files
+        """
+        with self._lock:
+            self.evict_idle()
+
+            entry = self._docs.get(pdf_path)
+            if entry is not None and entry.refcount == 0 and not entry.attached:
+                # File replaced on disk since we opened it - reopen
+                if entry.stamp != file_stamp(pdf_path):
+                    self._close_entry(pdf_path)
+                    entry = None
+
+            if entry is None:
+                self.misses += 1
+                stamp = file_stamp(pdf_path)
+                doc = fitz.open(pdf_path)
+                entry = _PooledDocument(doc, stamp)
+                self._docs[pdf_path] = entry
+                self._enforce_limit()
+            else:
+                self.hits += 1
+
+            entry.refcount += 1
+            entry.last_used = time.monotonic()
+            return entry.doc
+
+    def attach(self, pdf_path: str, doc: fitz.Document):
+        """
+        Serve pdf_path from an already open document until detach().
+
+        The pool never closes an attached document; its owner does, after
+        detaching it. A handle the pool opened itself for the path is
+        replaced: closed now if unreferenced, otherwise on its last release().
+        """
+        with self._lock:
+            entry = self._docs.get(pdf_path)
+            if entry is not None and not entry.attached:
+                if entry.refcount == 0:
+                    self._close_entry(pdf_path)
+                else:
+                    self._retired.append(entry)
+            self._docs[pdf_path] = _PooledDocument(doc, file_stamp(pdf_path), attached=True)
+
+    def detach(self, pdf_path: str, doc: fitz.Document):
+        """
+        Stop serving an attached document; later acquires open pdf_path again.
+
+        Args:
+            pdf_path: Path passed to attach()
+            doc: The attached document (nothing happens if another one is
+                 attached for the path by now)
+        """
+        with self._lock:
+            entry = self._docs.get(pdf_path)
+            if entry is not None and entry.attached and entry.doc is doc:
+                del self._docs[pdf_path]
+
+    def release(self, pdf_path: str, doc: Optional[fitz.Document] = None):
+        """
+        Drop a reference taken with acquire().
+
+        Args:
+            pdf_path: Path passed to acquire()
+            doc: The document acquire() returned. Needed if attach() may
+                 have replaced the path's handle in the meantime
+        """
+        with self._lock:
+            for retired in self._retired:
+                if retired.doc is doc:
+                    retired.refcount -= 1
+                    if retired.refcount <= 0:
+                        self._retired.remove(retired)
+                        self._close_doc(retired)
+                    return
+            entry = self._docs.get(pdf_path)
+            if entry is None or (doc is not None and entry.doc is not doc):
+                return
+            entry.refcount = max(0, entry.refcount - 1)
+            entry.last_used = time.monotonic()
+
+    def stamp(self, pdf_path: str) -> Optional[FileStamp]:
+        """
+        Get the file_stamp() of the version of pdf_path the pooled document
+        was opened from, or None if none is pooled.
+        """
+        with self._lock:
+            entry = self._docs.get(pdf_path)
+            return entry.stamp if entry is not None else None
+
+    @contextmanager
+    def document(self, pdf_path: str):
+        """Context manager wrapping acquire()/release()."""
+        doc = self.acquire(pdf_path)
+        try:
+            yield doc
+        finally:
+            self.release(pdf_path, doc)
+
+    def evict_idle(self, now: Optional[float] = None):
+        """
+        Close unreferenced documents idle for longer than idle_timeout.
+
+        Args:
+            now: Optional monotonic timestamp (defaults to the current time)
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            for path in [p for p, e in self._docs.items()
+                         if e.refcount == 0 and not e.attached
+                         and now - e.last_used > self.idle_timeout]:
+                self._close_entry(path)
+
+    def _enforce_limit(self):
+        """Close least recently used unreferenced documents over max_documents. Lock held."""
+        if len(self._docs) <= self.max_documents:
+            return
+        idle = sorted(
+            ((e.last_used, p) for p, e in self._docs.items() if e.refcount == 0 and not e.attached)
+        )
+        for _, path in idle:
+            if len(self._docs) <= self.max_documents:
+                break
+            self._close_entry(path)
+
+    def _close_entry(self, pdf_path: str):
+        """Close and forget a document (attached ones are only forgotten). Lock held."""
+        entry = self._docs.pop(pdf_path, None)
+        if entry is None or entry.attached:
+            return
+        self._close_doc(entry)
+
+    def _close_doc(self, entry: _PooledDocument):
+        """Close a handle the pool opened. Lock held."""
+        self.evictions += 1
+        try:
+            entry.doc.close()
+        except Exception:
+            pass
+
+    def close(self, pdf_path: Optional[str] = None):
+        """
+        Close pooled documents.
+
+        Args:
+            pdf_path: Optional specific PDF path to close. If None, closes all.
+        """
+        with self._lock:
+            if pdf_path:
+                self._close_entry(pdf_path)
+            else:
+                for path in list(self._docs):
+                    self._close_entry(path)
+                for entry in self._retired:
+                    self._close_doc(entry)
+                self._retired.clear()
+
+    def get_stats(self) -> dict:
+        """Get hit/miss/eviction counters and the number of open documents."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'open': len(self._docs),
+                'attached': sum(1 for e in self._docs.values() if e.attached),
+            }
@@ -0,0 +1,81 @@
+"""
+Document Session - One parsed PDF shared by PDFService and ThumbnailService
+
+The file is parsed once, by PyMuPDF, when the session opens. Page count
+and metadata come from that document, and ThumbnailService
+renders from it (see ThumbnailService.attach_session). The PyPDF2 reader
+that extraction writes from is only created on first use, from the same
+path or mapping, so loading and browsing a PDF never pay for a second parse.
+"""
+
+import threading
+from typing import Optional
+
+import fitz  # PyMuPDF
+from PyPDF2 import PdfReader
+
+from services import instrumentation
+from services.mapped_file import MappedFile, try_map
+
+
+class DocumentSession:
+    """
+    An open PDF.
+
+    fitz documents aren't thread-safe, so `document` and `metadata` belong
+    to the Tk thread. reader() may be called from an
+    extraction thread.
+
+    Args:
+        path: PDF file to open
+        use_mmap: Read the file through a MappedFile shared by both parsers
+                  (falls back to normal file reads if it can't be mapped)
+
+    Raises:
+        fitz.FileDataError: If the file isn't a readable PDF
+        OSError: If the file can't be opened
+    """
+
+    def __init__(self, path: str, use_mmap: bool = False):
+        self.path = path
+        self.mapped: Optional[MappedFile] = try_map(path) if use_mmap else None
+        if self.mapped is not None:
+            self.document = fitz.open(stream=self.mapped.view(), filetype='pdf')
+        else:
+            self.document = fitz.open(path, filetype='pdf')
+        self._reader: Optional[PdfReader] = None
+        self._reader_lock = threading.Lock()
+
+    @property
+    def page_count(self) -> int:
+        return self.document.page_count
+
+    @property
+    def is_encrypted(self) -> bool:
+        """True if the PDF needs a password or is encrypted at all (PyPDF2 can't write from it)."""
+        return bool(self.document.needs_pass or self.document.metadata.get('encryption'))
+
+    @property
+    def metadata(self) -> dict:
+        """Title, author, subject and creator ('' when not set)."""
+        metadata = self.document.metadata or {}
+        return {key: metadata.get(key) or '' for key in ('title', 'author', 'subject', 'creator')}
+
+    def reader(self) -> PdfReader:
+        """The PyPDF2 reader for extraction, parsed on first call."""
+        with self._reader_lock:
+            if self._reader is None:
+                with instrumentation.span('pdf.reader', path=self.path):
+                    self._reader = PdfReader(self.mapped.stream if self.mapped else self.path)
+            return self._reader
+
+    def close(self):
+        """
+        Close the PyMuPDF document.
+
+        The mapping isn't closed explicitly: a running extraction may still
+        be reading through the PyPDF2 reader. It is unmapped once the last
+        user is collected.
+        """
+        self.document.close()
+        self.mapped = None
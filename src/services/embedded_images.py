@@ -0,0 +1,82 @@
+"""
+Embedded Images - Use a page's stored /Thumb instead of rendering it
+
+PDF writers (notably scanning software) may store a ready-made preview image
+in each page's /Thumb entry. When it is at least as large as the requested
+thumbnail, scaling it down is much cheaper than rasterizing the page.
+
+Everything here returns None when the fast path doesn't apply, and callers
+fall back to a normal render.
+"""
+
+from typing import Optional, Tuple
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+
+# Clockwise angle -> PIL transpose (PIL's ROTATE_* turn counter-clockwise)
+_TRANSPOSE = {
+    90: Image.Transpose.ROTATE_270,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_90,
+}
+
+
+def render_size(page: fitz.Page, width: int, rotation: int = 0) -> Tuple[int, int]:
+    """Pixel size get_pixmap() produces for this page at `width`, rotated clockwise."""
+    zoom = width / page.rect.width
+    irect = (page.rect * fitz.Matrix(zoom, zoom).prerotate(rotation)).irect
+    return irect.width, irect.height
+
+
+def page_image(doc: fitz.Document, page: fitz.Page, width: int,
+               rotation: int = 0) -> Optional[Image.Image]:
+    """
+    Get a page thumbnail from its /Thumb image instead of rendering it.
+
+    Args:
+        doc: Open document the page belongs to
+        page: The page
+        width: Desired width (before rotation), as for a normal render
+        rotation: Clockwise rotation in degrees (multiple of 90)
+
+    Returns:
+        RGB image the same size as the equivalent render, or None if the
+        page has no /Thumb at least that large
+    """
+    if rotation % 90:
+        return None
+    try:
+        out_w, out_h = render_size(page, width, rotation)
+        # /Thumb shows the page in unrotated page space
+        total = (page.rotation + rotation) % 360
+        base_size = (out_h, out_w) if total % 180 else (out_w, out_h)
+
+        img = _thumb_image(doc, page, base_size)
+        if img is None:
+            return None
+
+        if img.size != base_size:
+            img = img.resize(base_size, Image.Resampling.LANCZOS)
+        if total:
+            img = img.transpose(_TRANSPOSE[total])
+        return img
+    except Exception:
+        return None
+
+
+def _thumb_image(doc: fitz.Document, page: fitz.Page,
+                 size: Tuple[int, int]) -> Optional[Image.Image]:
+    """Use the page's /Thumb if it is at least as large as the requested size."""
+    kind, value = doc.xref_get_key(page.xref, "Thumb")
+    if kind != 'xref':
+        return None
+    pix = fitz.Pixmap(doc, int(value.split()[0]))
+    if pix.width < size[0] or pix.height < size[1]:
+        return None
+    if pix.n - pix.alpha != 3:
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    return Image.frombuffer("RGB", (pix.width, pix.height), pix.samples, "raw", "RGB", 0, 1)
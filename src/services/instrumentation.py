@@ -0,0 +1,337 @@
+"""
+Instrumentation - Timing spans, counters and histograms
+
+Off by default. Turn it on with the DPDF_TRACE environment variable or the
+`trace_file` config setting, both naming the file to write:
+
+    *.json   Chrome trace format (open in chrome://tracing or Perfetto)
+    other    JSON Lines, one event per line, appended
+
+Either way events are written as they happen, so a long session doesn't
+accumulate them in memory (and a trace cut short by a crash still loads:
+the Chrome JSON array format allows a missing closing bracket).
+Histograms keep running totals plus a fixed-size sample for percentiles.
+
+When disabled, span() returns a shared no-op context manager and the other
+calls return after a single check, so call sites can stay in hot paths.
+"""
+
+import atexit
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+ENV_VAR = 'DPDF_TRACE'
+
+# The active recorder, or None while instrumentation is disabled
+_recorder: Optional["_Recorder"] = None
+
+
+class _NullSpan:
+    """Stand-in returned by span() while disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """A timed region; recorded as one complete event when it exits."""
+
+    __slots__ = ('_recorder', 'name', 'attrs', '_start')
+
+    def __init__(self, recorder: "_Recorder", name: str, attrs: dict):
+        self._recorder = recorder
+        self.name = name
+        self.attrs = attrs
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.attrs['error'] = f"{exc_type.__name__}: {exc}"
+        self._recorder.record_span(self.name, self._start, end, self.attrs)
+        return False
+
+    def set(self, **attrs):
+        """Attach attributes discovered inside the span (e.g. a result size)."""
+        self.attrs.update(attrs)
+
+
+class _Histogram:
+    """Running count/sum/min/max and a uniform reservoir sample of values."""
+
+    __slots__ = ('count', 'total', 'min', 'max', '_samples', '_rng')
+
+    # Samples kept for percentiles, however many values are added
+    RESERVOIR_SIZE = 1024
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+        self._samples: List[float] = []
+        self._rng = random.Random(0)
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._samples) < self.RESERVOIR_SIZE:
+            self._samples.append(value)
+        else:
+            index = self._rng.randrange(self.count)
+            if index < self.RESERVOIR_SIZE:
+                self._samples[index] = value
+
+    def summary(self) -> dict:
+        """Count, total, min/max and percentiles (estimated from the sample)."""
+        ordered = sorted(self._samples)
+
+        def pick(q):
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'min': self.min,
+            'p50': pick(0.50),
+            'p90': pick(0.90),
+            'p99': pick(0.99),
+            'max': self.max,
+        }
+
+
+class _Recorder:
+    """Collects events and aggregates for one trace file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.chrome = path.lower().endswith('.json')
+        self.pid = os.getpid()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._histograms: Dict[str, _Histogram] = {}
+        self._first_event = True
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.chrome:
+            # JSON array format: events are appended, ']' is written by close()
+            self._file = open(path, 'w', encoding='utf-8')
+            self._file.write('[\n')
+        else:
+            self._file = open(path, 'a', encoding='utf-8')
+            self._emit({'type': 'start', 'time': time.time(), 'pid': self.pid})
+
+    def _us(self, t: float) -> float:
+        return round((t - self._origin) * 1e6, 1)
+
+    def _emit(self, event: dict):
+        """Write one event. Caller must not hold the lock."""
+        line = json.dumps(event, default=str)
+        with self._lock:
+            if self._file is None:
+                return  # Closed
+            if self.chrome and not self._first_event:
+                line = ',\n' + line
+            elif not self.chrome:
+                line += '\n'
+            self._first_event = False
+            self._file.write(line)
+
+    def _add_sample(self, name: str, value: float):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = _Histogram()
+            histogram.add(value)
+
+    def record_span(self, name: str, start: float, end: float, attrs: dict):
+        if os.getpid() != self.pid:
+            return  # Forked worker inherited the recorder; its file isn't ours
+        duration_ms = (end - start) * 1000
+        self._add_sample(name, duration_ms)
+        if self.chrome:
+            self._emit({'name': name, 'cat': name.split('.', 1)[0], 'ph': 'X',
+                        'ts': self._us(start), 'dur': round(duration_ms * 1000, 1),
+                        'pid': self.pid, 'tid': threading.get_ident(), 'args': attrs})
+        else:
+            self._emit({'type': 'span', 'name': name, 'ts_us': self._us(start),
+                        'dur_ms': round(duration_ms, 3), 'thread': threading.current_thread().name,
+                        **({'attrs': attrs} if attrs else {})})
+
+    def count(self, name: str, value: float):
+        if os.getpid() != self.pid:
+            return
+        with self._lock:
+            total = self._counters.get(name, 0) + value
+            self._counters[name] = total
+        if self.chrome:
+            self._emit({'name': name, 'ph': 'C', 'ts': self._us(time.perf_counter()),
+                        'pid': self.pid, 'args': {'value': total}})
+
+    def observe(self, name: str, value: float):
+        if os.getpid() != self.pid:
+            return
+        self._add_sample(name, value)
+
+    def event(self, name: str, attrs: dict):
+        if os.getpid() != self.pid:
+            return
+        now = time.perf_counter()
+        if self.chrome:
+            self._emit({'name': name, 'ph': 'i', 's': 't', 'ts': self._us(now),
+                        'pid': self.pid, 'tid': threading.get_ident(), 'args': attrs})
+        else:
+            self._emit({'type': 'event', 'name': name, 'ts_us': self._us(now),
+                        'thread': threading.current_thread().name, 'attrs': attrs})
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {name: h.summary() for name, h in self._histograms.items()}
+        return {'counters': counters, 'histograms': histograms}
+
+    def close(self):
+        """Write the aggregates and finish the file."""
+        stats = self.stats()
+        if self.chrome:
+            # Aggregates ride on a final instant event's args
+            self._emit({'name': 'instrumentation.summary', 'ph': 'i', 's': 'g',
+                        'ts': self._us(time.perf_counter()), 'pid': self.pid, 'args': stats})
+        else:
+            for name, value in stats['counters'].items():
+                self._emit({'type': 'counter', 'name': name, 'value': value})
+            for name, summary in stats['histograms'].items():
+                self._emit({'type': 'histogram', 'name': name, **summary})
+        with self._lock:
+            if self._file is not None:
+                if self.chrome:
+                    self._file.write('\n]\n')
+                self._file.close()
+                self._file = None
+
+
+def configure(trace_file: Optional[str] = None) -> bool:
+    """
+    Start (or stop) recording.
+
+    The DPDF_TRACE environment variable takes precedence over trace_file.
+    Calling again closes the previous trace first.
+
+    Args:
+        trace_file: Path of the trace to write; empty or None disables
+                    instrumentation unless DPDF_TRACE is set
+
+    Returns:
+        True if instrumentation is now enabled
+    """
+    global _recorder
+    shutdown()
+    path = os.environ.get(ENV_VAR) or trace_file
+    if not path:
+        return False
+    try:
+        _recorder = _Recorder(os.path.expanduser(path))
+    except OSError as e:
+        print(f"Tracing disabled, cannot open {path}: {e}")
+        return False
+    return True
+
+
+def shutdown():
+    """Finish the trace file and disable instrumentation."""
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is not None and recorder.pid == os.getpid():
+        try:
+            recorder.close()
+        except OSError as e:
+            print(f"Error writing trace {recorder.path}: {e}")
+
+
+atexit.register(shutdown)
+
+
+def is_enabled() -> bool:
+    """True while a trace is being recorded."""
+    return _recorder is not None
+
+
+def span(name: str, **attrs):
+    """
+    Time a block: `with instrumentation.span('pdf.load', path=p): ...`
+
+    The duration is written as an event and added to the histogram of the
+    same name. An exception escaping the block is recorded on the span.
+    """
+    recorder = _recorder
+    if recorder is None:
+        return _NULL_SPAN
+    return _Span(recorder, name, attrs)
+
+
+def count(name: str, value: float = 1):
+    """Add to a counter."""
+    recorder = _recorder
+    if recorder is not None:
+        recorder.count(name, value)
+
+
+def observe(name: str, value: float):
+    """Add a sample to a histogram (e.g. a size or a latency in ms)."""
+    recorder = _recorder
+    if recorder is not None:
+        recorder.observe(name, value)
+
+
+def event(name: str, **attrs):
+    """Record a point-in-time event."""
+    recorder = _recorder
+    if recorder is not None:
+        recorder.event(name, attrs)
+
+
+def error(name: str, exc: BaseException, **attrs):
+    """Record a handled exception as an event and an `errors.<name>` count."""
+    recorder = _recorder
+    if recorder is not None:
+        recorder.event(f"errors.{name}", dict(attrs, error=f"{type(exc).__name__}: {exc}"))
+        recorder.count(f"errors.{name}", 1)
+
+
+def get_stats() -> dict:
+    """
+    Get counters and histogram summaries recorded so far.
+
+    Returns:
+        Dict with 'counters' ({name: total}) and 'histograms'
+        ({name: count/sum/min/p50/p90/p99/max}); empty while disabled
+    """
+    recorder = _recorder
+    if recorder is None:
+        return {'counters': {}, 'histograms': {}}
+    return recorder.stats()
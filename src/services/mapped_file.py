@@ -0,0 +1,82 @@
+"""
+Mapped File - Read-only memory mapping of a source PDF
+
+PdfReader reads its input through many small seek()/read() calls; on a
+buffered file each refill is a system call, which adds up on network shares
+and very large inputs. A MappedFile maps the file once: PyPDF2 reads from
+the mmap object directly and PyMuPDF opens a memoryview of the same mapping
+(fitz.open(stream=...) wraps it without copying), so the parser and the
+renderer work from one copy of the file in memory.
+"""
+
+import mmap
+import os
+from typing import Optional
+
+from services import instrumentation
+
+
+class MappedFile:
+    """
+    A read-only mmap of one file.
+
+    The file must not be truncated or rewritten in place while it is mapped;
+    replacing it (write elsewhere, then rename - as extraction does) is safe.
+
+    Args:
+        path: File to map
+
+    Raises:
+        OSError: If the file can't be opened or mapped
+        ValueError: If the file is empty (empty files can't be mapped)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+            self._mmap: Optional[mmap.mmap] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size = len(self._mmap)
+
+    @property
+    def is_open(self) -> bool:
+        return self._mmap is not None
+
+    @property
+    def stream(self) -> mmap.mmap:
+        """
+        File-like access (read/seek/tell) for PdfReader.
+
+        The position is shared, so only one reader should use it; give
+        other consumers view() instead.
+        """
+        if self._mmap is None:
+            raise ValueError(f"{self.path} is no longer mapped")
+        return self._mmap
+
+    def view(self) -> memoryview:
+        """Zero-copy view of the whole file, e.g. for fitz.open(stream=...)."""
+        return memoryview(self.stream)
+
+    def close(self):
+        """
+        Drop this handle's reference to the mapping.
+
+        Views handed out by view() stay valid; the pages are unmapped once
+        the last of them is released.
+        """
+        mapping, self._mmap = self._mmap, None
+        if mapping is not None:
+            try:
+                mapping.close()
+            except BufferError:
+                pass  # Views still exported - unmapped when they are collected
+
+
+def try_map(path: str) -> Optional[MappedFile]:
+    """Map a file for reading, or None to fall back to buffered reads."""
+    try:
+        return MappedFile(path)
+    except (OSError, ValueError) as e:
+        instrumentation.error('pdf.map', e, path=path)
+        return None
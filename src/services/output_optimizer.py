@@ -0,0 +1,109 @@
+"""
+Output Optimizer - Shrinks extracted PDFs before they are written
+
+Used by extract_pages(optimize=True), on a PyMuPDF document:
+
+1. Streams with identical dictionaries and data are found by SHA-256, and
+   references to the copies are pointed at one of them
+2. save() with garbage=3 drops the now unreferenced copies (and anything
+   else unreferenced) and merges identical non-stream objects, deflate
+   compresses streams stored uncompressed, and use_objstms packs objects
+   into object streams with a cross-reference stream
+
+MuPDF can compare streams itself (garbage=4), but it does so pairwise,
+which takes seconds on outputs with thousands of objects.
+"""
+
+import hashlib
+import re
+from typing import Dict
+
+import fitz  # PyMuPDF
+
+
+SAVE_OPTIONS = {'garbage': 3, 'deflate': True, 'use_objstms': 1}
+
+_REFERENCE = re.compile(r'\b(\d+) 0 R\b')
+_LENGTH = re.compile(r'/Length\s+\d+(\s+0\s+R)?')
+
+# Rounds of merging; a second round is needed when the copies differed only
+# by referring to other copies (e.g. identical images with identical masks)
+_MAX_ROUNDS = 4
+
+
+def dedupe_streams(doc: fitz.Document) -> int:
+    """
+    Point every reference to a duplicate stream at a single copy.
+
+    The copies stay in the document until it is saved with garbage >= 1.
+
+    Returns:
+        Number of streams that became unreferenced
+    """
+    merged = 0
+    for _ in range(_MAX_ROUNDS):
+        replace = _find_duplicates(doc)
+        if not replace:
+            break
+        _rewrite_references(doc, replace)
+        merged += len(replace)
+    return merged
+
+
+def _find_duplicates(doc: fitz.Document) -> Dict[int, int]:
+    """Map each duplicate stream's xref to the xref of its first copy."""
+    first: Dict[bytes, int] = {}
+    replace: Dict[int, int] = {}
+    for xref in range(1, doc.xref_length()):
+        if not doc.xref_is_stream(xref):
+            continue
+        # /Length may be indirect; the data itself is compared instead
+        header = _LENGTH.sub('', doc.xref_object(xref, compressed=True))
+        digest = hashlib.sha256(header.encode('latin-1', 'replace') + b'\0'
+                                + doc.xref_stream_raw(xref)).digest()
+        kept = first.setdefault(digest, xref)
+        if kept != xref:
+            replace[xref] = kept
+    return replace
+
+
+def _rewrite_references(doc: fitz.Document, replace: Dict[int, int]):
+    def substitute(match):
+        xref = int(match.group(1))
+        return f"{replace.get(xref, xref)} 0 R"
+
+    for xref in range(1, doc.xref_length()):
+        if xref in replace:
+            continue
+        if doc.xref_is_stream(xref):
+            # Updating a stream object's source would drop its data; set keys instead
+            for key in doc.xref_get_keys(xref):
+                _, value = doc.xref_get_key(xref, key)
+                updated = _REFERENCE.sub(substitute, value)
+                if updated != value:
+                    doc.xref_set_key(xref, key, updated)
+        else:
+            source = doc.xref_object(xref, compressed=True)
+            updated = _REFERENCE.sub(substitute, source)
+            if updated != source:
+                doc.update_object(xref, updated)
+
+
+def save_optimized(doc: fitz.Document, path: str) -> int:
+    """
+    Deduplicate streams and save with SAVE_OPTIONS.
+
+    Falls back to saving without object streams on PyMuPDF versions that
+    don't support them.
+
+    Returns:
+        Number of duplicate streams removed
+    """
+    merged = dedupe_streams(doc)
+    try:
+        doc.save(path, **SAVE_OPTIONS)
+    except TypeError:
+        options = dict(SAVE_OPTIONS)
+        del options['use_objstms']
+        doc.save(path, **options)
+    return merged
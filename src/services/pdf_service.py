@@ -4,27 +4,185 @@ PDF Service - Core PDF processing functionality
 This module provides the main interface for loading and extracting pages from PDF files.
 """
 
+import multiprocessing
 import os
+import pickle
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Optional, Tuple
-from PyPDF2 import PdfReader, PdfWriter
-from PyPDF2.errors import PdfReadError
+
+import fitz  # PyMuPDF
+from PyPDF2 import PageObject, PdfReader, PdfWriter
 from PyPDF2.generic import RectangleObject
 
+from services import instrumentation
+from services.document_session import DocumentSession
+from services.output_optimizer import save_optimized
+from services.streaming_writer import StreamingPageWriter
+
+
+class ExtractionCancelled(Exception):
+    """Raised inside an extraction when its cancel event is set."""
+
+
+class _CancellableStream:
+    """
+    Output file wrapper that aborts the write once cancel_event is set.
+    
+    PdfWriter.write() emits the whole file in one call; checking on every
+    chunk lets a large write be interrupted part-way through.
+    """
+    
+    def __init__(self, stream, cancel_event: threading.Event):
+        self._stream = stream
+        self._cancel_event = cancel_event
+    
+    def write(self, data) -> int:
+        if self._cancel_event.is_set():
+            raise ExtractionCancelled()
+        return self._stream.write(data)
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+# Source document opened once per batch worker process (see extract_batch)
+_batch_session: Optional[DocumentSession] = None
+
+
+def _init_batch_worker(filepath: str, use_mmap: bool = False):
+    """Process pool initializer: open the source PDF once per worker."""
+    global _batch_session
+    _batch_session = DocumentSession(filepath, use_mmap=use_mmap)
+
+
+# Seconds between cancel checks while waiting on an isolated child process
+_ISOLATED_POLL = 0.05
+
+
+def _isolated_main(target, args: tuple, messages):
+    """Child process entry point for _run_isolated()."""
+    def progress_callback(current, total):
+        messages.put(('progress', current, total))
+    
+    try:
+        messages.put(('done', target(*args, progress_callback=progress_callback)))
+    except BaseException as e:
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(f"{type(e).__name__}: {e}")
+        messages.put(('error', e))
+
+
+def _run_isolated(target, args: tuple, progress_callback: Optional[callable],
+                  cancel_event: Optional[threading.Event]):
+    """
+    Run target(*args, progress_callback=...) in a child process and return its result.
+    
+    Progress is relayed to progress_callback on the calling thread. Setting
+    cancel_event terminates the child and raises ExtractionCancelled;
+    exceptions raised by target are re-raised here.
+    """
+    context = multiprocessing.get_context('spawn')
+    messages = context.Queue()
+    process = context.Process(target=_isolated_main, args=(target, args, messages), daemon=True)
+    process.start()
+    try:
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ExtractionCancelled()
+            try:
+                message = messages.get(timeout=_ISOLATED_POLL)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                try:
+                    # Exited - anything it sent is already in the pipe
+                    message = messages.get(timeout=_ISOLATED_POLL)
+                except queue.Empty:
+                    raise RuntimeError(f"Worker process exited with code {process.exitcode}")
+            
+            if message[0] == 'progress':
+                if progress_callback:
+                    progress_callback(*message[1:])
+            elif message[0] == 'error':
+                raise message[1]
+            else:
+                return message[1]
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        messages.close()
+
+
+def _pymupdf_job(source_path: str, pages: list, partial_path: str,
+                 rotation_overrides: Optional[dict], crop_overrides: Optional[dict],
+                 optimize: bool, progress_callback: Optional[callable] = None,
+                 cancel_event: Optional[threading.Event] = None):
+    """Run the pymupdf engine on its own handle to source_path."""
+    source = fitz.open(source_path, filetype='pdf')
+    try:
+        PDFService._write_with_pymupdf(
+            source, pages, partial_path,
+            rotation_overrides, progress_callback, crop_overrides, cancel_event,
+            optimize,
+        )
+    finally:
+        source.close()
+
+
+def _optimize_into(path: str, optimized_path: str, progress_callback=None) -> int:
+    """Write an optimized copy of path (see output_optimizer); returns streams merged."""
+    doc = fitz.open(path)
+    try:
+        return save_optimized(doc, optimized_path)
+    finally:
+        doc.close()
+
+
+def _run_batch_job(job: dict) -> Tuple[bool, str]:
+    """Run one validated batch job against the worker's document."""
+    return PDFService._extract_from_session(
+        _batch_session, job['pages'], job['output_path'],
+        job.get('rotation_overrides'), None, job.get('crop_overrides'),
+        streaming=job.get('streaming', False),
+        engine=job['engine'],
+        optimize=job.get('optimize', False),
+    )
+
 
 class PDFService:
     """
     Service class for PDF operations including loading, validation, and page extraction.
+    
+    Args:
+        extraction_engine: Library that writes extracted files, one of
+                           ENGINES: 'pypdf2' (pure Python, supports
+                           streaming) or 'pymupdf' (MuPDF's insert_pdf,
+                           faster on large and object-heavy documents)
     """
     
-    def __init__(self):
-        self._reader: Optional[PdfReader] = None
+    ENGINES = ('pypdf2', 'pymupdf')
+    
+    # Most consecutive pages the pymupdf engine copies per insert_pdf call
+    # (progress and cancellation are checked between calls)
+    _PYMUPDF_RUN = 64
+    
+    def __init__(self, extraction_engine: str = 'pypdf2'):
+        self.extraction_engine = extraction_engine
+        self._session: Optional[DocumentSession] = None
         self._filepath: Optional[str] = None
         self._page_count: int = 0
+        self.load_timings: dict[str, float] = {}
     
     @property
     def is_loaded(self) -> bool:
         """Check if a PDF is currently loaded."""
-        return self._reader is not None
+        return self._session is not None
     
     @property
     def page_count(self) -> int:
@@ -43,21 +201,29 @@ class PDFService:
             return os.path.basename(self._filepath)
         return None
     
-    def load_pdf(self, filepath: str) -> Tuple[bool, str]:
+    @property
+    def session(self) -> Optional[DocumentSession]:
+        """The open document, to share with ThumbnailService.attach_session()."""
+        return self._session
+    
+    def load_pdf(self, filepath: str, use_mmap: bool = False) -> Tuple[bool, str]:
         """
         Load a PDF file for processing.
         
+        Opens a DocumentSession (one PyMuPDF parse); the PyPDF2 reader used
+        for extraction is created on the first extraction.
+        
         Args:
             filepath: Path to the PDF file
+            use_mmap: Read the file through a read-only memory mapping
+                      instead of buffered reads (see MappedFile). Falls back
+                      to buffered reads if the file can't be mapped
             
         Returns:
             Tuple of (success: bool, message: str)
         """
         # Reset current state
-        self._reader = None
-        self._filepath = None
-        self._page_count = 0
-        self._initial_rotations = {}
+        self.close()
         
         # Validate file exists
         if not os.path.exists(filepath):
@@ -67,32 +233,44 @@ class PDFService:
         if not filepath.lower().endswith('.pdf'):
             return False, "File is not a PDF"
         
-        try:
-            reader = PdfReader(filepath)
-            
-            # Check if encrypted
-            if reader.is_encrypted:
-                return False, "PDF is encrypted. Please provide an unencrypted PDF."
-            
-            self._reader = reader
-            self._filepath = filepath
-            self._page_count = len(reader.pages)
-            
-            # Store initial rotations to allow non-destructive updates
-            for i, page in enumerate(reader.pages):
-                # /Rotate key might not exist or might be indirect
-                rot = page.get('/Rotate', 0)
-                if isinstance(rot, int):
-                    self._initial_rotations[i] = rot
-                else: 
-                    self._initial_rotations[i] = 0 # Fallback
-            
-            return True, f"PDF loaded successfully. {self._page_count} pages found."
-            
-        except PdfReadError as e:
-            return False, f"Invalid or corrupted PDF file: {str(e)}"
-        except Exception as e:
-            return False, f"Error loading PDF: {str(e)}"
+        with instrumentation.span('pdf.load', path=filepath) as span:
+            try:
+                start = time.perf_counter()
+                session = DocumentSession(filepath, use_mmap=use_mmap)
+                parsed = time.perf_counter()
+                
+                # Check if encrypted
+                if session.is_encrypted:
+                    session.close()
+                    return False, "PDF is encrypted. Please provide an unencrypted PDF."
+                
+                self._session = session
+                self._filepath = filepath
+                self._page_count = session.page_count
+                
+                # The page count comes with the parse; nothing else is read up front
+                self.load_timings = {
+                    'parse': parsed - start,
+                    'total': time.perf_counter() - start,
+                }
+                span.set(pages=self._page_count, mapped=session.mapped is not None,
+                         parse_ms=round(self.load_timings['parse'] * 1000, 3))
+                
+                return True, (
+                    f"PDF loaded successfully. {self._page_count} pages found. "
+                    f"({self._format_load_timings()})"
+                )
+                
+            except fitz.FileDataError as e:
+                instrumentation.error('pdf.load', e, path=filepath)
+                return False, f"Invalid or corrupted PDF file: {str(e)}"
+            except Exception as e:
+                instrumentation.error('pdf.load', e, path=filepath)
+                return False, f"Error loading PDF: {str(e)}"
+    
+    def _format_load_timings(self) -> str:
+        """Format load_timings for the status message."""
+        return f"parsed in {self.load_timings['parse'] * 1000:.0f} ms"
     
     def extract_pages(
         self,
@@ -101,10 +279,17 @@ class PDFService:
         rotation_overrides: Optional[dict[int, int]] = None,
         progress_callback: Optional[callable] = None,
         crop_overrides: Optional[dict[int, tuple]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        streaming: bool = False,
+        engine: Optional[str] = None,
+        optimize: bool = False,
     ) -> Tuple[bool, str]:
         """
         Extract specific pages from the loaded PDF and save to a new file.
 
+        Safe to call from a worker thread; progress_callback is then called
+        on that thread.
+
         Args:
             pages: List of page numbers to extract (1-indexed)
             output_path: Path where the extracted PDF will be saved
@@ -112,6 +297,26 @@ class PDFService:
             progress_callback: Optional callback function(current, total) for progress updates
             crop_overrides: Dict mapping {page_num: (l, t, r, b)} normalized
                             to the page's rendered raster (top-left origin).
+            cancel_event: Optional event; setting it aborts the extraction
+                          and leaves any existing output file untouched.
+            streaming: Write each page to disk as it is added
+                       (StreamingPageWriter) instead of building the whole
+                       document in memory first. Memory stays flat for very
+                       large extractions; document-level structures (outline,
+                       forms, named destinations) are not copied in either mode.
+                       Only used by the pypdf2 engine.
+            engine: Extraction engine for this call (default: extraction_engine).
+                    Called off the main thread, the pymupdf engine runs in a
+                    child process: MuPDF isn't thread-safe and the Tk thread
+                    renders with it at the same time
+            optimize: Run the output_optimizer pass: identical streams
+                      (by hash) and objects are stored once, unreferenced
+                      objects are dropped, uncompressed streams are deflated
+                      and objects are packed into object streams with an xref
+                      stream. With the pypdf2 engine this re-reads and
+                      rewrites the finished file with PyMuPDF. Called off the
+                      main thread, the pass runs in a child process, so it
+                      doesn't hold the GIL and cancel_event can stop it
 
         Returns:
             Tuple of (success: bool, message: str)
@@ -127,45 +332,201 @@ class PDFService:
         if invalid_pages:
             return False, f"Invalid page numbers detected: {invalid_pages}"
         
+        with instrumentation.span('pdf.extract', pages=len(pages), output=output_path):
+            return self._extract_from_session(
+                self._session, pages, output_path,
+                rotation_overrides, progress_callback, crop_overrides,
+                cancel_event, streaming, engine or self.extraction_engine, optimize,
+            )
+    
+    def extract_batch(
+        self,
+        jobs: list[dict],
+        progress_callback: Optional[callable] = None,
+        max_workers: Optional[int] = None,
+    ) -> list[Tuple[bool, str]]:
+        """
+        Extract many output files from the loaded PDF, writing them concurrently.
+
+        Each worker process parses the source once and then serves many jobs,
+        instead of every output paying for a separate load.
+
+        Args:
+            jobs: List of dicts with 'pages' (1-indexed list), 'output_path'
+                  and optional 'rotation_overrides' / 'crop_overrides' /
+                  'streaming' / 'engine' / 'optimize' (same as the
+                  extract_pages arguments)
+            progress_callback: Optional callback function(current, total),
+                               counted in pages across all jobs and called
+                               as each job finishes
+            max_workers: Number of worker processes (default: CPU count,
+                         capped by the number of jobs). 1 runs in-process.
+
+        Returns:
+            List of (success: bool, message: str) in job order
+        """
+        if not self.is_loaded:
+            return [(False, "No PDF loaded. Please load a PDF first.")] * len(jobs)
+        
+        jobs = list(jobs)  # Engine defaults are filled in below; leave the caller's list alone
+        results: list = [None] * len(jobs)
+        runnable = []
+        for index, job in enumerate(jobs):
+            pages = job.get('pages') or []
+            invalid_pages = [p for p in pages if p < 1 or p > self._page_count]
+            if not pages:
+                results[index] = (False, "No pages selected for extraction")
+            elif invalid_pages:
+                results[index] = (False, f"Invalid page numbers detected: {invalid_pages}")
+            elif not job.get('output_path'):
+                results[index] = (False, "Output path is required")
+            else:
+                jobs[index] = dict(job, engine=job.get('engine') or self.extraction_engine)
+                runnable.append(index)
+        
+        total_pages = sum(len(jobs[i]['pages']) for i in runnable)
+        done_pages = 0
+        
+        def job_finished(index: int, result: Tuple[bool, str]):
+            nonlocal done_pages
+            results[index] = result
+            done_pages += len(jobs[index]['pages'])
+            if progress_callback:
+                progress_callback(done_pages, total_pages)
+        
+        workers = min(max_workers or os.cpu_count() or 1, len(runnable))
+        if workers <= 1:
+            for index in runnable:
+                job = jobs[index]
+                job_finished(index, self._extract_from_session(
+                    self._session, job['pages'], job['output_path'],
+                    job.get('rotation_overrides'), None, job.get('crop_overrides'),
+                    streaming=job.get('streaming', False),
+                    engine=job['engine'],
+                    optimize=job.get('optimize', False),
+                ))
+            return results
+        
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_batch_worker,
+                initargs=(self._filepath, self._session.mapped is not None),
+            ) as executor:
+                futures = {executor.submit(_run_batch_job, jobs[i]): i for i in runnable}
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = (False, f"Error extracting pages: {str(e)}")
+                    job_finished(futures[future], result)
+        except Exception as e:
+            # Pool couldn't start - mark whatever didn't finish as failed
+            for index in runnable:
+                if results[index] is None:
+                    results[index] = (False, f"Error extracting pages: {str(e)}")
+        
+        return results
+    
+    @staticmethod
+    def _extract_from_session(
+        session: DocumentSession,
+        pages: list[int],
+        output_path: str,
+        rotation_overrides: Optional[dict[int, int]] = None,
+        progress_callback: Optional[callable] = None,
+        crop_overrides: Optional[dict[int, tuple]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        streaming: bool = False,
+        engine: str = 'pypdf2',
+        optimize: bool = False,
+    ) -> Tuple[bool, str]:
+        """
+        Write already-validated pages of a document to a new file.
+
+        Shared by extract_pages() and the batch worker processes. The file
+        is written next to output_path and moved into place once complete,
+        so a cancelled or failed write never leaves a truncated PDF behind.
+        """
+        if engine not in PDFService.ENGINES:
+            return False, f"Unknown extraction engine '{engine}' (expected one of {', '.join(PDFService.ENGINES)})"
+        
+        partial_path = output_path + '.part'
         try:
-            writer = PdfWriter()
             total_pages = len(pages)
             
-            # Extract pages (convert 1-indexed to 0-indexed)
+            # Ensure output directory exists
+            output_dir = os.path.dirname(output_path)
+            if output_dir and not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+            
+            if engine == 'pymupdf':
+                # The optimize pass, if any, is part of the engine's save
+                args = (session.path, pages, partial_path, rotation_overrides, crop_overrides, optimize)
+                if PDFService._off_main_thread():
+                    _run_isolated(_pymupdf_job, args, progress_callback, cancel_event)
+                else:
+                    _pymupdf_job(*args, progress_callback=progress_callback, cancel_event=cancel_event)
+            elif streaming:
+                PDFService._stream_pages(
+                    session.reader(), pages, partial_path,
+                    rotation_overrides, progress_callback, crop_overrides, cancel_event,
+                )
+            else:
+                PDFService._write_pages(
+                    session.reader(), pages, partial_path,
+                    rotation_overrides, progress_callback, crop_overrides, cancel_event,
+                )
+            
+            if optimize and engine != 'pymupdf':
+                PDFService._optimize_file(partial_path, cancel_event)
+            os.replace(partial_path, output_path)
+            instrumentation.count('pdf.pages_written', total_pages)
+            
+            return True, f"Successfully extracted {total_pages} page(s) to {os.path.basename(output_path)}"
+            
+        except ExtractionCancelled:
+            instrumentation.event('pdf.extract.cancelled', output=output_path)
+            PDFService._remove_partial(partial_path)
+            return False, "Extraction cancelled"
+        except PermissionError as e:
+            instrumentation.error('pdf.extract', e, output=output_path)
+            PDFService._remove_partial(partial_path)
+            return False, "Permission denied. Cannot write to output location."
+        except Exception as e:
+            instrumentation.error('pdf.extract', e, output=output_path)
+            PDFService._remove_partial(partial_path)
+            return False, f"Error extracting pages: {str(e)}"
+    
+    @staticmethod
+    def _write_pages(
+        reader: PdfReader,
+        pages: list[int],
+        partial_path: str,
+        rotation_overrides: Optional[dict[int, int]],
+        progress_callback: Optional[callable],
+        crop_overrides: Optional[dict[int, tuple]],
+        cancel_event: Optional[threading.Event],
+    ):
+        """Write pages to partial_path with PdfWriter."""
+        total_pages = len(pages)
+        writer = PdfWriter()
+        
+        # Extract pages (convert 1-indexed to 0-indexed)
+        with instrumentation.span('pdf.extract.add_pages', pages=total_pages):
             for i, page_num in enumerate(pages):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ExtractionCancelled()
                 page_idx = page_num - 1
-                page = self._reader.pages[page_idx]
+                page = reader.pages[page_idx]
                 
-                # Apply rotation
+                writer.add_page(page)
+                
+                # Apply rotation: absolute rotation = initial + override.
+                # add_page() clones the page, so rotating the writer's copy
+                # leaves the source reader untouched across extractions.
                 if rotation_overrides and page_num in rotation_overrides:
-                    # Logic: Absolute rotation = Initial + Override
-                    base_rot = self._initial_rotations.get(page_idx, 0)
-                    override = rotation_overrides[page_num]
-                    # Ensure multiple of 90
-                    target_rot = (base_rot + override) % 360
-                    
-                    # Temporarily modify page object for write
-                    # Note: PyPDF2 page modification persists in this reader session
-                    # But since we recalculate target_rot every time based on immutable initial, it's safe.
-                    page.rotate(target_rot - page.get('/Rotate', 0)) # Apply delta from CURRENT state?
-                    # Actually: simpler to just set the property if PyPDF2 supports it.
-                    # page.rotate(angle) adds angle.
-                    # page.transfer_rotation_to_content() ?
-                    # Safest: writer.add_page(page) then writer_page.rotate(angle)?
-                    # writer.add_page returns proper page object? No, returns None usually or page.
-                    
-                    # Let's try:
-                    # writer.add_page(page)
-                    # output_page = writer.pages[-1]
-                    # output_page.rotate(override) -> This rotates RELATIVE to what was added.
-                    # If loaded page has 90, and we want +90 (total 180).
-                    # writer receives page (90). output_page.rotate(90) -> 180.
-                    # This seems cleaner than modifying source reader.
-                    
-                    writer.add_page(page)
-                    writer.pages[-1].rotate(override)
-                else:
-                    writer.add_page(page)
+                    writer.pages[-1].rotate(rotation_overrides[page_num])
 
                 # Apply crop (cropbox) if provided. crop coords are normalized
                 # to the rendered raster (top-left origin). PDF cropbox is in
@@ -173,26 +534,171 @@ class PDFService:
                 # is 0 for the source page; PDFs with /Rotate may need extra
                 # remapping which is not handled here.
                 if crop_overrides and page_num in crop_overrides:
-                    self._apply_cropbox(writer.pages[-1], crop_overrides[page_num])
+                    PDFService._apply_cropbox(writer.pages[-1], crop_overrides[page_num])
 
                 if progress_callback:
                     progress_callback(i + 1, total_pages)
+        
+        # Write output file
+        with instrumentation.span('pdf.extract.write', pages=total_pages) as span:
+            with open(partial_path, 'wb') as output_file:
+                if cancel_event is not None:
+                    writer.write(_CancellableStream(output_file, cancel_event))
+                else:
+                    writer.write(output_file)
+            span.set(bytes=os.path.getsize(partial_path))
+    
+    @staticmethod
+    def _off_main_thread() -> bool:
+        """
+        True on a secondary thread, e.g. the GUI's extraction thread.
+        
+        MuPDF holds the GIL for the length of a save and isn't thread-safe,
+        so long MuPDF work started there runs in a child process instead of
+        stalling (or racing) the main thread.
+        """
+        return threading.current_thread() is not threading.main_thread()
+    
+    @staticmethod
+    def _optimize_file(path: str, cancel_event: Optional[threading.Event]):
+        """
+        Rewrite a finished output in place through output_optimizer.
+        
+        Runs in a child process when called off the main thread (see
+        _off_main_thread); cancel_event then stops it part-way.
+        """
+        optimized_path = path + '.opt'
+        with instrumentation.span('pdf.extract.optimize') as span:
+            try:
+                if PDFService._off_main_thread():
+                    merged = _run_isolated(_optimize_into, (path, optimized_path), None, cancel_event)
+                else:
+                    merged = _optimize_into(path, optimized_path)
+            except BaseException:
+                PDFService._remove_partial(optimized_path)
+                raise
+            span.set(streams_merged=merged)
+            # An in-process save() can't be interrupted; honour a cancel that arrived meanwhile
+            if cancel_event is not None and cancel_event.is_set():
+                PDFService._remove_partial(optimized_path)
+                raise ExtractionCancelled()
+            span.set(bytes_before=os.path.getsize(path), bytes=os.path.getsize(optimized_path))
+            os.replace(optimized_path, path)
+    
+    @staticmethod
+    def _stream_pages(
+        reader: PdfReader,
+        pages: list[int],
+        partial_path: str,
+        rotation_overrides: Optional[dict[int, int]],
+        progress_callback: Optional[callable],
+        crop_overrides: Optional[dict[int, tuple]],
+        cancel_event: Optional[threading.Event],
+    ):
+        """Write pages to partial_path one at a time (see StreamingPageWriter)."""
+        total_pages = len(pages)
+        with instrumentation.span('pdf.extract.stream', pages=total_pages) as span, \
+                open(partial_path, 'wb') as output_file:
+            stream = output_file
+            if cancel_event is not None:
+                stream = _CancellableStream(output_file, cancel_event)
+            writer = StreamingPageWriter(reader, stream, total_pages, [p - 1 for p in pages])
             
-            # Ensure output directory exists
-            output_dir = os.path.dirname(output_path)
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            
-            # Write output file
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
-            
-            return True, f"Successfully extracted {total_pages} page(s) to {os.path.basename(output_path)}"
+            for i, page_num in enumerate(pages):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ExtractionCancelled()
+                
+                # Shallow copy, so overrides never touch the loaded document
+                page = PageObject(None)
+                page.update(reader.pages[page_num - 1])
+                if rotation_overrides and page_num in rotation_overrides:
+                    page.rotate(rotation_overrides[page_num])
+                if crop_overrides and page_num in crop_overrides:
+                    PDFService._apply_cropbox(page, crop_overrides[page_num])
+                
+                writer.add_page(page)
+                
+                if progress_callback:
+                    progress_callback(i + 1, total_pages)
             
-        except PermissionError:
-            return False, "Permission denied. Cannot write to output location."
-        except Exception as e:
-            return False, f"Error extracting pages: {str(e)}"
+            writer.close()
+            span.set(bytes=writer.bytes_written)
+    
+    @staticmethod
+    def _write_with_pymupdf(
+        source: fitz.Document,
+        pages: list[int],
+        partial_path: str,
+        rotation_overrides: Optional[dict[int, int]],
+        progress_callback: Optional[callable],
+        crop_overrides: Optional[dict[int, tuple]],
+        cancel_event: Optional[threading.Event],
+        optimize: bool = False,
+    ):
+        """Write pages of source to partial_path with PyMuPDF's insert_pdf."""
+        total_pages = len(pages)
+        with instrumentation.span('pdf.extract.pymupdf', pages=total_pages) as span:
+            output = fitz.open()
+            try:
+                start = 0
+                while start < total_pages:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise ExtractionCancelled()
+                    
+                    # Copy runs of consecutive pages in one call; each call has
+                    # a fixed cost. final=False keeps the source -> output object
+                    # map between calls, so shared resources are copied once.
+                    end = start + 1
+                    while (end < total_pages and end - start < PDFService._PYMUPDF_RUN
+                           and pages[end] == pages[end - 1] + 1):
+                        end += 1
+                    output.insert_pdf(source, from_page=pages[start] - 1,
+                                      to_page=pages[end - 1] - 1, final=False)
+                    
+                    # Same results as the pypdf2 engine: rotation adds to the
+                    # page's own /Rotate, the crop box is set in mediabox space
+                    for i in range(start, end):
+                        page_num = pages[i]
+                        rotate = rotation_overrides and page_num in rotation_overrides
+                        crop = crop_overrides and page_num in crop_overrides
+                        if not (rotate or crop):
+                            continue
+                        page = output[i]
+                        if rotate:
+                            page.set_rotation((page.rotation + rotation_overrides[page_num]) % 360)
+                        if crop:
+                            mb = page.mediabox
+                            box = PDFService._cropbox_from_normalized(
+                                (mb.x0, mb.y0, mb.x1, mb.y1), crop_overrides[page_num])
+                            if box:
+                                output.xref_set_key(page.xref, 'CropBox',
+                                                    '[%s]' % ' '.join(f"{v:.4f}" for v in box))
+                    
+                    start = end
+                    if progress_callback:
+                        progress_callback(end, total_pages)
+                
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ExtractionCancelled()
+                if optimize:
+                    span.set(streams_merged=save_optimized(output, partial_path))
+                else:
+                    output.save(partial_path)
+                # save() can't be interrupted; honour a cancel that arrived meanwhile
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ExtractionCancelled()
+                span.set(bytes=os.path.getsize(partial_path))
+            finally:
+                output.close()
+    
+    @staticmethod
+    def _remove_partial(partial_path: str):
+        """Delete an incomplete output file, if one was started."""
+        try:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        except OSError:
+            pass
     
     @staticmethod
     def _apply_cropbox(page, crop_norm):
@@ -200,10 +706,24 @@ class PDFService:
         Set the page's cropbox from a normalized (l, t, r, b) tuple where the
         coords are in the rendered raster space (top-left origin, range 0..1).
         """
+        mb = page.mediabox
+        box = PDFService._cropbox_from_normalized(
+            (float(mb.left), float(mb.bottom), float(mb.right), float(mb.top)), crop_norm)
+        if box:
+            page.cropbox = RectangleObject(box)
+
+    @staticmethod
+    def _cropbox_from_normalized(mediabox: tuple, crop_norm) -> Optional[list]:
+        """
+        Convert a normalized (l, t, r, b) crop (top-left origin) to a PDF
+        [left, bottom, right, top] box inside mediabox (left, bottom, right, top).
+
+        Returns None for malformed or empty crops.
+        """
         try:
             l, t, r, b = crop_norm
         except (TypeError, ValueError):
-            return
+            return None
 
         # Clamp & sanity-check
         l = max(0.0, min(1.0, float(l)))
@@ -211,13 +731,9 @@ class PDFService:
         r = max(0.0, min(1.0, float(r)))
         b = max(0.0, min(1.0, float(b)))
         if r <= l or b <= t:
-            return
+            return None
 
-        mb = page.mediabox
-        mb_l = float(mb.left)
-        mb_b = float(mb.bottom)
-        mb_r = float(mb.right)
-        mb_t = float(mb.top)
+        mb_l, mb_b, mb_r, mb_t = mediabox
         mb_w = mb_r - mb_l
         mb_h = mb_t - mb_b
 
@@ -227,7 +743,7 @@ class PDFService:
         pdf_top = mb_t - t * mb_h
         pdf_bot = mb_t - b * mb_h
 
-        page.cropbox = RectangleObject([pdf_l, pdf_bot, pdf_r, pdf_top])
+        return [pdf_l, pdf_bot, pdf_r, pdf_top]
 
     def get_metadata(self) -> dict:
         """
@@ -240,14 +756,9 @@ class PDFService:
             return {}
         
         try:
-            metadata = self._reader.metadata
-            if metadata:
-                return {
-                    'title': metadata.get('/Title', ''),
-                    'author': metadata.get('/Author', ''),
-                    'subject': metadata.get('/Subject', ''),
-                    'creator': metadata.get('/Creator', ''),
-                }
+            metadata = self._session.metadata
+            if any(metadata.values()):
+                return metadata
         except Exception:
             pass
         
@@ -255,9 +766,12 @@ class PDFService:
     
     def close(self):
         """Close the currently loaded PDF and reset state."""
-        self._reader = None
+        session, self._session = self._session, None
+        if session:
+            session.close()
         self._filepath = None
         self._page_count = 0
+        self.load_timings = {}
     
     def suggest_output_filename(self, start_page: int, end_page: int) -> str:
         """
@@ -0,0 +1,159 @@
+"""
+Render Pool - Rasterizes PDF pages in background worker processes
+
+PyMuPDF holds the GIL for most of a render, so thumbnails are produced in a
+process pool. Workers return raw RGB pixel buffers; completed jobs are queued
+and their callbacks are run by whoever calls process_completed() - the Tk
+thread, polling with after().
+"""
+
+import os
+import queue
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor
+from typing import Callable, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from services.embedded_images import page_image
+from services.thumbnail_cache import FileStamp, file_stamp
+
+
+# Per-worker-process document handles, so consecutive pages of the same file
+# don't reopen it. Each is tagged with the file_stamp() it was opened at; a
+# file rewritten at the same path is opened again.
+_worker_docs: "OrderedDict[str, Tuple[Optional[FileStamp], fitz.Document]]" = OrderedDict()
+WORKER_MAX_DOCUMENTS = 2
+
+
+def _worker_document(pdf_path: str) -> Tuple[Optional[FileStamp], fitz.Document]:
+    """Get (or open) a document inside a worker process, with its stamp."""
+    stamp = file_stamp(pdf_path)
+    cached = _worker_docs.get(pdf_path)
+    if cached is not None:
+        if cached[0] == stamp:
+            _worker_docs.move_to_end(pdf_path)
+            return cached
+        del _worker_docs[pdf_path]
+        cached[1].close()
+
+    entry = (stamp, fitz.open(pdf_path))
+    _worker_docs[pdf_path] = entry
+    while len(_worker_docs) > WORKER_MAX_DOCUMENTS:
+        _, (_, old) = _worker_docs.popitem(last=False)
+        old.close()
+    return entry
+
+
+def render_page(pdf_path: str, page_num: int, width: int,
+                rotation: int = 0) -> Optional[Tuple[int, int, bytes, Optional[FileStamp]]]:
+    """
+    Render one page to a raw RGB buffer. Runs in a worker process.
+
+    Args:
+        pdf_path: Path to the PDF file
+        page_num: Page number (1-indexed)
+        width: Desired image width (before rotation)
+        rotation: Clockwise rotation in degrees (multiple of 90)
+
+    Returns:
+        Tuple of (width, height, rgb_bytes, stamp) or None for an invalid
+        page; stamp is the file_stamp() of the file version rendered
+    """
+    stamp, doc = _worker_document(pdf_path)
+    if page_num < 1 or page_num > len(doc):
+        return None
+
+    page = doc.load_page(page_num - 1)
+
+    # Pages carrying a large enough /Thumb skip rasterizing
+    img = page_image(doc, page, width, rotation)
+    if img is not None:
+        return img.width, img.height, img.tobytes(), stamp
+
+    zoom = width / page.rect.width
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom).prerotate(rotation), alpha=False)
+    return pix.width, pix.height, pix.samples, stamp
+
+
+class RenderWorkerPool:
+    """
+    Process pool for page rendering with a completion queue for the UI thread.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        if not max_workers:
+            max_workers = max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._completed: "queue.Queue[Tuple[Callable, Future]]" = queue.Queue()
+        self._broken = False
+
+    @property
+    def is_available(self) -> bool:
+        """False once the pool failed to start or a worker died."""
+        return not self._broken
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Workers are spawned lazily so that app startup doesn't pay for them
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def submit(self, pdf_path: str, page_num: int, width: int,
+               callback: Callable[[Future], None], rotation: int = 0) -> Optional[Future]:
+        """
+        Queue a page render.
+
+        Args:
+            pdf_path: Path to the PDF file
+            page_num: Page number (1-indexed)
+            width: Desired image width (before rotation)
+            callback: Called with the finished (or cancelled) Future from
+                      process_completed()
+            rotation: Clockwise rotation in degrees (multiple of 90)
+
+        Returns:
+            The Future, or None if the pool is unavailable
+        """
+        if self._broken:
+            return None
+        try:
+            future = self._get_executor().submit(render_page, pdf_path, page_num, width, rotation)
+        except Exception as e:
+            print(f"Render pool unavailable, falling back to in-process rendering: {e}")
+            self._broken = True
+            return None
+
+        future.add_done_callback(lambda f: self._completed.put((callback, f)))
+        return future
+
+    def process_completed(self, max_items: int = 64) -> int:
+        """
+        Run callbacks for finished renders. Call from the UI thread.
+
+        Args:
+            max_items: Upper bound on callbacks run per call, so one poll
+                       can't monopolize the event loop
+
+        Returns:
+            Number of callbacks run
+        """
+        count = 0
+        while count < max_items:
+            try:
+                callback, future = self._completed.get_nowait()
+            except queue.Empty:
+                break
+            count += 1
+            if not future.cancelled() and isinstance(future.exception(), (BrokenExecutor, OSError)):
+                # A worker died or couldn't be spawned - stop using the pool
+                self._broken = True
+            callback(future)
+        return count
+
+    def shutdown(self):
+        """Stop the worker processes without waiting for queued renders."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
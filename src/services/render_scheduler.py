@@ -0,0 +1,228 @@
+"""
+Render Scheduler - Viewport-prioritized thumbnail requests
+
+Sits in front of ThumbnailService so that pages the user can see are rendered
+before pages they can't, and queued work for pages scrolled far away is
+dropped instead of occupying the worker pool.
+"""
+
+import heapq
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from PIL import Image
+
+from services.thumbnail_service import ThumbnailService
+
+
+class RenderScheduler:
+    """
+    Priority queue of page renders for one document at one width.
+
+    Requests wait here, ordered by distance from the visible pages, and at
+    most max_in_flight are handed to ThumbnailService at a time. Requests
+    can therefore be reordered or cancelled up until they are dispatched.
+    """
+
+    def __init__(self, thumbnail_service: ThumbnailService, width: int,
+                 max_in_flight: int = 8):
+        self.thumbnail_service = thumbnail_service
+        self.width = width
+        self.max_in_flight = max_in_flight
+
+        self.pdf_path: Optional[str] = None
+        self._callbacks: Dict[int, Callable[[Optional[Image.Image]], None]] = {}
+        self._rotations: Dict[int, int] = {}  # Requested clockwise angle per page
+        self._queued: Set[int] = set()
+        self._heap: List[Tuple[Tuple[int, int], int]] = []
+        self._in_flight: Dict[int, Optional[Future]] = {}
+        self._generation = 0
+        self._pumping = False
+
+        # Viewport (1-indexed, inclusive) and prefetch margin in pages
+        self._first_visible = 1
+        self._last_visible = 1
+        self._prefetch = 0
+
+        self.dispatched = 0
+        self.cancelled = 0
+        self.cache_hits = 0
+
+    @property
+    def has_pending(self) -> bool:
+        """True if requests are waiting to be dispatched."""
+        return bool(self._queued)
+
+    def reset(self, pdf_path: Optional[str]):
+        """
+        Drop all queued requests and switch to another document.
+
+        Args:
+            pdf_path: The document subsequent requests refer to (or None)
+        """
+        for future in self._in_flight.values():
+            if future is not None:
+                future.cancel()
+        self._in_flight.clear()
+        self._callbacks.clear()
+        self._rotations.clear()
+        self._queued.clear()
+        self._heap.clear()
+        self._generation += 1
+        self.pdf_path = pdf_path
+
+    def _priority(self, page_num: int) -> Tuple[int, int]:
+        """Visible pages first (top to bottom), then by distance from the viewport."""
+        if self._first_visible <= page_num <= self._last_visible:
+            return (0, page_num - self._first_visible)
+        if page_num < self._first_visible:
+            return (1, self._first_visible - page_num)
+        return (1, page_num - self._last_visible)
+
+    def _in_window(self, page_num: int) -> bool:
+        """Check if a page is visible or within the prefetch margin."""
+        return (self._first_visible - self._prefetch
+                <= page_num
+                <= self._last_visible + self._prefetch)
+
+    def request(self, page_num: int, callback: Callable[[Optional[Image.Image]], None],
+                rotation: int = 0):
+        """
+        Ask for a page's thumbnail.
+
+        Cached pages call back immediately. Otherwise the request is queued;
+        requesting a page that is already queued or rendering just replaces
+        its callback (and angle - a render already running at the old angle
+        is redone).
+
+        Args:
+            page_num: Page number (1-indexed)
+            callback: Called with the PIL Image, or None if rendering failed
+            rotation: Clockwise rotation in degrees, applied by the renderer
+        """
+        if not self.pdf_path:
+            return
+
+        if page_num in self._callbacks:
+            self._callbacks[page_num] = callback
+            self._rotations[page_num] = rotation
+            return
+
+        img = self.thumbnail_service.get_cached_thumbnail(
+            self.pdf_path, page_num, self.width, rotation
+        )
+        if img is not None:
+            self.cache_hits += 1
+            callback(img)
+            return
+
+        self._callbacks[page_num] = callback
+        self._rotations[page_num] = rotation
+        self._queued.add(page_num)
+        heapq.heappush(self._heap, (self._priority(page_num), page_num))
+
+    def set_viewport(self, first_visible: int, last_visible: int, prefetch: int = 0):
+        """
+        Reprioritize queued work around the visible pages.
+
+        Queued and not-yet-started requests outside the prefetch window are
+        cancelled; their pages must be requested again when they come back
+        into view.
+
+        Args:
+            first_visible: First visible page (1-indexed)
+            last_visible: Last visible page (1-indexed)
+            prefetch: Number of pages before and after the viewport to keep
+        """
+        self._first_visible = first_visible
+        self._last_visible = max(first_visible, last_visible)
+        self._prefetch = max(0, prefetch)
+
+        for page_num in [p for p in self._queued if not self._in_window(p)]:
+            self._queued.discard(page_num)
+            self._callbacks.pop(page_num, None)
+            self._rotations.pop(page_num, None)
+            self.cancelled += 1
+
+        for page_num, future in list(self._in_flight.items()):
+            if not self._in_window(page_num) and future is not None and future.cancel():
+                del self._in_flight[page_num]
+                self._callbacks.pop(page_num, None)
+                self._rotations.pop(page_num, None)
+                self.cancelled += 1
+
+        self._heap = [(self._priority(p), p) for p in self._queued]
+        heapq.heapify(self._heap)
+
+    def pump(self, max_jobs: Optional[int] = None) -> int:
+        """
+        Dispatch the highest priority requests to ThumbnailService.
+
+        Args:
+            max_jobs: Optional cap on dispatches in this call (use 1 when
+                      renders run on the calling thread)
+
+        Returns:
+            Number of requests dispatched
+        """
+        if self._pumping:
+            return 0  # Re-entered from a callback that completed inside request_thumbnail
+        self._pumping = True
+        try:
+            return self._dispatch(max_jobs)
+        finally:
+            self._pumping = False
+
+    def _dispatch(self, max_jobs: Optional[int]) -> int:
+        """Pop and dispatch requests until the in-flight limit is reached."""
+        count = 0
+        while self._heap and len(self._in_flight) < self.max_in_flight:
+            if max_jobs is not None and count >= max_jobs:
+                break
+            _, page_num = heapq.heappop(self._heap)
+            if page_num not in self._queued:
+                continue  # Stale heap entry (cancelled or already dispatched)
+            self._queued.discard(page_num)
+
+            count += 1
+            self.dispatched += 1
+            self._in_flight[page_num] = None
+            generation = self._generation
+            rotation = self._rotations.get(page_num, 0)
+            future = self.thumbnail_service.request_thumbnail(
+                self.pdf_path, page_num, self.width,
+                lambda img, p=page_num, g=generation, r=rotation: self._on_rendered(g, p, r, img),
+                rotation=rotation,
+            )
+            # Cache hits and in-process renders complete inside the call
+            if future is not None and page_num in self._in_flight:
+                self._in_flight[page_num] = future
+        return count
+
+    def _on_rendered(self, generation: int, page_num: int, rotation: int,
+                     img: Optional[Image.Image]):
+        """Deliver a finished render and keep the pipeline full."""
+        if generation != self._generation:
+            return  # Belongs to a previous document
+        self._in_flight.pop(page_num, None)
+        if page_num in self._callbacks and self._rotations.get(page_num, 0) != rotation:
+            # Rotated again while rendering - queue a render at the new angle
+            self._queued.add(page_num)
+            heapq.heappush(self._heap, (self._priority(page_num), page_num))
+        else:
+            self._rotations.pop(page_num, None)
+            callback = self._callbacks.pop(page_num, None)
+            if callback:
+                callback(img)
+        if self.thumbnail_service.renders_in_background:
+            self.pump()
+
+    def get_stats(self) -> dict:
+        """Get queue depth and dispatch/cancel counters."""
+        return {
+            'queued': len(self._queued),
+            'in_flight': len(self._in_flight),
+            'dispatched': self.dispatched,
+            'cancelled': self.cancelled,
+            'cache_hits': self.cache_hits,
+        }
@@ -0,0 +1,190 @@
+"""
+Streaming Writer - Page-by-page PDF output
+
+PdfWriter keeps every added page and everything it references in memory
+and serializes it all in write(). StreamingPageWriter instead writes each
+page, and any objects it references that haven't been written yet, to the
+output as soon as the page is added. Only a table of object offsets and
+the source -> output object number map stay in memory; the page tree,
+catalog, cross-reference table and trailer are written by close().
+"""
+
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NullObject,
+    NumberObject,
+    PdfObject,
+    StreamObject,
+)
+
+
+# Object types that belong to the source document as a whole; references to
+# them from page content are written as null instead of copying the document
+_DOCUMENT_TYPES = ('/Page', '/Pages', '/Catalog')
+
+
+class StreamingPageWriter:
+    """
+    Copies pages of a PdfReader to a binary stream one page at a time.
+
+    Object numbers are assigned on first reference: 1 is the catalog, 2 the
+    page tree, then one per output page (reserved up front so pages can
+    refer to each other, e.g. link annotations), then resources as they are
+    reached. Shared resources such as fonts are written once.
+
+    Args:
+        reader: Source document
+        stream: Binary output, written sequentially
+        page_count: Number of pages that will be added
+        source_pages: Source page indices (0-based) in output order, used to
+                      keep references between extracted pages; references
+                      to pages that aren't extracted become null
+    """
+
+    CATALOG_NUM = 1
+    PAGES_NUM = 2
+
+    def __init__(self, reader: PdfReader, stream: BinaryIO, page_count: int,
+                 source_pages: Optional[List[int]] = None):
+        self._reader = reader
+        self._stream = stream
+        self._page_count = page_count
+        self._page_nums = [self.PAGES_NUM + 1 + i for i in range(page_count)]
+        self._next_num = self.PAGES_NUM + 1 + page_count
+        self._offsets: Dict[int, int] = {}
+        self._written_pages = 0
+        self._closed = False
+
+        # (source idnum, generation) -> output object number; extracted
+        # pages are mapped up front so references between them survive
+        self._remapped: Dict[Tuple[int, int], int] = {}
+        for index, source_index in enumerate(source_pages or []):
+            ref = reader.pages[source_index].indirect_reference
+            if ref is not None:
+                self._remapped.setdefault((ref.idnum, ref.generation), self._page_nums[index])
+
+        version = (reader.pdf_header or '%PDF-1.7')[:8].encode('latin-1')
+        self._position = 0
+        self._write(version + b"\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def bytes_written(self) -> int:
+        """Bytes written to the stream so far."""
+        return self._position
+
+    def _write(self, data: bytes):
+        self._stream.write(data)
+        self._position += len(data)
+
+    def add_page(self, page: DictionaryObject):
+        """
+        Write one page and every not-yet-written object it references.
+
+        Args:
+            page: The page dictionary to copy; pass a modified copy to
+                  change /Rotate or the boxes without touching the reader
+        """
+        if self._written_pages >= self._page_count:
+            raise ValueError(f"Only {self._page_count} page(s) were reserved")
+        num = self._page_nums[self._written_pages]
+        self._written_pages += 1
+
+        pending: List[Tuple[Tuple[int, int], int]] = []
+        out = DictionaryObject()
+        for key, value in page.items():
+            if key == '/Parent':
+                continue
+            out[NameObject(key)] = self._remap(value, pending)
+        out[NameObject('/Parent')] = IndirectObject(self.PAGES_NUM, 0, None)
+        self._write_object(num, out)
+
+        # Write whatever the page pulled in, depth-first by discovery
+        while pending:
+            (idnum, generation), out_num = pending.pop()
+            obj = self._reader.get_object(IndirectObject(idnum, generation, self._reader))
+            if self._is_document_object(obj):
+                # e.g. an annotation's /P pointing at a page that isn't extracted
+                self._write_object(out_num, NullObject())
+                continue
+            self._write_object(out_num, self._remap_direct(obj, pending))
+            # Written objects are never needed again here; drop them from the
+            # reader's cache (it re-reads from the file on demand) so memory
+            # doesn't grow with the number of pages written
+            self._reader.resolved_objects.pop((generation, idnum), None)
+
+    def _is_document_object(self, obj: PdfObject) -> bool:
+        return isinstance(obj, DictionaryObject) and obj.get('/Type') in _DOCUMENT_TYPES
+
+    def _remap(self, value: PdfObject, pending: list) -> PdfObject:
+        """Copy a value, renumbering indirect references (queued for writing)."""
+        if isinstance(value, IndirectObject):
+            key = (value.idnum, value.generation)
+            out_num = self._remapped.get(key)
+            if out_num is None:
+                out_num = self._next_num
+                self._next_num += 1
+                self._remapped[key] = out_num
+                pending.append((key, out_num))
+            return IndirectObject(out_num, 0, None)
+        return self._remap_direct(value, pending)
+
+    def _remap_direct(self, value: PdfObject, pending: list) -> PdfObject:
+        if isinstance(value, StreamObject):
+            out = StreamObject()
+            out._data = value._data
+            for key, item in value.items():
+                if key != '/Length':  # Recomputed from the data on write
+                    out[NameObject(key)] = self._remap(item, pending)
+            return out
+        if isinstance(value, DictionaryObject):
+            out = DictionaryObject()
+            for key, item in value.items():
+                out[NameObject(key)] = self._remap(item, pending)
+            return out
+        if isinstance(value, ArrayObject):
+            return ArrayObject(self._remap(item, pending) for item in value)
+        return value
+
+    def _write_object(self, num: int, obj: PdfObject):
+        self._offsets[num] = self._position
+        self._write(b"%d 0 obj\n" % num)
+        obj.write_to_stream(self, None)
+        self._write(b"\nendobj\n")
+
+    def write(self, data: bytes):
+        """Stream interface for PdfObject.write_to_stream(); tracks the offset."""
+        self._write(data)
+
+    def close(self):
+        """Write the page tree, catalog, cross-reference table and trailer."""
+        if self._closed:
+            return
+        if self._written_pages != self._page_count:
+            raise ValueError(f"{self._written_pages} of {self._page_count} page(s) were added")
+        self._closed = True
+
+        pages = DictionaryObject()
+        pages[NameObject('/Type')] = NameObject('/Pages')
+        pages[NameObject('/Kids')] = ArrayObject(IndirectObject(n, 0, None) for n in self._page_nums)
+        pages[NameObject('/Count')] = NumberObject(self._page_count)
+        self._write_object(self.PAGES_NUM, pages)
+
+        catalog = DictionaryObject()
+        catalog[NameObject('/Type')] = NameObject('/Catalog')
+        catalog[NameObject('/Pages')] = IndirectObject(self.PAGES_NUM, 0, None)
+        self._write_object(self.CATALOG_NUM, catalog)
+
+        size = self._next_num
+        xref_offset = self._position
+        lines = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        for num in range(1, size):
+            lines.append(b"%010d 00000 n \n" % self._offsets[num])
+        self._write(b''.join(lines))
+        self._write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                    % (size, self.CATALOG_NUM, xref_offset))
@@ -0,0 +1,545 @@
+"""
+Thumbnail Cache - Memory and disk storage for rendered page images
+
+In-process images are held in a byte-accounted LRU so memory stays bounded.
+Rendered thumbnails are also stored in a single SQLite file keyed by the
+source file's content hash, so reopening a known PDF can paint the grid
+without re-rasterizing any page.
+"""
+
+import hashlib
+import functools
+import io
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Dict, Set, Tuple, Hashable
+
+from PIL import Image, features
+
+
+# (size, mtime_ns) - identifies one version of a file on disk
+FileStamp = Tuple[int, int]
+
+
+def file_stamp(path: str) -> Optional[FileStamp]:
+    """Get a file's (size, mtime_ns), or None if it can't be stat'ed."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def image_nbytes(img: Image.Image) -> int:
+    """Approximate resident size of a decoded PIL image."""
+    return img.width * img.height * len(img.getbands())
+
+
+class MemoryThumbnailCache:
+    """
+    In-memory LRU cache of rendered images with a byte-size budget.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Image.Image, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def total_bytes(self) -> int:
+        """Total decoded size of the cached images."""
+        return self._total_bytes
+
+    def get(self, key: Hashable) -> Optional[Image.Image]:
+        """
+        Fetch an image and mark it as most recently used.
+
+        Returns:
+            PIL Image or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, img: Image.Image):
+        """
+        Store an image, evicting least recently used entries if over budget.
+
+        Images larger than the whole budget are not cached.
+        """
+        nbytes = image_nbytes(img)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            if nbytes > self.max_bytes:
+                return
+
+            self._entries[key] = (img, nbytes)
+            self._total_bytes += nbytes
+
+            while self._total_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_bytes
+                self.evictions += 1
+
+    def discard(self, predicate):
+        """Remove every entry whose key matches predicate(key)."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                _, nbytes = self._entries.pop(key)
+                self._total_bytes -= nbytes
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def get_stats(self) -> dict:
+        """Get hit/miss/eviction counters and current size."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+class DiskThumbnailCache:
+    """
+    Size-bounded, LRU-evicted on-disk thumbnail store.
+
+    put() and store() only queue the image: encoding and the SQLite write
+    happen on a background writer thread, so storing a render costs the
+    caller nothing. Content hashes are kept in the same database, keyed by
+    path and file_stamp(), so a known file is never read again to build its
+    keys; unknown files are hashed on the writer thread.
+    """
+
+    # Bump when the rendering pipeline changes so stale blobs are never served
+    RENDER_SETTINGS = "rgb-v2"
+
+    # Fraction of the budget to shrink to once eviction kicks in, so that we
+    # don't run an eviction pass on every single insert at the limit.
+    EVICT_TARGET_RATIO = 0.9
+
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    # Tasks waiting for the writer thread; puts beyond this are dropped
+    MAX_PENDING_WRITES = 256
+
+    def __init__(self, db_path: str, max_bytes: int = 256 * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hashes: Dict[str, Tuple[FileStamp, str]] = {}  # path -> (stamp, hash)
+        self._hashing: Set[str] = set()  # Paths queued for background hashing
+        self._format = 'WEBP' if features.check('webp') else 'PNG'
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+        self._writes: "queue.Queue[Optional[Callable[[], None]]]" = queue.Queue(self.MAX_PENDING_WRITES)
+        self._writer: Optional[threading.Thread] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dropped_writes = 0
+
+        self._open()
+
+    def _open(self):
+        """Open (or create) the cache database."""
+        try:
+            directory = os.path.dirname(self.db_path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS thumbnails ("
+                " key TEXT PRIMARY KEY,"
+                " data BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_thumbnails_access"
+                " ON thumbnails(last_access)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS file_hashes ("
+                " path TEXT PRIMARY KEY,"
+                " size INTEGER NOT NULL,"
+                " mtime_ns INTEGER NOT NULL,"
+                " hash TEXT NOT NULL)"
+            )
+            conn.commit()
+
+            row = conn.execute("SELECT COALESCE(SUM(size), 0) FROM thumbnails").fetchone()
+            self._total_bytes = row[0]
+            self._conn = conn
+        except Exception as e:
+            print(f"Thumbnail disk cache disabled ({self.db_path}): {e}")
+            self._conn = None
+
+    @property
+    def is_available(self) -> bool:
+        """Check if the cache database could be opened."""
+        return self._conn is not None
+
+    @property
+    def total_bytes(self) -> int:
+        """Total size of the stored blobs."""
+        return self._total_bytes
+
+    def file_hash(self, pdf_path: str, stamp: Optional[FileStamp] = None,
+                  wait: bool = True) -> Optional[str]:
+        """
+        Get the content hash of a file, memoized on (size, mtime) in memory
+        and in the database.
+
+        Args:
+            pdf_path: Path to the PDF file
+            stamp: The file_stamp() an image was rendered from; if the file
+                   has changed since, there is no hash to store it under
+            wait: Read and hash the file now if its hash isn't known. If
+                  False, the file is hashed on the writer thread instead and
+                  None is returned until that has finished
+
+        Returns:
+            Hex digest or None if the file can't be read (or doesn't match
+            stamp, or isn't hashed yet)
+        """
+        current = file_stamp(pdf_path)
+        if current is None or (stamp is not None and stamp != current):
+            return None
+
+        cached = self._hashes.get(pdf_path)
+        if cached and cached[0] == current:
+            return cached[1]
+
+        value = self._stored_hash(pdf_path, current)
+        if value is not None:
+            self._hashes[pdf_path] = (current, value)
+            return value
+
+        if not wait:
+            self._hash_in_background(pdf_path)
+            return None
+
+        digest = hashlib.blake2b(digest_size=20)
+        try:
+            with open(pdf_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+        except OSError:
+            return None
+
+        value = digest.hexdigest()
+        self._hashes[pdf_path] = (current, value)
+        self._store_hash(pdf_path, current, value)
+        return value
+
+    def _stored_hash(self, pdf_path: str, stamp: FileStamp) -> Optional[str]:
+        """Look up a hash recorded for this version of the file."""
+        if not self._conn:
+            return None
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT hash FROM file_hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+                    (pdf_path, stamp[0], stamp[1])
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+        return row[0] if row else None
+
+    def _store_hash(self, pdf_path: str, stamp: FileStamp, value: str):
+        """Record a file's hash for later sessions."""
+        if not self._conn:
+            return
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, hash)"
+                    " VALUES (?, ?, ?, ?)",
+                    (pdf_path, stamp[0], stamp[1], value)
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Thumbnail disk cache write failed: {e}")
+
+    def _hash_in_background(self, pdf_path: str):
+        """Queue pdf_path for hashing on the writer thread (once)."""
+        with self._lock:
+            if pdf_path in self._hashing:
+                return
+            self._hashing.add(pdf_path)
+
+        def task():
+            try:
+                self.file_hash(pdf_path)
+            finally:
+                self._hashing.discard(pdf_path)
+
+        if not self._enqueue(task):
+            self._hashing.discard(pdf_path)
+
+    def make_key(self, pdf_path: str, page_num: int, width: int,
+                 rotation: int = 0, stamp: Optional[FileStamp] = None,
+                 wait: bool = True) -> Optional[str]:
+        """
+        Build the cache key for a rendered page.
+
+        Rotated renders get their own key (rotation is clockwise degrees).
+        Pass the stamp of the file version a render came from when storing
+        it, so a render of a since-replaced file isn't filed under the new
+        file's hash. On the UI thread pass wait=False (see file_hash()).
+
+        Returns:
+            Key string or None if the file can't be hashed (yet)
+        """
+        content_hash = self.file_hash(pdf_path, stamp, wait)
+        if content_hash is None:
+            return None
+        return f"{content_hash}:{page_num}:{width}:{rotation}:{self.RENDER_SETTINGS}"
+
+    def get(self, key: str) -> Optional[Image.Image]:
+        """
+        Fetch a cached image and mark it as recently used.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            PIL Image or None on a miss
+        """
+        if not self._conn:
+            return None
+
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT data FROM thumbnails WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                self._conn.execute(
+                    "UPDATE thumbnails SET last_access = ? WHERE key = ?",
+                    (time.time(), key)
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Thumbnail disk cache read failed: {e}")
+                return None
+
+        try:
+            img = Image.open(io.BytesIO(row[0]))
+            img.load()
+            self.hits += 1
+            return img.convert('RGB') if img.mode != 'RGB' else img
+        except Exception:
+            # Corrupt blob - drop it and treat as a miss
+            self.misses += 1
+            self.delete(key)
+            return None
+
+    def put(self, key: str, img: Image.Image):
+        """
+        Queue an image to be stored; returns without waiting for the write.
+
+        The writer thread encodes it and evicts least recently used entries
+        if over budget. The image must not be modified afterwards. If the
+        writer has fallen MAX_PENDING_WRITES behind, the image is not stored.
+
+        Args:
+            key: Key from make_key()
+            img: Rendered page image
+        """
+        if self._conn and not self._enqueue(functools.partial(self._write, key, img)):
+            self.dropped_writes += 1
+
+    def store(self, pdf_path: str, page_num: int, width: int, rotation: int,
+              img: Image.Image, stamp: FileStamp):
+        """
+        Queue a render to be stored under make_key(...), resolved on the
+        writer thread - hashing the file there first if needed.
+
+        Args:
+            pdf_path: Path to the PDF file
+            page_num: Page number (1-indexed)
+            width: Render width (before rotation)
+            rotation: Clockwise rotation in degrees
+            img: Rendered page image (must not be modified afterwards)
+            stamp: file_stamp() of the file version that was rendered
+        """
+        def task():
+            key = self.make_key(pdf_path, page_num, width, rotation, stamp=stamp)
+            if key:
+                self._write(key, img)
+
+        if self._conn and not self._enqueue(task):
+            self.dropped_writes += 1
+
+    def flush(self):
+        """Wait until every queued put(), store() and background hash has finished."""
+        self._writes.join()
+
+    def _enqueue(self, task: Callable[[], None]) -> bool:
+        """Hand a task to the writer thread; False if too many are pending."""
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop,
+                                                name="thumbnail-cache-writer", daemon=True)
+                self._writer.start()
+        try:
+            self._writes.put_nowait(task)
+            return True
+        except queue.Full:
+            return False
+
+    def _write_loop(self):
+        """Writer thread: run queued tasks until close()."""
+        while True:
+            task = self._writes.get()
+            try:
+                if task is None:
+                    return
+                task()
+            except Exception as e:
+                print(f"Thumbnail disk cache task failed: {e}")
+            finally:
+                self._writes.task_done()
+
+    def _write(self, key: str, img: Image.Image):
+        """Encode and store one image. Runs on the writer thread."""
+        buf = io.BytesIO()
+        try:
+            if self._format == 'WEBP':
+                img.save(buf, format='WEBP', quality=85, method=4)
+            else:
+                img.save(buf, format='PNG', optimize=False, compress_level=6)
+        except Exception as e:
+            print(f"Thumbnail encode failed: {e}")
+            return
+        data = buf.getvalue()
+
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            if not self._conn:
+                return
+            try:
+                row = self._conn.execute(
+                    "SELECT size FROM thumbnails WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    self._total_bytes -= row[0]
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO thumbnails (key, data, size, last_access)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, sqlite3.Binary(data), len(data), time.time())
+                )
+                self._total_bytes += len(data)
+
+                if self._total_bytes > self.max_bytes:
+                    self._evict(int(self.max_bytes * self.EVICT_TARGET_RATIO))
+
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Thumbnail disk cache write failed: {e}")
+
+    def _evict(self, target_bytes: int):
+        """Delete least recently used entries until total size <= target. Lock held."""
+        cursor = self._conn.execute(
+            "SELECT key, size FROM thumbnails ORDER BY last_access ASC"
+        )
+        doomed = []
+        for key, size in cursor:
+            if self._total_bytes <= target_bytes:
+                break
+            doomed.append((key,))
+            self._total_bytes -= size
+        cursor.close()
+
+        if doomed:
+            self._conn.executemany("DELETE FROM thumbnails WHERE key = ?", doomed)
+            self.evictions += len(doomed)
+
+    def delete(self, key: str):
+        """Remove a single entry."""
+        if not self._conn:
+            return
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT size FROM thumbnails WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    self._conn.execute("DELETE FROM thumbnails WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self._total_bytes -= row[0]
+            except sqlite3.Error:
+                pass
+
+    def clear(self):
+        """Remove every stored thumbnail."""
+        if not self._conn:
+            return
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM thumbnails")
+                self._conn.commit()
+                self._conn.execute("VACUUM")
+                self._total_bytes = 0
+            except sqlite3.Error:
+                pass
+
+    def get_stats(self) -> dict:
+        """Get hit/miss/eviction counters and current size."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'pending_writes': self._writes.qsize(),
+            'dropped_writes': self.dropped_writes,
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+        }
+
+    def close(self):
+        """Finish queued writes and close the database connection."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._writes.put(None)
+            writer.join()
+        with self._lock:
+            if self._conn:
+                try:
+                    self._conn.close()
+                except sqlite3.Error:
+                    pass
+                self._conn = None
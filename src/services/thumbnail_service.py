@@ -4,65 +4,313 @@ Thumbnail Service - Generates images for PDF pages
 import fitz  # PyMuPDF
 from PIL import Image
 import io
-from typing import Optional, Dict
+import time
+from concurrent.futures import Future
+from typing import Optional, Callable, Dict, List, Tuple
+
+from services.thumbnail_cache import DiskThumbnailCache, FileStamp, MemoryThumbnailCache
+from services.document_pool import DocumentPool
+from services.document_session import DocumentSession
+from services.render_pool import RenderWorkerPool
+from services.embedded_images import page_image
+from services import instrumentation
 
 class ThumbnailService:
     """
     Service for rendering PDF pages as images efficiently.
     """
     
-    def __init__(self):
-        self._cache: Dict[str, Dict[int, Image.Image]] = {}
+    # Renders wider than this are viewer-size: they use the viewer budget and
+    # skip the disk cache (decoding a 1600px image costs about as much as
+    # rendering it again, and it would happen on the UI thread)
+    GRID_MAX_WIDTH = 400
+    
+    DEFAULT_GRID_CACHE_BYTES = 128 * 1024 * 1024
+    DEFAULT_VIEWER_CACHE_BYTES = 64 * 1024 * 1024
+    DEFAULT_TILE_CACHE_BYTES = 64 * 1024 * 1024
+    
+    def __init__(self, disk_cache: Optional[DiskThumbnailCache] = None,
+                 document_pool: Optional[DocumentPool] = None,
+                 grid_cache_bytes: int = DEFAULT_GRID_CACHE_BYTES,
+                 viewer_cache_bytes: int = DEFAULT_VIEWER_CACHE_BYTES,
+                 render_pool: Optional[RenderWorkerPool] = None,
+                 tile_cache_bytes: int = DEFAULT_TILE_CACHE_BYTES):
+        self._grid_cache = MemoryThumbnailCache(grid_cache_bytes)
+        self._viewer_cache = MemoryThumbnailCache(viewer_cache_bytes)
+        self._tile_cache = MemoryThumbnailCache(tile_cache_bytes)
+        self._disk_cache = disk_cache
+        self._documents = document_pool or DocumentPool()
+        self._render_pool = render_pool
+        self._pending: Dict[Tuple[str, int, int, int], Tuple[Future, List[Callable]]] = {}
         
-    def get_thumbnail(self, pdf_path: str, page_num: int, width: int = 200) -> Optional[Image.Image]:
+    @property
+    def renders_in_background(self) -> bool:
+        """True if request_thumbnail() renders off the calling thread."""
+        return bool(self._render_pool and self._render_pool.is_available)
+        
+    def get_thumbnail(self, pdf_path: str, page_num: int, width: int = 200,
+                      rotation: int = 0) -> Optional[Image.Image]:
         """
         Get a thumbnail for a specific page.
         
         Args:
             pdf_path: Path to the PDF file
             page_num: Page number (1-indexed)
-            width: Desired thumbnail width
+            width: Desired thumbnail width (before rotation)
+            rotation: Clockwise rotation in degrees (multiple of 90), applied
+                      by the renderer and cached separately per angle
             
         Returns:
             PIL Image object or None if failed
         """
-        # Check cache
-        cache_key = (page_num, width)
-        if pdf_path in self._cache and cache_key in self._cache[pdf_path]:
-            return self._cache[pdf_path][cache_key]
+        img = self.get_cached_thumbnail(pdf_path, page_num, width, rotation)
+        if img is not None:
+            return img
             
         try:
-            doc = fitz.open(pdf_path)
-            
-            if page_num < 1 or page_num > len(doc):
-                return None
+            with instrumentation.span('thumbnail.render', page=page_num, width=width) as span, \
+                    self._documents.document(pdf_path) as doc:
+                if page_num < 1 or page_num > len(doc):
+                    return None
+                stamp = self._documents.stamp(pdf_path)
+                    
+                page = doc.load_page(page_num - 1)
                 
-            page = doc.load_page(page_num - 1)
-            
-            # Calculate zoom factor to match desired width
-            pix_width = page.rect.width
-            zoom = width / pix_width
-            mat = fitz.Matrix(zoom, zoom)
-            
-            # Render page to pixmap
-            pix = page.get_pixmap(matrix=mat)
-            
-            # Convert to PIL Image
-            img_data = pix.tobytes("ppm")
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            
-            # Cache the result
-            if pdf_path not in self._cache:
-                self._cache[pdf_path] = {}
-            self._cache[pdf_path][cache_key] = img
+                # Pages carrying a large enough /Thumb skip rasterizing
+                img = page_image(doc, page, width, rotation)
+                if img is not None:
+                    span.set(source='thumb')
+                    self._store(pdf_path, page_num, width, rotation, img, stamp)
+                    return img
+                
+                # Calculate zoom factor to match desired width
+                pix_width = page.rect.width
+                zoom = width / pix_width
+                mat = fitz.Matrix(zoom, zoom).prerotate(rotation)
+                
+                # Render page to pixmap
+                pix = page.get_pixmap(matrix=mat)
+                
+                # Wrap the sample buffer without another copy
+                img = Image.frombuffer("RGB", (pix.width, pix.height), pix.samples, "raw", "RGB", 0, 1)
             
-            doc.close()
+            self._store(pdf_path, page_num, width, rotation, img, stamp)
             return img
             
         except Exception as e:
+            instrumentation.error('thumbnail.render', e, path=pdf_path, page=page_num)
             print(f"Error generating thumbnail for {pdf_path} page {page_num}: {e}")
             return None
 
+    def get_tile(self, pdf_path: str, page_num: int, width: int, rotation: int,
+                 rect: Tuple[int, int, int, int]) -> Optional[Image.Image]:
+        """
+        Render one region of a page at a given zoom.
+        
+        The page is laid out as if rendered at `width` pixels wide and then
+        rotated clockwise by `rotation`; only `rect` of that raster is
+        rasterized, so deep zoom costs what is on screen rather than the
+        whole page. Tiles are cached per (page, width, rotation, rect).
+        
+        Args:
+            pdf_path: Path to the PDF file
+            page_num: Page number (1-indexed)
+            width: Unrotated width of the whole page at this zoom, in pixels
+            rotation: Clockwise rotation in degrees (multiple of 90)
+            rect: (x0, y0, x1, y1) pixel region of the rotated page raster
+            
+        Returns:
+            PIL Image of the region (clipped to the page) or None if failed
+        """
+        cache_key = (pdf_path, page_num, width, rotation, rect)
+        img = self._tile_cache.get(cache_key)
+        if img is not None:
+            return img
+        
+        try:
+            with instrumentation.span('thumbnail.tile', page=page_num, width=width), \
+                    self._documents.document(pdf_path) as doc:
+                if page_num < 1 or page_num > len(doc):
+                    return None
+                
+                page = doc.load_page(page_num - 1)
+                zoom = width / page.rect.width
+                mat = fitz.Matrix(zoom, zoom).prerotate(rotation)
+                
+                # Map the raster region back to page space; the rotated
+                # raster's origin is the top-left of the transformed page box
+                bbox = page.rect * mat
+                to_raster = mat * fitz.Matrix(1, 0, 0, 1, -bbox.x0, -bbox.y0)
+                clip = (fitz.Rect(rect) * ~to_raster) & page.rect
+                if clip.is_empty:
+                    return None
+                
+                pix = page.get_pixmap(matrix=mat, clip=clip, alpha=False)
+                img = Image.frombuffer("RGB", (pix.width, pix.height), pix.samples, "raw", "RGB", 0, 1)
+        except Exception as e:
+            instrumentation.error('thumbnail.tile', e, path=pdf_path, page=page_num)
+            print(f"Error rendering tile for {pdf_path} page {page_num}: {e}")
+            return None
+        
+        self._tile_cache.put(cache_key, img)
+        return img
+
+    def get_cached_thumbnail(self, pdf_path: str, page_num: int, width: int,
+                             rotation: int = 0) -> Optional[Image.Image]:
+        """
+        Get a thumbnail from the memory or disk cache without rendering.
+        
+        Viewer-size images (wider than GRID_MAX_WIDTH) are only looked up in memory.
+        
+        Returns:
+            PIL Image object or None on a cache miss
+        """
+        cache_key = (pdf_path, page_num, width, rotation)
+        memory_cache = self._memory_cache_for(width)
+        img = memory_cache.get(cache_key)
+        if img is not None:
+            instrumentation.count('thumbnail.memory_hit')
+            return img
+        
+        # Check persistent cache before re-rasterizing
+        if self._disk_cache and width <= self.GRID_MAX_WIDTH:
+            with instrumentation.span('thumbnail.disk_lookup', page=page_num):
+                # Doesn't hash the file here; a file hashed in the background
+                # is a miss until that finishes
+                disk_key = self._disk_cache.make_key(pdf_path, page_num, width, rotation, wait=False)
+                img = self._disk_cache.get(disk_key) if disk_key else None
+            if img:
+                instrumentation.count('thumbnail.disk_hit')
+                memory_cache.put(cache_key, img)
+                return img
+        instrumentation.count('thumbnail.miss')
+        return None
+
+    def request_thumbnail(self, pdf_path: str, page_num: int, width: int,
+                          callback: Callable[[Optional[Image.Image]], None],
+                          rotation: int = 0) -> Optional[Future]:
+        """
+        Get a thumbnail without blocking on the render.
+        
+        Cache hits (and renders when no worker pool is configured) invoke
+        callback immediately. Otherwise the page is rendered in the worker
+        pool and callback runs from process_completed() on the UI thread.
+        Concurrent requests for the same page share one render.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            page_num: Page number (1-indexed)
+            width: Desired thumbnail width (before rotation)
+            callback: Called with the PIL Image, or None if rendering failed
+            rotation: Clockwise rotation in degrees (multiple of 90)
+            
+        Returns:
+            The pending render Future, or None if callback already ran
+        """
+        img = self.get_cached_thumbnail(pdf_path, page_num, width, rotation)
+        if img is not None:
+            callback(img)
+            return None
+        
+        key = (pdf_path, page_num, width, rotation)
+        pending = self._pending.get(key)
+        if pending and not pending[0].cancelled():
+            pending[1].append(callback)
+            return pending[0]
+        
+        future = None
+        if self.renders_in_background:
+            future = self._render_pool.submit(
+                pdf_path, page_num, width,
+                lambda f, k=key, t=time.perf_counter(): self._on_render_done(k, f, t),
+                rotation=rotation,
+            )
+        if future is None:
+            callback(self.get_thumbnail(pdf_path, page_num, width, rotation))
+            return None
+        
+        self._pending[key] = (future, [callback])
+        return future
+
+    def _on_render_done(self, key: Tuple[str, int, int, int], future: Future,
+                        submitted: float):
+        """Store a worker render and notify waiting callbacks. Runs on the UI thread."""
+        pending = self._pending.get(key)
+        if not pending or pending[0] is not future:
+            # A cancelled render whose page was requested again before this
+            # callback ran - the newer future owns the entry
+            return
+        del self._pending[key]
+        callbacks = pending[1]
+        if future.cancelled():
+            return
+        # Queue wait + worker render + completion polling delay
+        instrumentation.observe('thumbnail.worker_latency_ms', (time.perf_counter() - submitted) * 1000)
+        
+        pdf_path, page_num, width, rotation = key
+        try:
+            result = future.result()
+            img = None
+            if result:
+                with instrumentation.span('thumbnail.deliver', page=page_num, width=width):
+                    pix_width, pix_height, samples, stamp = result
+                    img = Image.frombuffer("RGB", (pix_width, pix_height), samples, "raw", "RGB", 0, 1)
+                    self._store(pdf_path, page_num, width, rotation, img, stamp)
+                instrumentation.count('thumbnail.worker_render')
+        except Exception as e:
+            instrumentation.error('thumbnail.worker_render', e, path=pdf_path, page=page_num)
+            print(f"Background render failed for {pdf_path} page {page_num}: {e}")
+            # Worker crashed or the pool broke - render in-process instead
+            img = self.get_thumbnail(pdf_path, page_num, width, rotation)
+        
+        for callback in callbacks:
+            callback(img)
+
+    def process_completed(self) -> int:
+        """
+        Deliver finished background renders and close pooled documents that
+        have gone idle. Call periodically from the UI thread.
+        
+        Returns:
+            Number of renders delivered
+        """
+        self._documents.evict_idle()
+        if not self._render_pool:
+            return 0
+        return self._render_pool.process_completed()
+
+    def _store(self, pdf_path: str, page_num: int, width: int, rotation: int,
+               img: Image.Image, stamp: Optional[FileStamp]):
+        """
+        Put a rendered image in the memory and disk caches.
+        
+        stamp is the file_stamp() of the file version that was rendered; the
+        disk cache skips the image if the file has changed since.
+        """
+        self._memory_cache_for(width).put((pdf_path, page_num, width, rotation), img)
+        if self._disk_cache and stamp is not None and width <= self.GRID_MAX_WIDTH:
+            self._disk_cache.store(pdf_path, page_num, width, rotation, img, stamp)
+
+    def _memory_cache_for(self, width: int) -> MemoryThumbnailCache:
+        """Pick the grid or viewer memory budget for a render width."""
+        if width > self.GRID_MAX_WIDTH:
+            return self._viewer_cache
+        return self._grid_cache
+
+    def attach_session(self, session: DocumentSession):
+        """
+        Render session.path from the session's document instead of opening it again.
+
+        In-process renders and tiles use the shared document; worker
+        processes still open the path themselves (a document can't be
+        shared across processes).
+        """
+        self._documents.attach(session.path, session.document)
+
+    def detach_session(self, session: DocumentSession):
+        """Stop using a session's document; call before the session is closed."""
+        self._documents.detach(session.path, session.document)
+
     def clear_cache(self, pdf_path: Optional[str] = None):
         """
         Clear thumbnail cache.
@@ -70,8 +318,36 @@ class ThumbnailService:
         Args:
             pdf_path: Optional specific PDF path to clear. If None, clears all.
         """
-        if pdf_path:
-            if pdf_path in self._cache:
-                del self._cache[pdf_path]
-        else:
-            self._cache.clear()
+        for cache in (self._grid_cache, self._viewer_cache, self._tile_cache):
+            if pdf_path:
+                cache.discard(lambda key: key[0] == pdf_path)
+            else:
+                cache.clear()
+
+    def get_stats(self) -> dict:
+        """
+        Get cache and document pool counters.
+        
+        Returns:
+            Dict with 'grid_cache' / 'viewer_cache' / 'tile_cache' (memory LRU stats),
+            'documents' (open/reopen hits and misses) and, when enabled,
+            'disk_cache' stats
+        """
+        stats = {
+            'grid_cache': self._grid_cache.get_stats(),
+            'viewer_cache': self._viewer_cache.get_stats(),
+            'tile_cache': self._tile_cache.get_stats(),
+            'documents': self._documents.get_stats(),
+        }
+        if self._disk_cache:
+            stats['disk_cache'] = self._disk_cache.get_stats()
+        return stats
+
+    def close(self):
+        """Stop background rendering and release pooled documents and the persistent cache."""
+        if self._render_pool:
+            self._render_pool.shutdown()
+        self._pending.clear()
+        self._documents.close()
+        if self._disk_cache:
+            self._disk_cache.close()
@@ -6,7 +6,7 @@ Provides validation functions for page ranges, filenames, and file paths.
 
 import os
 import re
-from typing import Tuple, Optional
+from typing import Tuple, Optional, List
 
 
 class ValidationService:
@@ -175,6 +175,60 @@ class ValidationService:
         
         return True, ""
     
+    @classmethod
+    def parse_page_spec(cls, spec: str, total_pages: int) -> Tuple[List[int], str]:
+        """
+        Parse a page specification such as "1-3,7,10-" into page numbers.
+        
+        Supports single pages ("7"), ranges ("1-3"), open-ended ranges
+        ("10-" runs to the last page) and "all". Order is preserved and
+        duplicates are dropped.
+        
+        Args:
+            spec: Page specification string
+            total_pages: Total number of pages in the PDF
+            
+        Returns:
+            Tuple of (pages: list of 1-indexed page numbers, error_message: str).
+            pages is empty when the spec is invalid.
+        """
+        if not spec or not spec.strip():
+            return [], "Page specification is empty"
+        
+        if spec.strip().lower() == 'all':
+            return list(range(1, total_pages + 1)), ""
+        
+        pages = []
+        seen = set()
+        for part in spec.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            
+            try:
+                if '-' in part:
+                    start_str, end_str = part.split('-', 1)
+                    start = int(start_str) if start_str.strip() else 1
+                    end = int(end_str) if end_str.strip() else total_pages
+                else:
+                    start = end = int(part)
+            except ValueError:
+                return [], f"Invalid page specification: '{part}'"
+            
+            is_valid, error = cls.validate_page_range(start, end, total_pages)
+            if not is_valid:
+                return [], error
+            
+            for page in range(start, end + 1):
+                if page not in seen:
+                    seen.add(page)
+                    pages.append(page)
+        
+        if not pages:
+            return [], "Page specification selects no pages"
+        
+        return pages, ""
+    
     @classmethod
     def sanitize_filename(cls, filename: str) -> str:
         """
@@ -0,0 +1,56 @@
+"""
+Image Utilities - PIL to Tk image conversion
+"""
+
+import tkinter as tk
+from typing import Union
+
+from PIL import Image, ImageTk
+
+
+# Cleared the first time Tk rejects binary PPM data (very old Tk builds)
+_ppm_supported = True
+
+
+def ppm_bytes(img: Image.Image) -> bytes:
+    """
+    Encode an image as binary PPM (P6) - a short header followed by the raw
+    RGB buffer. No compression or per-pixel work, but the pixels are copied
+    twice: by tobytes() and when the header is prepended.
+
+    Args:
+        img: PIL image (converted to RGB if needed)
+
+    Returns:
+        PPM file contents
+    """
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    header = b"P6 %d %d 255\n" % (img.width, img.height)
+    return header + img.tobytes()
+
+
+def to_photo_image(img: Image.Image, master=None) -> Union[tk.PhotoImage, ImageTk.PhotoImage]:
+    """
+    Create a Tk image from a PIL image.
+
+    Hands a PPM buffer (see ppm_bytes) to tk.PhotoImage(data=...), which Tk
+    copies into the photo, instead of going through ImageTk's paste path.
+    Neither path is copy-free; benchmarks/bench_photo_image.py compares
+    them on a machine with a display. Falls back to ImageTk.PhotoImage if
+    this Tk can't read binary PPM data.
+
+    Args:
+        img: PIL image
+        master: Optional Tk widget owning the image
+
+    Returns:
+        An image usable anywhere Tk expects image=
+    """
+    global _ppm_supported
+    if _ppm_supported:
+        try:
+            return tk.PhotoImage(master=master, data=ppm_bytes(img), format='PPM')
+        except tk.TclError:
+            _ppm_supported = False
+    return ImageTk.PhotoImage(img, master=master)
@@ -0,0 +1,280 @@
+"""
+Profiling Utilities - Session profiler for the desktop app
+
+Used by `python src/main.py --profile`. While active it collects:
+
+- per-function statistics, from cProfile or from stack samples
+- stack samples of the main (Tk) thread, written as collapsed stacks
+  (`frame;frame;frame count`) for flamegraph.pl, speedscope or inferno
+- Tk event-loop lag: for every `after()` callback, how late it ran compared
+  with when it was due, plus how long every Tk callback (after, bindings,
+  widget commands) took, keyed by handler name such as `GridView._regrid`
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tkinter as tk
+from collections import Counter
+from typing import Dict, List, Optional
+
+
+# Tk callbacks slower than this are listed individually as freezes
+FREEZE_THRESHOLD_MS = 100
+
+
+def callback_name(func) -> str:
+    """Readable name for a callback, e.g. 'GridView._regrid'."""
+    func = getattr(func, '__func__', func)
+    name = getattr(func, '__qualname__', None) or getattr(func, '__name__', None)
+    return name or type(func).__name__
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _StackSampler:
+    """Samples one thread's Python stack at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                if code.co_filename == __file__:
+                    frame = frame.f_back
+                    continue  # Leave the profiler's own wrappers out of the stacks
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def function_stats(self) -> List[tuple]:
+        """(function, self samples, total samples), busiest first."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        return sorted(((name, own[name], total[name]) for name in total),
+                      key=lambda row: (row[2], row[1]), reverse=True)
+
+
+class _TkLagMonitor:
+    """
+    Times Tk callbacks by wrapping tkinter's dispatch points.
+
+    Misc.after is wrapped to remember when each callback was due, and
+    CallWrapper.__call__ (the entry point for every Tk -> Python call) to
+    time the handler. Both are restored by uninstall().
+    """
+
+    def __init__(self):
+        self.lag_ms: Dict[str, List[float]] = {}
+        self.duration_ms: Dict[str, List[float]] = {}
+        self.freezes: List[dict] = []
+        self._origin = time.perf_counter()
+        self._original_after = None
+        self._original_call = None
+
+    def install(self):
+        monitor = self
+        original_after = self._original_after = tk.Misc.after
+        original_call = self._original_call = tk.CallWrapper.__call__
+
+        def after(widget, ms, func=None, *args):
+            if func is None:
+                return original_after(widget, ms)  # Plain sleep, nothing to time
+            due = time.perf_counter() + (0 if ms == 'idle' else int(ms) / 1000)
+            name = callback_name(func)
+
+            def timed(*call_args):
+                monitor._record(monitor.lag_ms, name, (time.perf_counter() - due) * 1000)
+                return monitor._time_call(name, func, call_args)
+
+            return original_after(widget, ms, timed, *args)
+
+        def call(wrapper, *args):
+            # partials and other callables have no __qualname__
+            if getattr(wrapper.func, '__qualname__', repr(wrapper.func)).endswith('after.<locals>.callit'):
+                return original_call(wrapper, *args)  # Timed under its own name by `timed`
+            return monitor._time_call(callback_name(wrapper.func), original_call, (wrapper,) + args)
+
+        tk.Misc.after = after
+        tk.CallWrapper.__call__ = call
+
+    def uninstall(self):
+        if self._original_after is not None:
+            tk.Misc.after = self._original_after
+            tk.CallWrapper.__call__ = self._original_call
+            self._original_after = self._original_call = None
+
+    @staticmethod
+    def _record(table: Dict[str, List[float]], name: str, value: float):
+        table.setdefault(name, []).append(value)
+
+    def _time_call(self, name: str, func, args: tuple):
+        """Run a callback, recording its duration and any freeze."""
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self._record(self.duration_ms, name, elapsed)
+            if elapsed >= FREEZE_THRESHOLD_MS:
+                self.freezes.append({
+                    'callback': name,
+                    'at_s': round(start - self._origin, 3),
+                    'duration_ms': round(elapsed, 1),
+                })
+
+    def summary(self) -> dict:
+        def summarize(table):
+            result = {}
+            for name, values in table.items():
+                ordered = sorted(values)
+                result[name] = {
+                    'count': len(ordered),
+                    'mean_ms': sum(ordered) / len(ordered),
+                    'p95_ms': _percentile(ordered, 0.95),
+                    'max_ms': ordered[-1],
+                    'total_ms': sum(ordered),
+                }
+            return dict(sorted(result.items(), key=lambda item: item[1]['max_ms'], reverse=True))
+
+        return {
+            'after_lag': summarize(self.lag_ms),
+            'callback_duration': summarize(self.duration_ms),
+            'freezes': self.freezes,
+            'freeze_threshold_ms': FREEZE_THRESHOLD_MS,
+        }
+
+
+class SessionProfiler:
+    """
+    Profiles an interactive session from start() until stop().
+
+    Args:
+        output_dir: Directory the reports are written to (created if needed)
+        mode: 'sample' (stack sampling only, low overhead) or 'cprofile'
+              (deterministic per-function stats, plus sampling)
+        interval: Seconds between stack samples
+    """
+
+    MODES = ('sample', 'cprofile')
+
+    def __init__(self, output_dir: str, mode: str = 'sample', interval: float = 0.005):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profiler mode '{mode}' (expected one of {', '.join(self.MODES)})")
+        self.output_dir = output_dir
+        self.mode = mode
+        self.interval = interval
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_StackSampler] = None
+        self._tk_monitor = _TkLagMonitor()
+        self._started = 0.0
+
+    def start(self):
+        """Begin profiling the calling thread (the one that runs mainloop)."""
+        self._started = time.perf_counter()
+        self._tk_monitor.install()
+        self._sampler = _StackSampler(threading.get_ident(), self.interval)
+        self._sampler.start()
+        if self.mode == 'cprofile':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self) -> List[str]:
+        """
+        Stop profiling and write the reports.
+
+        Returns:
+            Paths of the files written
+        """
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        self._tk_monitor.uninstall()
+        elapsed = time.perf_counter() - self._started
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        written = []
+
+        def path(name):
+            written.append(os.path.join(self.output_dir, name))
+            return written[-1]
+
+        with open(path('functions.txt'), 'w', encoding='utf-8') as f:
+            f.write(f"Session: {elapsed:.1f}s, mode: {self.mode}\n\n")
+            if self._profile is not None:
+                self._profile.dump_stats(path('profile.pstats'))
+                buffer = io.StringIO()
+                pstats.Stats(self._profile, stream=buffer).sort_stats('cumulative').print_stats(60)
+                f.write(buffer.getvalue())
+            else:
+                samples = max(1, self._sampler.samples)
+                f.write(f"{self._sampler.samples} samples every {self.interval * 1000:.0f} ms\n\n")
+                f.write(f"{'self %':>7} {'total %':>8}  function\n")
+                for name, own, total in self._sampler.function_stats()[:80]:
+                    f.write(f"{own * 100 / samples:7.1f} {total * 100 / samples:8.1f}  {name}\n")
+
+        self._sampler.write_collapsed(path('stacks.collapsed'))
+
+        summary = self._tk_monitor.summary()
+        with open(path('tk_lag.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        with open(path('tk_lag.txt'), 'w', encoding='utf-8') as f:
+            f.write(self._format_tk_summary(summary))
+
+        return written
+
+    @staticmethod
+    def _format_tk_summary(summary: dict) -> str:
+        lines = [f"{'callback':<60} {'count':>7} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+
+        def table(title, rows):
+            lines.append('')
+            lines.append(title)
+            for name, row in list(rows.items())[:40]:
+                lines.append(f"{name[:60]:<60} {row['count']:>7} {row['mean_ms']:9.1f} "
+                             f"{row['p95_ms']:9.1f} {row['max_ms']:9.1f}")
+
+        table("after() lag - how late callbacks ran", summary['after_lag'])
+        table("Callback duration - time spent inside each Tk handler", summary['callback_duration'])
+        lines.append('')
+        lines.append(f"Freezes (callbacks over {summary['freeze_threshold_ms']} ms): {len(summary['freezes'])}")
+        for freeze in summary['freezes'][:100]:
+            lines.append(f"  {freeze['at_s']:9.3f}s  {freeze['duration_ms']:8.1f} ms  {freeze['callback']}")
+        return '\n'.join(lines) + '\n'
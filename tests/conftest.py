@@ -0,0 +1,8 @@
+"""
+Shared pytest setup: makes the application packages under src/ importable.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
@@ -0,0 +1,123 @@
+"""
+Extraction engine parity: pypdf2 and pymupdf must write the same pages.
+
+Sources have mixed /Rotate values and an offset media box, so rotation
+overrides stack on existing rotations and crops are mapped from a non-zero
+origin. benchmarks/check_engine_parity.py runs the same comparison (plus
+text and rendering) on the larger benchmark fixtures.
+"""
+
+import threading
+
+import fitz  # PyMuPDF
+import pytest
+
+from services.pdf_service import PDFService
+
+
+PAGES = 8
+BOX_TOLERANCE = 0.01  # points
+CROPS = ((0.1, 0.1, 0.9, 0.9), (0.0, 0.5, 0.5, 1.0), (0.25, 0.0, 1.0, 0.4))
+
+CASES = {
+    'all': (list(range(1, PAGES + 1)), {}, {}),
+    'rotate_crop': (
+        list(range(1, PAGES + 1)),
+        {p: (90, 180, 270)[p % 3] for p in range(1, PAGES + 1)},
+        {p: CROPS[p % len(CROPS)] for p in range(1, PAGES + 1)},
+    ),
+    'reorder': ([8, 3, 3, 1, 6, 7], {3: 90, 6: 270}, {1: CROPS[0], 7: CROPS[2]}),
+}
+
+
+@pytest.fixture(scope='module')
+def source_pdf(tmp_path_factory) -> str:
+    """A small PDF with mixed /Rotate values and an offset media box."""
+    path = str(tmp_path_factory.mktemp('parity') / 'source.pdf')
+    doc = fitz.open()
+    for index in range(PAGES):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((72, 72), f"Page {index + 1}", fontsize=24)
+        doc.xref_set_key(page.xref, 'MediaBox', "[20 30 615 872]")
+        page.set_rotation((0, 90, 180, 270)[index % 4])
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def describe(path: str) -> list:
+    """(rotation, mediabox, cropbox) for each page of a PDF."""
+    doc = fitz.open(path)
+    try:
+        return [(page.rotation % 360, tuple(page.mediabox), tuple(page.cropbox)) for page in doc]
+    finally:
+        doc.close()
+
+
+def assert_same_pages(expected: list, actual: list):
+    assert len(actual) == len(expected)
+    for number, (a, b) in enumerate(zip(expected, actual), start=1):
+        assert b[0] == a[0], f"page {number} rotation"
+        for box in (1, 2):
+            assert b[box] == pytest.approx(a[box], abs=BOX_TOLERANCE), f"page {number} box"
+
+
+def extract(source_pdf: str, out_path: str, engine: str, case: str) -> list:
+    pages, rotations, crops = CASES[case]
+    service = PDFService()
+    assert service.load_pdf(source_pdf)[0]
+    try:
+        success, message = service.extract_pages(pages, out_path, rotations,
+                                                  crop_overrides=crops, engine=engine)
+    finally:
+        service.close()
+    assert success, message
+    return describe(out_path)
+
+
+@pytest.mark.parametrize('case', sorted(CASES))
+def test_engines_write_same_pages(source_pdf, tmp_path, case):
+    reference = extract(source_pdf, str(tmp_path / 'pypdf2.pdf'), 'pypdf2', case)
+    pages = CASES[case][0]
+    assert len(reference) == len(pages)
+
+    assert_same_pages(reference, extract(source_pdf, str(tmp_path / 'pymupdf.pdf'), 'pymupdf', case))
+
+
+def test_rotation_adds_to_source_rotation(source_pdf, tmp_path):
+    # Page 2 has /Rotate 90 in the source; a 90 override makes it 180
+    for engine in PDFService.ENGINES:
+        service = PDFService()
+        service.load_pdf(source_pdf)
+        out_path = str(tmp_path / f"{engine}.pdf")
+        assert service.extract_pages([2], out_path, {2: 90}, engine=engine)[0]
+        service.close()
+        assert describe(out_path)[0][0] == 180
+
+
+def test_pymupdf_engine_off_main_thread(source_pdf, tmp_path):
+    """The GUI path: run from a worker thread, the engine runs in a child process."""
+    expected = extract(source_pdf, str(tmp_path / 'main.pdf'), 'pymupdf', 'rotate_crop')
+
+    results = []
+    progress = []
+    thread = threading.Thread(target=lambda: results.append(
+        extract_in_thread(source_pdf, str(tmp_path / 'thread.pdf'), progress)))
+    thread.start()
+    thread.join(timeout=120)
+
+    assert results and results[0][0], results
+    assert progress and progress[-1] == (PAGES, PAGES)
+    assert_same_pages(expected, describe(str(tmp_path / 'thread.pdf')))
+
+
+def extract_in_thread(source_pdf: str, out_path: str, progress: list):
+    pages, rotations, crops = CASES['rotate_crop']
+    service = PDFService(extraction_engine='pymupdf')
+    service.load_pdf(source_pdf)
+    try:
+        return service.extract_pages(pages, out_path, rotations,
+                                     lambda current, total: progress.append((current, total)),
+                                     crop_overrides=crops)
+    finally:
+        service.close()
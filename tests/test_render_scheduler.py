@@ -0,0 +1,89 @@
+"""
+Cancelled renders must not swallow a later request for the same page.
+
+A cancelled future's done-callback waits in the render pool's completion
+queue until the next process_completed(). If the page is requested again
+before that, the stale callback must leave the new render's callbacks in
+place, or the page is never delivered and its in-flight slot never freed.
+"""
+
+import time
+
+import fitz  # PyMuPDF
+import pytest
+
+from services.render_pool import RenderWorkerPool
+from services.render_scheduler import RenderScheduler
+from services.thumbnail_service import ThumbnailService
+
+
+PAGES = 60
+WIDTH = 120
+TIMEOUT = 60.0  # seconds; the first render pays for spawning the worker
+
+
+@pytest.fixture(scope='module')
+def source_pdf(tmp_path_factory) -> str:
+    path = str(tmp_path_factory.mktemp('scheduler') / 'source.pdf')
+    doc = fitz.open()
+    for index in range(PAGES):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((72, 72), f"Page {index + 1}", fontsize=24)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+@pytest.fixture
+def service():
+    pool = RenderWorkerPool(max_workers=1)
+    service = ThumbnailService(render_pool=pool)
+    yield service
+    service.close()
+    pool.shutdown()
+
+
+def view(scheduler: RenderScheduler, delivered: dict, first: int, last: int):
+    """Scroll to first..last and request the visible pages, as the grid does."""
+    scheduler.set_viewport(first, last)
+    for page_num in range(first, last + 1):
+        scheduler.request(page_num, lambda img, p=page_num: delivered.__setitem__(p, img))
+    scheduler.pump()
+
+
+def drain(service: ThumbnailService, scheduler: RenderScheduler, delivered: dict, pages):
+    deadline = time.monotonic() + TIMEOUT
+    while time.monotonic() < deadline:
+        service.process_completed()
+        if all(p in delivered for p in pages) and scheduler.get_stats()['in_flight'] == 0:
+            return
+        time.sleep(0.01)
+
+
+def test_scroll_away_and_back(service, source_pdf):
+    scheduler = RenderScheduler(service, WIDTH)
+    scheduler.reset(source_pdf)
+    delivered = {}
+
+    view(scheduler, delivered, 1, 8)
+    view(scheduler, delivered, 50, 57)
+    view(scheduler, delivered, 1, 8)
+    drain(service, scheduler, delivered, range(1, 9))
+
+    assert sorted(p for p in delivered if delivered[p] is not None) == list(range(1, 9))
+    assert scheduler.get_stats()['in_flight'] == 0
+    assert not scheduler.has_pending
+
+
+def test_reload_before_renders_finish(service, source_pdf):
+    scheduler = RenderScheduler(service, WIDTH)
+    delivered = {}
+
+    scheduler.reset(source_pdf)
+    view(scheduler, delivered, 1, 8)
+    scheduler.reset(source_pdf)
+    view(scheduler, delivered, 1, 8)
+    drain(service, scheduler, delivered, range(1, 9))
+
+    assert sorted(p for p in delivered if delivered[p] is not None) == list(range(1, 9))
+    assert scheduler.get_stats()['in_flight'] == 0